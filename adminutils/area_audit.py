@@ -0,0 +1,205 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from adminutils.geometry import pack_polygons, polygon_areas_sq_m, sq_m_per_unit
+from adminutils.property import get_polygon_coordinates
+from adminutils.events import publish_events, status_changed_event, notification_event
+from adminutils.cache import response_cache
+from models.properties import Property, PropertyStatus
+from schemas.properties import AreaAuditItem, AreaAuditReport
+from itertools import islice
+from typing import Iterable, List, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows pulled from the cursor and evaluated per vectorized pass
+AUDIT_BATCH_SIZE = 20000
+# Declared area may differ from the geometry by this fraction before it is reported
+DEFAULT_TOLERANCE = 0.10
+
+
+def audit_batch(rows: List, tolerance: float, include_ok: bool = False) -> List[AreaAuditItem]:
+    """
+    Compare declared and geometric areas for a batch of (id, geom, area_sq_m, unit, state) rows.
+    All geometry work is done in one vectorized pass over the batch.
+    """
+    import numpy as np
+
+    if not rows:
+        return []
+
+    geometric = polygon_areas_sq_m(pack_polygons([get_polygon_coordinates(row) for row in rows]))
+    declared = np.array([float(row.area_sq_m) if row.area_sq_m is not None else np.nan for row in rows])
+    per_unit = np.array([(sq_m_per_unit(row.unit, row.state) or np.nan) if row.unit else np.nan for row in rows])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = np.abs(declared - geometric) / geometric
+        in_unit_deviation = np.abs(declared * per_unit - geometric) / geometric
+        geometric_in_unit = geometric / per_unit
+
+    broken = np.isnan(geometric) | (geometric <= 0)
+    mismatched = broken | (~np.isnan(declared) & ~(deviation <= tolerance))
+    selected = np.arange(len(rows)) if include_ok else np.flatnonzero(mismatched)
+
+    def as_float(value):
+        return None if np.isnan(value) or np.isinf(value) else round(float(value), 4)
+
+    items = []
+    for i in selected:
+        row = rows[i]
+        declared_in_unit = bool(in_unit_deviation[i] <= tolerance) and not broken[i]
+        if broken[i]:
+            reason = "geometry is empty or malformed"
+        elif not mismatched[i]:
+            reason = "ok" if not np.isnan(declared[i]) else "no declared area"
+        elif declared_in_unit:
+            reason = f"area_sq_m holds the area in {row.unit}, not square metres"
+        else:
+            reason = f"declared area deviates from the geometry by {deviation[i] * 100:.1f}%"
+        items.append(AreaAuditItem(
+            property_id=row.id,
+            state=row.state,
+            unit=row.unit,
+            declared_area_sq_m=as_float(declared[i]),
+            geometric_area_sq_m=as_float(geometric[i]),
+            geometric_area_in_unit=as_float(geometric_in_unit[i]),
+            deviation=as_float(deviation[i]),
+            declared_in_unit=declared_in_unit,
+            reason=reason
+        ))
+    return items
+
+
+def audit_query(db: Session, state: Optional[str] = None, status: Optional[PropertyStatus] = None):
+    query = db.query(Property.id, Property.geom, Property.area_sq_m, Property.unit, Property.state)
+    if state is not None:
+        query = query.filter(Property.state == state)
+    if status is not None:
+        query = query.filter(Property.status == status)
+    return query
+
+
+def _batches(rows: Iterable, size: int):
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_area_audit(
+    db: Session,
+    tolerance: float = DEFAULT_TOLERANCE,
+    state: Optional[str] = None,
+    status: Optional[PropertyStatus] = None,
+    max_items: Optional[int] = None,
+    batch_size: int = AUDIT_BATCH_SIZE
+) -> AreaAuditReport:
+    """
+    Stream every matching property through the vectorized check and collect the mismatches.
+    `max_items` caps the returned list; counts are always complete.
+    """
+    started = time.perf_counter()
+    scanned = mismatched = 0
+    items: List[AreaAuditItem] = []
+
+    rows = audit_query(db, state, status).order_by(Property.id).yield_per(batch_size)
+    for batch in _batches(rows, batch_size):
+        found = audit_batch(batch, tolerance)
+        scanned += len(batch)
+        mismatched += len(found)
+        if max_items is None:
+            items.extend(found)
+        else:
+            items.extend(found[:max(max_items - len(items), 0)])
+
+    return AreaAuditReport(
+        scanned=scanned,
+        mismatched=mismatched,
+        tolerance=tolerance,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+        items=items,
+        items_truncated=mismatched > len(items)
+    )
+
+
+def flag_mismatches(db: Session, items: List[AreaAuditItem]) -> int:
+    """
+    Move mismatched properties to `flagged` with the audit reason, the same way a moderator's
+    status update does: a moderation event, an owner notification with its unread counter, the
+    lease released and status_changed/notification events published on commit, which is also
+    what clears the response caches of every worker. Already flagged rows are left alone.
+    """
+    flagged = 0
+    for batch in _batches(items, 1000):
+        # The self-join exposes each row's status before the update
+        rows = db.execute(
+            text("""
+                WITH flagged AS (
+                    UPDATE properties AS p
+                    SET status = 'flagged', flag_reason = v.reason, updated_at = now()
+                    FROM unnest(CAST(:ids AS integer[]), CAST(:reasons AS text[])) AS v(id, reason),
+                         properties AS old
+                    WHERE p.id = v.id AND old.id = p.id AND p.status IS DISTINCT FROM 'flagged'
+                    RETURNING p.id, p.user_id, coalesce(CAST(old.status AS text), 'pending') AS status_from, v.reason
+                ),
+                logged AS (
+                    INSERT INTO moderation_events (property_id, admin_id, action, status_from, status_to, reason)
+                    SELECT id, NULL, 'area_audit', status_from, 'flagged', reason FROM flagged
+                ),
+                released AS (
+                    DELETE FROM property_leases USING flagged WHERE property_leases.property_id = flagged.id
+                ),
+                notified AS (
+                    INSERT INTO notifications (user_id, property_id, status_change_from, status_change_to, created_at)
+                    SELECT user_id, id, CAST(status_from AS propertystatus), 'flagged', now() AT TIME ZONE 'utc'
+                    FROM flagged
+                    RETURNING id, user_id, property_id, status_change_from, status_change_to, created_at
+                ),
+                counted AS (
+                    INSERT INTO notification_counters (user_id, unread_count)
+                    SELECT user_id, count(*) FROM notified GROUP BY user_id
+                    ON CONFLICT (user_id) DO UPDATE
+                    SET unread_count = notification_counters.unread_count + EXCLUDED.unread_count
+                )
+                SELECT n.id, n.user_id, n.property_id, n.status_change_from, n.status_change_to, n.created_at, f.reason
+                FROM notified AS n JOIN flagged AS f ON f.id = n.property_id
+            """),
+            {
+                "ids": [item.property_id for item in batch],
+                "reasons": [f"Area check: {item.reason}" for item in batch],
+            }
+        ).fetchall()
+        events = []
+        for row in rows:
+            events.append(status_changed_event(row.property_id, row.user_id, row.status_change_from, row.status_change_to, row.reason))
+            events.append(notification_event(row))
+        # Delivered to listeners on commit
+        publish_events(db, events)
+        flagged += len(rows)
+    db.commit()
+    response_cache.invalidate()
+    return flagged
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Report (and optionally flag) properties whose declared area disagrees with geom")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--state")
+    parser.add_argument("--status", choices=[s.value for s in PropertyStatus])
+    parser.add_argument("--flag", action="store_true", help="Set status=flagged with the audit reason")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = run_area_audit(db, args.tolerance, args.state, PropertyStatus(args.status) if args.status else None)
+        print(report.model_dump_json(indent=2))
+        if args.flag:
+            print(f"Flagged {flag_mismatches(db, report.items)} properties")
+    finally:
+        db.close()
@@ -3,12 +3,12 @@ import json
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 import random
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from fastapi import BackgroundTasks, HTTPException, status,Depends
 from fastapi.security import OAuth2PasswordBearer
 from db.session import get_db_session
 from core.config import settings
 from typing import List
+from functools import lru_cache
 import bcrypt
 import smtplib
 from sqlalchemy.orm import Session
@@ -31,9 +31,13 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/admin/login")
 OTP_EXPIRY_SECONDS = int(os.getenv("OTP_EXPIRY_SECONDS", 300))  # OTP expiry time in seconds (e.g., 5 minutes)
 
 # Optionally, you can configure a custom SSL context
-context = ssl.create_default_context()
-context.check_hostname = False
-context.verify_mode = ssl.CERT_NONE
+@lru_cache(maxsize=None)
+def get_ssl_context() -> ssl.SSLContext:
+    # Loading the CA bundle costs tens of milliseconds, so it is only done when a context is needed
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
 
 # Password hashing setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -50,8 +54,12 @@ EMAIL_CONFIG = {
     "VALIDATE_CERTS":False
 }
 
-# Email configuration
-conf = ConnectionConfig(**EMAIL_CONFIG)
+# Email configuration, built on first send: fastapi_mail and its validators are slow to import
+@lru_cache(maxsize=None)
+def get_mail_config():
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(**EMAIL_CONFIG)
 
 
 def is_valid_password(password: str) -> bool:
@@ -104,13 +112,15 @@ def verify_jwt_token(token: str):
     
 # Send email asynchronously
 async def send_verification_email(email: str, token: str, background_tasks: BackgroundTasks):
+    from fastapi_mail import FastMail, MessageSchema
+
     message = MessageSchema(
         subject="Email Verification",
         recipients=[email],
         body=f"Your verification token is {token}",
         subtype="plain"
     )
-    fm = FastMail(conf)
+    fm = FastMail(get_mail_config())
     background_tasks.add_task(fm.send_message, message)
 
 def send_email(receiver_email, subject, message):
@@ -211,11 +221,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: int = payload.get("user_id")
         print(user_id)
-        if user_id is None:
+        # Refresh tokens are only good for /auth/admin/refresh
+        if user_id is None or payload.get("type") == "refresh":
             raise credentials_exception
             return None
         token_data = TokenData(user_id=user_id)
         return token_data.user_id
     except JWTError:
         raise credentials_exception
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,160 @@
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+import threading
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Short enough that other workers (which only hear about changes through the event channel)
+# are never far behind; long enough to absorb a dashboard stampede
+DEFAULT_TTL_SECONDS = 5
+MAX_ENTRIES = 512
+# Listing bodies range from a few KB to several MB, so the entry count alone does not bound memory
+MAX_BYTES = 64 * 1024 * 1024
+# Charged per entry on top of its bytes/str parts, for keys, tuples and small values
+ENTRY_OVERHEAD_BYTES = 256
+# Event types that make cached listings and counts stale
+INVALIDATING_EVENTS = {"status_changed"}
+
+
+def make_cache_key(request: Request, **params) -> Tuple:
+    """
+    Route template plus the endpoint's parsed parameters, so '?page=1&limit=20', '?limit=20'
+    and '?limit=20&page=1' all share an entry.
+    """
+    route = request.scope.get("route")
+    return (getattr(route, "path", request.url.path), tuple(sorted((k, str(v)) for k, v in params.items())))
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory held by a cached value: the length of its bytes and str parts plus a
+    fixed overhead. Exact enough to budget serialized bodies, which dominate.
+    """
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return ENTRY_OVERHEAD_BYTES + sum(estimate_size(part) for part in value)
+    return ENTRY_OVERHEAD_BYTES
+
+
+class ResponseCache:
+    """
+    In-process LRU + TTL cache with single-flight loading: concurrent misses for the same key
+    wait for one computation instead of each running their own queries. Bounded both by entry
+    count and by the total estimated size of the stored values; a value larger than the whole
+    byte budget is returned but not stored. `compute` is a blocking
+    function and runs in the threadpool; it must open its own session, because the request that
+    starts it may go away before it finishes.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires, value, size)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Bumped by every invalidation; results computed under an older generation are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.oversized = 0
+        self.invalidations = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any], bypass: bool = False) -> Any:
+        """
+        `bypass` computes a private result that is neither served from nor stored in the cache,
+        e.g. for a client that must read its own writes from the primary.
+        """
+        if bypass:
+            return await run_in_threadpool(compute)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                future = asyncio.ensure_future(run_in_threadpool(compute))
+                self._inflight[key] = future
+                future.add_done_callback(self._completion(key, self._generation))
+
+        # Shielded so a disconnecting client does not cancel the load for everyone else
+        return await asyncio.shield(future)
+
+    def _completion(self, key: Hashable, generation: int):
+        def done(future: asyncio.Future) -> None:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+                if future.cancelled() or future.exception() is not None or generation != self._generation:
+                    return
+                value = future.result()
+                size = estimate_size(value)
+                if size > self.max_bytes:
+                    self.oversized += 1
+                    return
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[2]
+                self._entries[key] = (time.monotonic() + self.ttl, value, size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= evicted[2]
+                    self.evictions += 1
+        return done
+
+    def invalidate(self) -> None:
+        """
+        Drop everything. Safe to call from any thread; loads already running finish for their
+        waiters but their results are discarded.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._inflight.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "oversized": self.oversized,
+                "invalidations": self.invalidations,
+                # Requests answered without running their own queries
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_on_event(event: dict) -> None:
+    """
+    Event broker listener: moderation changes on any worker clear this worker's cache.
+    """
+    if event.get("type") in INVALIDATING_EVENTS:
+        response_cache.invalidate()
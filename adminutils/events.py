@@ -0,0 +1,208 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from core.config import settings
+from datetime import datetime
+from typing import Callable, List, Optional, Set
+import threading
+import asyncio
+import logging
+import select
+import json
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "property_events"
+# Events buffered per client before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+# Seconds between LISTEN reconnect attempts after the connection drops
+RECONNECT_DELAY_SECONDS = 2
+# pg_notify rejects payloads of 8000 bytes or more, which would fail the publishing transaction
+MAX_PAYLOAD_BYTES = 7000
+# Free text carried in events; listeners fetch the full value from the property if they need it
+MAX_EVENT_TEXT_LENGTH = 500
+# Fields dropped when an event is still over the limit; ids and statuses always fit
+FREE_TEXT_FIELDS = ("flag_reason",)
+
+
+def _truncate(value: Optional[str]) -> Optional[str]:
+    if value is None or len(value) <= MAX_EVENT_TEXT_LENGTH:
+        return value
+    return value[:MAX_EVENT_TEXT_LENGTH - 1] + "\u2026"
+
+
+def encode_event(event: dict) -> str:
+    """
+    JSON payload for NOTIFY, guaranteed to stay under MAX_PAYLOAD_BYTES.
+    """
+    payload = json.dumps(event, default=str, separators=(",", ":"))
+    if len(payload.encode("utf-8")) >= MAX_PAYLOAD_BYTES:
+        event = {key: value for key, value in event.items() if key not in FREE_TEXT_FIELDS}
+        event["truncated"] = True
+        payload = json.dumps(event, default=str, separators=(",", ":"))
+    return payload
+
+
+def publish_event(db: Session, event: dict) -> None:
+    """
+    Queue an event on the moderation channel. Postgres only delivers it when the surrounding
+    transaction commits, so listeners never see changes that were rolled back.
+    """
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": EVENTS_CHANNEL, "payload": encode_event(event)})
+
+
+def publish_events(db: Session, events: List[dict]) -> None:
+    """
+    publish_event for many events in one round trip.
+    """
+    if events:
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": EVENTS_CHANNEL, "payloads": [encode_event(event) for event in events]}
+        )
+
+
+def status_changed_event(property_id: int, user_id: int, old_status, new_status, flag_reason: Optional[str] = None) -> dict:
+    return {
+        "type": "status_changed",
+        "property_id": property_id,
+        "user_id": user_id,
+        "from": getattr(old_status, "value", old_status),
+        "to": getattr(new_status, "value", new_status),
+        "flag_reason": _truncate(flag_reason),
+        "at": datetime.utcnow().isoformat(),
+    }
+
+
+def notification_event(notification) -> dict:
+    return {
+        "type": "notification",
+        "notification_id": notification.id,
+        "property_id": notification.property_id,
+        "user_id": notification.user_id,
+        "from": getattr(notification.status_change_from, "value", notification.status_change_from),
+        "to": getattr(notification.status_change_to, "value", notification.status_change_to),
+        "at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+class Subscription:
+    """
+    One connected client. Holds a bounded queue; when the client falls behind, the oldest
+    events are dropped and the next delivered event carries `lagged` so the client can resync.
+    """
+
+    def __init__(self, statuses: Optional[Set[str]] = None, types: Optional[Set[str]] = None,
+                 maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.statuses = statuses or set()
+        self.types = types or set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        if self.types and event.get("type") not in self.types:
+            return False
+        if self.statuses and event.get("from") not in self.statuses and event.get("to") not in self.statuses:
+            return False
+        return True
+
+    def offer(self, event: dict) -> None:
+        if not self.matches(event):
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        event = await self.queue.get()
+        if self.dropped:
+            event = {**event, "lagged": self.dropped}
+            self.dropped = 0
+        return event
+
+
+class EventBroker:
+    """
+    Per-worker fan-out of Postgres NOTIFY events. A single dedicated LISTEN connection is read
+    on a background thread and every payload is handed to the subscribed clients on the event loop.
+    """
+
+    def __init__(self, database_url: str, channel: str = EVENTS_CHANNEL):
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.subscribers: Set[Subscription] = set()
+        # In-process callbacks run on the event loop for every event, e.g. cache invalidation
+        self.listeners: List[Callable[[dict], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    async def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="property-events-listener", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join, 5)
+            self._thread = None
+
+    def subscribe(self, statuses: Optional[Set[str]] = None, types: Optional[Set[str]] = None) -> Subscription:
+        subscription = Subscription(statuses, types)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        self.listeners.append(listener)
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring malformed event payload: {payload[:200]}")
+            return
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Event listener {listener} failed: {str(e)}")
+        for subscription in list(self.subscribers):
+            subscription.offer(event)
+
+    def _listen(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                logger.info(f"Listening for {self.channel} notifications")
+                while not self._stopping.is_set():
+                    # Wake up regularly to notice shutdown
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self._loop.call_soon_threadsafe(self._dispatch, notify.payload)
+            except Exception as e:
+                logger.error(f"Event listener connection failed: {str(e)}")
+                self._stopping.wait(RECONNECT_DELAY_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+event_broker = EventBroker(settings.SQLALCHEMY_DATABASE_URL)
@@ -0,0 +1,213 @@
+from adminutils.property import get_polygon_coordinates, property_to_feature, iter_feature_collection, STREAM_CHUNK_SIZE
+from models.properties import Property
+from typing import Iterable, Iterator
+from io import StringIO
+from functools import partial
+import logging
+import json
+import csv
+
+# Flat column layout shared by the CSV and GeoParquet writers
+EXPORT_COLUMNS = [
+    "id", "property_name", "owner_name", "property_type", "price", "area_sq_m", "unit",
+    "murabba", "khasra", "khewat", "khata", "state", "district", "tehsil", "village",
+    "status", "verified", "available", "user_uploaded", "visits", "created_at", "updated_at",
+    "centroid_lon", "centroid_lat",
+]
+
+# Rows per Parquet row group; also the unit the GeoParquet writer flushes to the client
+PARQUET_ROW_GROUP_SIZE = 5000
+
+
+def property_to_row(prop: Property) -> dict:
+    from geoalchemy2.shape import to_shape
+
+    centroid = to_shape(prop.centroid) if prop.centroid else None
+    return {
+        "id": prop.id,
+        "property_name": prop.property_name,
+        "owner_name": prop.owner_name,
+        "property_type": prop.type,
+        "price": float(prop.price) if prop.price is not None else None,
+        "area_sq_m": float(prop.area_sq_m) if prop.area_sq_m is not None else None,
+        "unit": prop.unit,
+        "murabba": prop.murabba,
+        "khasra": prop.khasra,
+        "khewat": prop.khewat,
+        "khata": prop.khata,
+        "state": prop.state,
+        "district": prop.district,
+        "tehsil": prop.tehsil,
+        "village": prop.village,
+        "status": prop.status.value if prop.status else None,
+        "verified": prop.verified,
+        "available": prop.available,
+        "user_uploaded": prop.user_uploaded,
+        "visits": prop.visits,
+        "created_at": prop.created_at,
+        "updated_at": prop.updated_at,
+        "centroid_lon": centroid.x if centroid else None,
+        "centroid_lat": centroid.y if centroid else None,
+    }
+
+
+def property_to_shape(prop: Property):
+    """
+    Build a shapely Polygon from the stored geometry, or None when it is empty or malformed.
+    """
+    from shapely.geometry import shape
+
+    coordinates = get_polygon_coordinates(prop)
+    if not coordinates or not coordinates[0] or not coordinates[0][0]:
+        return None
+    try:
+        return shape({"type": "Polygon", "coordinates": coordinates})
+    except (ValueError, TypeError, AttributeError) as e:
+        logging.error(f"Error building geometry for property {prop.id}: {str(e)}")
+        return None
+
+
+def iter_ndjson(properties: Iterable[Property]) -> Iterator[bytes]:
+    """
+    Newline-delimited GeoJSON: one Feature per line.
+    """
+    buffer, buffered = [], 0
+    for prop in properties:
+        line = property_to_feature(prop, sign_images=False).model_dump_json().encode("utf-8") + b"\n"
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= STREAM_CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_csv_wkt(properties: Iterable[Property]) -> Iterator[bytes]:
+    """
+    CSV with the flat columns plus the polygon as WKT in a trailing `geometry_wkt` column.
+    """
+    output = StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(EXPORT_COLUMNS + ["geometry_wkt"])
+    for prop in properties:
+        row = property_to_row(prop)
+        polygon = property_to_shape(prop)
+        writer.writerow(
+            [row[column].isoformat() if hasattr(row[column], "isoformat") else row[column] for column in EXPORT_COLUMNS]
+            + [polygon.wkt if polygon is not None else None]
+        )
+        if output.tell() >= STREAM_CHUNK_SIZE:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate(0)
+    yield output.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """
+    Write-only file object handed to pyarrow; the generator drains it after each row group.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _geoparquet_schema():
+    import pyarrow as pa
+
+    fields = [
+        ("id", pa.int64()), ("property_name", pa.string()), ("owner_name", pa.string()),
+        ("property_type", pa.string()), ("price", pa.float64()), ("area_sq_m", pa.float64()),
+        ("unit", pa.string()), ("murabba", pa.int64()), ("khasra", pa.string()),
+        ("khewat", pa.string()), ("khata", pa.string()), ("state", pa.string()),
+        ("district", pa.string()), ("tehsil", pa.string()), ("village", pa.string()),
+        ("status", pa.string()), ("verified", pa.bool_()), ("available", pa.bool_()),
+        ("user_uploaded", pa.bool_()), ("visits", pa.int64()),
+        ("created_at", pa.timestamp("us")), ("updated_at", pa.timestamp("us")),
+        ("centroid_lon", pa.float64()), ("centroid_lat", pa.float64()),
+        ("geometry", pa.binary()),
+    ]
+    # "crs" is omitted on purpose: per the spec that means OGC:CRS84 (lon/lat WGS84)
+    geo_metadata = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        "columns": {
+            "geometry": {"encoding": "WKB", "geometry_types": ["Polygon"]},
+        },
+    }
+    return pa.schema(fields, metadata={b"geo": json.dumps(geo_metadata).encode("utf-8")})
+
+
+def geoparquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iter_geoparquet(properties: Iterable[Property], row_group_size: int = PARQUET_ROW_GROUP_SIZE) -> Iterator[bytes]:
+    """
+    GeoParquet 1.0 (WKB geometry column), written one row group at a time.
+    Requires pyarrow; check geoparquet_available() before starting the response.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _geoparquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+
+    def write_batch(rows):
+        columns = {name: [row[name] for row in rows] for name in schema.names}
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+    rows = []
+    try:
+        for prop in properties:
+            row = property_to_row(prop)
+            polygon = property_to_shape(prop)
+            row["geometry"] = polygon.wkb if polygon is not None else None
+            rows.append(row)
+            if len(rows) >= row_group_size:
+                write_batch(rows)
+                rows = []
+                yield sink.drain()
+        if rows:
+            write_batch(rows)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    # Signed URLs would expire long before an export is used, so they are left out
+    "geojson": (partial(iter_feature_collection, sign_images=False), "application/geo+json", "geojson"),
+    "ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+    "csv": (iter_csv_wkt, "text/csv", "csv"),
+    "geoparquet": (iter_geoparquet, "application/vnd.apache.parquet", "parquet"),
+}
@@ -0,0 +1,304 @@
+from typing import List
+import math
+
+# Mean Earth radius (IUGG), metres
+EARTH_RADIUS_M = 6371008.8
+
+# ~1 cm at the equator; anything finer is survey noise
+COORDINATE_PRECISION = 7
+
+
+class GeometryError(ValueError):
+    pass
+
+
+def ring_area_sq_m(ring: List[List[float]]) -> float:
+    """
+    Area of a closed lon/lat ring on the sphere, in square metres (always positive).
+    Spherical-excess approximation; well under 0.5% error for parcel-sized rings.
+    """
+    if ring and ring[0] != ring[-1]:
+        ring = list(ring) + [ring[0]]
+    if len(ring) < 4:
+        return 0.0
+    total = 0.0
+    for (lon1, lat1, *_), (lon2, lat2, *_) in zip(ring, ring[1:]):
+        total += math.radians(lon2 - lon1) * (2 + math.sin(math.radians(lat1)) + math.sin(math.radians(lat2)))
+    return abs(total * EARTH_RADIUS_M * EARTH_RADIUS_M / 2.0)
+
+
+def polygon_area_sq_m(coordinates: List[List[List[float]]]) -> float:
+    """
+    Area of a GeoJSON Polygon (exterior ring minus holes), in square metres.
+    """
+    if not coordinates:
+        return 0.0
+    area = ring_area_sq_m(coordinates[0])
+    for hole in coordinates[1:]:
+        area -= ring_area_sq_m(hole)
+    return max(area, 0.0)
+
+
+def normalize_polygon(geometry: dict) -> List[List[List[float]]]:
+    """
+    Validate and normalize a GeoJSON Polygon.
+    Repairs self-intersections, orients rings per RFC 7946 (exterior counter-clockwise) and rounds
+    coordinates. Returns the coordinates; raises GeometryError. Area and centroid are left to the
+    vectorized functions below, which measure a whole batch at once.
+    """
+    from shapely.geometry import shape, mapping, Polygon
+    from shapely.geometry.polygon import orient
+    from shapely.validation import make_valid
+
+    if not isinstance(geometry, dict) or geometry.get("type") != "Polygon":
+        raise GeometryError("geometry must be a GeoJSON Polygon")
+    try:
+        polygon = shape(geometry)
+    except (ValueError, TypeError, AttributeError, IndexError) as e:
+        raise GeometryError(f"invalid polygon coordinates: {e}")
+
+    if polygon.is_empty:
+        raise GeometryError("polygon is empty")
+    min_lon, min_lat, max_lon, max_lat = polygon.bounds
+    if min_lon < -180 or max_lon > 180 or min_lat < -90 or max_lat > 90:
+        raise GeometryError("coordinates must be [longitude, latitude] in WGS84")
+
+    if not polygon.is_valid:
+        polygon = make_valid(polygon)
+        if polygon.geom_type != "Polygon":
+            # Keep the dominant part when the repair only split off slivers
+            parts = [g for g in getattr(polygon, "geoms", []) if isinstance(g, Polygon) and not g.is_empty]
+            if not parts:
+                raise GeometryError("polygon could not be repaired")
+            parts.sort(key=lambda g: g.area, reverse=True)
+            if len(parts) > 1 and parts[1].area > parts[0].area * 0.01:
+                raise GeometryError("geometry is not a single polygon")
+            polygon = parts[0]
+
+    polygon = orient(polygon, sign=1.0)
+    return [
+        [[round(x, COORDINATE_PRECISION), round(y, COORDINATE_PRECISION)] for x, y, *_ in ring]
+        for ring in mapping(polygon)["coordinates"]
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Vectorized (NumPy) area / centroid for many polygons at once
+# ---------------------------------------------------------------------------
+
+class PackedPolygons:
+    """
+    Rings of many polygons flattened into contiguous coordinate arrays.
+    Every ring is closed; `ring_starts`/`ring_lengths` index into `x`/`y`, `ring_polygon` maps
+    each ring back to its polygon and `valid` marks polygons that had at least one usable ring.
+    """
+
+    def __init__(self, count, x, y, ring_starts, ring_lengths, ring_polygon, ring_is_hole, valid):
+        self.count = count
+        self.x = x
+        self.y = y
+        self.ring_starts = ring_starts
+        self.ring_lengths = ring_lengths
+        self.ring_polygon = ring_polygon
+        self.ring_is_hole = ring_is_hole
+        self.valid = valid
+
+
+def pack_polygons(polygons: List[List[List[List[float]]]]) -> PackedPolygons:
+    """
+    Flatten GeoJSON Polygon coordinate lists. Malformed polygons are skipped and marked invalid
+    instead of failing the whole batch.
+    """
+    import numpy as np
+
+    xs = []
+    ys = []
+    ring_lengths = []
+    ring_polygon = []
+    ring_is_hole = []
+    valid = np.zeros(len(polygons), dtype=bool)
+
+    for index, rings in enumerate(polygons):
+        try:
+            polygon_rings = []
+            for ring in rings or []:
+                if not ring or not ring[0]:
+                    continue
+                ring_x = [float(point[0]) for point in ring]
+                ring_y = [float(point[1]) for point in ring]
+                if ring_x[0] != ring_x[-1] or ring_y[0] != ring_y[-1]:
+                    ring_x.append(ring_x[0])
+                    ring_y.append(ring_y[0])
+                if len(ring_x) >= 4:
+                    polygon_rings.append((ring_x, ring_y))
+                elif not polygon_rings:
+                    # Without a usable exterior ring the holes mean nothing
+                    break
+        except (ValueError, TypeError, IndexError, KeyError):
+            continue
+        if not polygon_rings:
+            continue
+        valid[index] = True
+        for ring_index, (ring_x, ring_y) in enumerate(polygon_rings):
+            xs.extend(ring_x)
+            ys.extend(ring_y)
+            ring_lengths.append(len(ring_x))
+            ring_polygon.append(index)
+            ring_is_hole.append(ring_index > 0)
+
+    ring_lengths = np.array(ring_lengths, dtype=np.int64)
+    ring_starts = np.zeros(len(ring_lengths), dtype=np.int64)
+    if len(ring_lengths):
+        ring_starts[1:] = np.cumsum(ring_lengths)[:-1]
+
+    return PackedPolygons(
+        count=len(polygons),
+        x=np.array(xs, dtype=np.float64),
+        y=np.array(ys, dtype=np.float64),
+        ring_starts=ring_starts,
+        ring_lengths=ring_lengths,
+        ring_polygon=np.array(ring_polygon, dtype=np.int64),
+        ring_is_hole=np.array(ring_is_hole, dtype=bool),
+        valid=valid,
+    )
+
+
+def _edge_terms(packed: PackedPolygons, values):
+    """
+    Per-point edge values (point i -> i+1) with the edges that would jump between rings zeroed.
+    """
+    import numpy as np
+
+    terms = np.zeros(len(packed.x), dtype=np.float64)
+    terms[:-1] = values
+    terms[packed.ring_starts + packed.ring_lengths - 1] = 0.0
+    return terms
+
+
+def polygon_areas_sq_m(packed: PackedPolygons):
+    """
+    Geodesic (spherical) area of every packed polygon in square metres; NaN for invalid ones.
+    Same formula as ring_area_sq_m, evaluated for all edges of all rings in one pass.
+    """
+    import numpy as np
+
+    areas = np.full(packed.count, np.nan)
+    if not len(packed.x):
+        return areas
+
+    lon = np.radians(packed.x)
+    sin_lat = np.sin(np.radians(packed.y))
+    terms = _edge_terms(packed, (lon[1:] - lon[:-1]) * (2.0 + sin_lat[:-1] + sin_lat[1:]))
+    ring_areas = np.abs(np.add.reduceat(terms, packed.ring_starts)) * (EARTH_RADIUS_M * EARTH_RADIUS_M / 2.0)
+    signed = np.where(packed.ring_is_hole, -ring_areas, ring_areas)
+    totals = np.bincount(packed.ring_polygon, weights=signed, minlength=packed.count)
+    areas[packed.valid] = np.maximum(totals[packed.valid], 0.0)
+    return areas
+
+
+def polygon_centroids(packed: PackedPolygons):
+    """
+    Area-weighted centroid ([lon, lat] rows) of every packed polygon; NaN for invalid ones.
+    Computed in lon/lat (an affine map of any local equirectangular projection, so the centroid
+    is the same); coordinates are shifted to each polygon's first vertex to keep precision.
+    """
+    import numpy as np
+
+    centroids = np.full((packed.count, 2), np.nan)
+    if not len(packed.x):
+        return centroids
+
+    point_polygon = np.repeat(packed.ring_polygon, packed.ring_lengths)
+    first_ring = np.unique(packed.ring_polygon, return_index=True)[1]
+    origin_x = np.zeros(packed.count)
+    origin_y = np.zeros(packed.count)
+    owners = packed.ring_polygon[first_ring]
+    origin_x[owners] = packed.x[packed.ring_starts[first_ring]]
+    origin_y[owners] = packed.y[packed.ring_starts[first_ring]]
+    x = packed.x - origin_x[point_polygon]
+    y = packed.y - origin_y[point_polygon]
+
+    cross = _edge_terms(packed, x[:-1] * y[1:] - x[1:] * y[:-1])
+    cx_terms = _edge_terms(packed, (x[:-1] + x[1:]) * cross[:-1])
+    cy_terms = _edge_terms(packed, (y[:-1] + y[1:]) * cross[:-1])
+
+    ring_area = np.add.reduceat(cross, packed.ring_starts) / 2.0
+    # Normalize ring orientation: exteriors count positive, holes negative
+    sign = np.sign(ring_area) * np.where(packed.ring_is_hole, -1.0, 1.0)
+    area = np.bincount(packed.ring_polygon, weights=sign * ring_area, minlength=packed.count)
+    cx = np.bincount(packed.ring_polygon, weights=sign * np.add.reduceat(cx_terms, packed.ring_starts), minlength=packed.count)
+    cy = np.bincount(packed.ring_polygon, weights=sign * np.add.reduceat(cy_terms, packed.ring_starts), minlength=packed.count)
+
+    # Degenerate (zero-area) polygons fall back to the vertex mean
+    counts = np.bincount(point_polygon, minlength=packed.count)
+    mean_x = np.bincount(point_polygon, weights=x, minlength=packed.count) / np.maximum(counts, 1)
+    mean_y = np.bincount(point_polygon, weights=y, minlength=packed.count) / np.maximum(counts, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        degenerate = np.abs(area) < 1e-18
+        centroid_x = np.where(degenerate, mean_x, cx / (6.0 * area))
+        centroid_y = np.where(degenerate, mean_y, cy / (6.0 * area))
+
+    centroids[packed.valid, 0] = (centroid_x + origin_x)[packed.valid]
+    centroids[packed.valid, 1] = (centroid_y + origin_y)[packed.valid]
+    return centroids
+
+
+# ---------------------------------------------------------------------------
+# Area units
+# ---------------------------------------------------------------------------
+
+SQ_FT_TO_SQ_M = 0.09290304
+
+# Square metres per unit for units that do not vary by region
+SQ_M_PER_UNIT = {
+    "sq m": 1.0,
+    "sq ft": SQ_FT_TO_SQ_M,
+    "sq yd": 0.83612736,
+    "acre": 4046.8564224,
+    "hectare": 10000.0,
+    "kanal": 5445 * SQ_FT_TO_SQ_M,
+    "marla": 272.25 * SQ_FT_TO_SQ_M,
+}
+
+UNIT_ALIASES = {
+    "sqm": "sq m", "sq. m": "sq m", "sq.m": "sq m", "m2": "sq m", "square meter": "sq m",
+    "square metre": "sq m", "square meters": "sq m", "square metres": "sq m",
+    "sqft": "sq ft", "sq. ft": "sq ft", "square feet": "sq ft",
+    "sqyd": "sq yd", "sq. yd": "sq yd", "square yard": "sq yd", "square yards": "sq yd", "gaj": "sq yd",
+    "acres": "acre", "hectares": "hectare", "ha": "hectare",
+    "bighas": "bigha", "kanals": "kanal", "marlas": "marla",
+}
+
+# A bigha is a different size in each state (state revenue conversions, in square feet)
+BIGHA_SQ_FT_BY_STATE = {
+    "assam": 14400,
+    "bihar": 27220,
+    "gujarat": 17427,
+    "haryana": 27225,
+    "himachal pradesh": 8712,
+    "jharkhand": 27220,
+    "madhya pradesh": 12000,
+    "punjab": 9070,
+    "rajasthan": 27225,
+    "uttar pradesh": 27000,
+    "uttarakhand": 6804,
+    "west bengal": 14400,
+}
+DEFAULT_BIGHA_SQ_FT = 27225
+
+
+def normalize_unit(unit: str) -> str:
+    name = " ".join((unit or "").strip().lower().split())
+    return UNIT_ALIASES.get(name, name)
+
+
+def sq_m_per_unit(unit: str, state: str = None):
+    """
+    Square metres in one `unit` (bigha resolved per `state`), or None for an unknown unit.
+    """
+    name = normalize_unit(unit)
+    if name == "bigha":
+        state_name = " ".join((state or "").strip().lower().split())
+        return BIGHA_SQ_FT_BY_STATE.get(state_name, DEFAULT_BIGHA_SQ_FT) * SQ_FT_TO_SQ_M
+    return SQ_M_PER_UNIT.get(name)
+
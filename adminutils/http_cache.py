@@ -0,0 +1,82 @@
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from models.properties import Property
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+import hashlib
+
+# Clients may keep a copy but must revalidate before every reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def get_window_version(db: Session, *criteria) -> Tuple[Optional[datetime], int]:
+    """
+    Return (max(updated_at), row count) for the rows matching the given filters.
+    Any insert, update or delete inside the window changes at least one of the two.
+    """
+    max_updated_at, row_count = db.query(
+        func.max(Property.updated_at),
+        func.count(Property.id)
+    ).filter(*criteria).one()
+    return max_updated_at, row_count
+
+
+def build_etag(*parts) -> str:
+    # Weak validator: the body may be re-encoded (e.g. compressed) on the way out
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since for a GET request.
+    If-None-Match takes precedence when both are present (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {_strip_weak(tag) for tag in if_none_match.split(",")}
+        return _strip_weak(etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _to_naive_utc(last_modified) <= _to_naive_utc(since)
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        # updated_at is stored as a naive UTC timestamp
+        headers["Last-Modified"] = format_datetime(
+            last_modified.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True
+        )
+    return headers
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    for name, value in validator_headers(etag, last_modified).items():
+        response.headers[name] = value
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
@@ -0,0 +1,506 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from adminutils.geometry import normalize_polygon, pack_polygons, polygon_areas_sq_m, polygon_centroids, COORDINATE_PRECISION, GeometryError
+from models.properties import PropertyStatus
+from schemas.properties import ImportFormat, ImportReport, ImportRowError
+from decimal import Decimal, InvalidOperation
+from io import StringIO
+from typing import Iterator, Iterable, TextIO, Tuple, List, Optional
+import logging
+import json
+import time
+import csv
+
+logger = logging.getLogger(__name__)
+
+# Records validated and loaded per COPY + merge round
+IMPORT_BATCH_SIZE = 5000
+# Per-row errors kept in the report; the failure count is always exact
+MAX_REPORTED_ERRORS = 1000
+# Largest single GeoJSON feature (or other top-level member) the streaming reader will buffer
+MAX_FEATURE_CHARS = 16 * 1024 * 1024
+# A decode error this close to the end of the buffer may just be a literal cut by the chunk boundary
+TRUNCATION_SLACK = 32
+
+# Text columns and their width in `properties`
+TEXT_COLUMNS = {
+    "property_name": 255, "owner_name": 255, "type": 100, "unit": 50,
+    "khasra": 255, "khewat": 250, "khata": 250,
+    "owner_details_en": None, "owner_details_hi": None,
+    "state": 100, "district": 100, "tehsil": 100, "village": 100,
+    "landmark": 255, "phone": 20, "email": 255,
+}
+
+STAGING_COLUMNS = [
+    "row_number", "property_name", "owner_name", "type", "price", "area_sq_m", "unit", "murabba",
+    "khasra", "khewat", "khata", "owner_details_en", "owner_details_hi", "state", "district",
+    "tehsil", "village", "landmark", "phone", "email", "geom", "centroid_lon", "centroid_lat",
+]
+
+# Rows are deleted at every commit, i.e. after each batch
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS properties_import_staging (
+        row_number integer,
+        property_name varchar(255),
+        owner_name varchar(255),
+        type varchar(100),
+        price numeric(12, 2),
+        area_sq_m numeric(10, 2),
+        unit varchar(50),
+        murabba integer,
+        khasra varchar(255),
+        khewat varchar(250),
+        khata varchar(250),
+        owner_details_en text,
+        owner_details_hi text,
+        state varchar(100),
+        district varchar(100),
+        tehsil varchar(100),
+        village varchar(100),
+        landmark varchar(255),
+        phone varchar(20),
+        email varchar(255),
+        geom jsonb,
+        centroid_lon double precision,
+        centroid_lat double precision
+    ) ON COMMIT DELETE ROWS
+"""
+
+PROPERTY_NAME_INDEX = STAGING_COLUMNS.index("property_name")
+AREA_INDEX = STAGING_COLUMNS.index("area_sq_m")
+CENTROID_LON_INDEX = STAGING_COLUMNS.index("centroid_lon")
+CENTROID_LAT_INDEX = STAGING_COLUMNS.index("centroid_lat")
+# numeric(10, 2)
+MAX_AREA_SQ_M = Decimal("1e8")
+
+COPY_SQL = f"COPY properties_import_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Upsert on the property_name unique key. Moderation state (status, verified, visits) is left
+# alone on existing rows; xmax = 0 distinguishes inserts from updates. A record whose land-record
+# key belongs to another property violates ux_properties_land_record and is reported per row.
+MERGE_SQL = """
+    INSERT INTO properties (
+        property_name, owner_name, type, price, area_sq_m, unit, murabba, khasra, khewat, khata,
+        owner_details_en, owner_details_hi, state, district, tehsil, village, landmark, phone, email,
+        geom, centroid, status, user_id, user_uploaded, verified, available, visits
+    )
+    SELECT
+        property_name, owner_name, type, price, area_sq_m, unit, murabba, khasra, khewat, khata,
+        owner_details_en, owner_details_hi, state, district, tehsil, village, landmark, phone, email,
+        geom, ST_SetSRID(ST_MakePoint(centroid_lon, centroid_lat), 4326)::geography,
+        CAST(:status AS propertystatus), :user_id, false, false, true, 0
+    FROM properties_import_staging
+    ORDER BY row_number
+    ON CONFLICT (property_name) DO UPDATE SET
+        owner_name = EXCLUDED.owner_name,
+        type = EXCLUDED.type,
+        price = EXCLUDED.price,
+        area_sq_m = EXCLUDED.area_sq_m,
+        unit = EXCLUDED.unit,
+        murabba = EXCLUDED.murabba,
+        khasra = EXCLUDED.khasra,
+        khewat = EXCLUDED.khewat,
+        khata = EXCLUDED.khata,
+        owner_details_en = EXCLUDED.owner_details_en,
+        owner_details_hi = EXCLUDED.owner_details_hi,
+        state = EXCLUDED.state,
+        district = EXCLUDED.district,
+        tehsil = EXCLUDED.tehsil,
+        village = EXCLUDED.village,
+        landmark = EXCLUDED.landmark,
+        phone = EXCLUDED.phone,
+        email = EXCLUDED.email,
+        geom = EXCLUDED.geom,
+        centroid = EXCLUDED.centroid,
+        updated_at = now()
+    RETURNING (xmax = 0) AS inserted
+"""
+
+
+class ImportRowInvalid(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Input readers: each yields (row_number, record dict or exception)
+# ---------------------------------------------------------------------------
+
+def iter_feature_collection_records(
+    stream: TextIO, chunk_size: int = 1 << 16, max_value_size: int = MAX_FEATURE_CHARS
+) -> Iterator[Tuple[int, dict]]:
+    """
+    Incrementally walk the `features` array of a GeoJSON FeatureCollection without loading the file.
+    Only the feature being decoded is held in memory; malformed JSON, or a single value larger
+    than `max_value_size` characters, is a ValueError.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+
+    def read_more() -> bool:
+        nonlocal buffer, pos
+        # Reads grow with the pending value, so re-decoding a large feature stays linear overall
+        chunk = stream.read(max(chunk_size, len(buffer) - pos))
+        if not chunk:
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def next_char(skip: str = " \t\r\n") -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in skip:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read_more():
+                return None
+
+    def decode_value():
+        nonlocal pos
+        if next_char() is None:
+            raise ValueError("unexpected end of input")
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+                return value
+            except json.JSONDecodeError as e:
+                # Only an error at the very end of the buffer means the value continues in the
+                # next chunk (a string still open, or a literal cut short); anything else is bad input
+                truncated = e.msg.startswith("Unterminated string") or e.pos >= len(buffer) - TRUNCATION_SLACK
+                if not truncated:
+                    raise ValueError(f"invalid JSON: {e.msg}")
+                if len(buffer) - pos > max_value_size:
+                    raise ValueError(f"a value is larger than {max_value_size} characters")
+                if not read_more():
+                    raise ValueError(f"unexpected end of input: {e.msg}")
+
+    if next_char() != "{":
+        raise ValueError("input is not a GeoJSON object")
+    pos += 1
+    # Top-level members in order, so a "features" key nested in another member is never mistaken for it
+    while True:
+        char = next_char(" \t\r\n,")
+        if char is None:
+            raise ValueError("unexpected end of input")
+        if char == "}":
+            raise ValueError('input has no "features" array')
+        key = decode_value()
+        if not isinstance(key, str) or next_char() != ":":
+            raise ValueError("input is not a valid JSON object")
+        pos += 1
+        if key == "features":
+            if next_char() != "[":
+                raise ValueError('"features" is not an array')
+            pos += 1
+            break
+        decode_value()
+
+    row_number = 0
+    while True:
+        char = next_char(" \t\r\n,")
+        if char is None:
+            raise ValueError('unexpected end of input inside "features"')
+        if char == "]":
+            return
+        try:
+            feature = decode_value()
+        except ValueError as e:
+            raise ValueError(f"feature {row_number + 1}: {e}")
+        row_number += 1
+        yield row_number, feature
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def iter_ndjson_records(stream: TextIO) -> Iterator[Tuple[int, object]]:
+    row_number = 0
+    for line in stream:
+        line = line.strip().lstrip("\x1e")  # tolerate RFC 8142 record separators
+        if not line:
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ImportRowInvalid(f"invalid JSON: {e}")
+
+
+def iter_csv_records(stream: TextIO) -> Iterator[Tuple[int, object]]:
+    """
+    CSV rows using the export column names; geometry comes from `geometry_wkt` or a GeoJSON `geom` column.
+    """
+    reader = csv.DictReader(stream)
+    rows = enumerate(reader, start=1)
+    while True:
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # NUL bytes, oversized fields, a quote left open at EOF: the rest cannot be parsed
+            raise ValueError(f"unreadable CSV at line {reader.line_num}: {e}")
+        try:
+            geometry = None
+            if row.get("geometry_wkt"):
+                from shapely import wkt
+                from shapely.geometry import mapping
+                geometry = mapping(wkt.loads(row["geometry_wkt"]))
+            elif row.get("geom"):
+                geometry = json.loads(row["geom"])
+            properties = {k: (v if v != "" else None) for k, v in row.items() if k not in ("geometry_wkt", "geom")}
+            yield row_number, {"type": "Feature", "geometry": geometry, "properties": properties}
+        except Exception as e:
+            yield row_number, ImportRowInvalid(f"invalid row: {e}")
+
+
+def iter_import_records(stream: TextIO, import_format: ImportFormat) -> Iterator[Tuple[int, object]]:
+    if import_format == ImportFormat.geojson:
+        return iter_feature_collection_records(stream)
+    if import_format == ImportFormat.ndjson:
+        return iter_ndjson_records(stream)
+    return iter_csv_records(stream)
+
+
+# ---------------------------------------------------------------------------
+# Validation / normalization
+# ---------------------------------------------------------------------------
+
+def _decimal(value, name: str, limit: Decimal) -> Optional[Decimal]:
+    if value is None or value == "":
+        return None
+    try:
+        number = Decimal(str(value)).quantize(Decimal("0.01"))
+    except InvalidOperation:
+        raise ImportRowInvalid(f"{name} is not a number")
+    if abs(number) >= limit:
+        raise ImportRowInvalid(f"{name} is out of range")
+    return number
+
+
+def normalize_record(row_number: int, record: dict) -> Tuple[list, List[List[List[float]]]]:
+    """
+    Turn one GeoJSON Feature into a staging row and its polygon coordinates; raises
+    ImportRowInvalid with a readable reason. Area and centroid are filled in by measure_batch.
+    """
+    if not isinstance(record, dict):
+        raise ImportRowInvalid("record is not a JSON object")
+    attributes = record.get("properties") or {}
+    if not isinstance(attributes, dict):
+        raise ImportRowInvalid("properties must be an object")
+
+    try:
+        coordinates = normalize_polygon(record.get("geometry"))
+    except GeometryError as e:
+        raise ImportRowInvalid(str(e))
+
+    values = {}
+    for column, width in TEXT_COLUMNS.items():
+        # Accept the API field name for `type` as well
+        value = attributes.get(column, attributes.get("property_type") if column == "type" else None)
+        if value is not None:
+            value = str(value).strip() or None
+        if value is not None and width is not None and len(value) > width:
+            raise ImportRowInvalid(f"{column} is longer than {width} characters")
+        values[column] = value
+    if values["property_name"] is None:
+        # ON CONFLICT never matches a NULL key, so a re-import would insert the row again
+        raise ImportRowInvalid("property_name is required; re-imports are matched on it")
+
+    murabba = attributes.get("murabba")
+    if murabba not in (None, ""):
+        try:
+            murabba = int(murabba)
+        except (TypeError, ValueError):
+            raise ImportRowInvalid("murabba is not an integer")
+    else:
+        murabba = None
+
+    values.update({
+        "row_number": row_number,
+        "price": _decimal(attributes.get("price"), "price", Decimal("1e10")),
+        "area_sq_m": None,
+        "murabba": murabba,
+        "geom": json.dumps({"type": "Polygon", "coordinates": coordinates}, separators=(",", ":")),
+        "centroid_lon": None,
+        "centroid_lat": None,
+    })
+    return [values[column] for column in STAGING_COLUMNS], coordinates
+
+
+def measure_batch(rows: List[list], polygons: List[List[List[List[float]]]]) -> Tuple[List[list], List[ImportRowError]]:
+    """
+    Fill in geodesic area and centroid for a whole batch in one vectorized pass. Rows whose area
+    does not fit the column are dropped and reported.
+    """
+    packed = pack_polygons(polygons)
+    areas = polygon_areas_sq_m(packed)
+    centroids = polygon_centroids(packed)
+
+    measured, errors = [], []
+    for row, area, (centroid_lon, centroid_lat) in zip(rows, areas, centroids):
+        if not area < float(MAX_AREA_SQ_M):
+            errors.append(ImportRowError(row=row[0], error="polygon area is out of range"))
+            continue
+        row[AREA_INDEX] = Decimal(float(area)).quantize(Decimal("0.01"))
+        row[CENTROID_LON_INDEX] = round(float(centroid_lon), COORDINATE_PRECISION)
+        row[CENTROID_LAT_INDEX] = round(float(centroid_lat), COORDINATE_PRECISION)
+        measured.append(row)
+    return measured, errors
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def _copy_and_merge(db: Session, rows: List[list], user_id: int, status: PropertyStatus) -> Tuple[int, int]:
+    buffer = StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    buffer.seek(0)
+
+    connection = db.connection()
+    connection.exec_driver_sql(STAGING_DDL)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(COPY_SQL, buffer)
+    finally:
+        cursor.close()
+    results = connection.execute(text(MERGE_SQL), {"status": status.value, "user_id": user_id}).fetchall()
+    db.commit()
+
+    inserted = sum(1 for (was_inserted,) in results if was_inserted)
+    return inserted, len(results) - inserted
+
+
+def load_batch(db: Session, rows: List[list], user_id: int, status: PropertyStatus) -> Tuple[int, int, List[ImportRowError]]:
+    """
+    COPY a batch into the staging table and merge it. If the database rejects the batch,
+    retry row by row so one bad record only costs itself.
+    """
+    try:
+        inserted, updated = _copy_and_merge(db, rows, user_id, status)
+        return inserted, updated, []
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Import batch of {len(rows)} rows failed ({e}); retrying row by row")
+
+    inserted = updated = 0
+    errors = []
+    for row in rows:
+        try:
+            row_inserted, row_updated = _copy_and_merge(db, [row], user_id, status)
+            inserted += row_inserted
+            updated += row_updated
+        except Exception as e:
+            db.rollback()
+            errors.append(ImportRowError(row=row[0], error=str(getattr(e, "orig", e)).strip()))
+    return inserted, updated, errors
+
+
+def run_import(
+    db: Session,
+    records: Iterable[Tuple[int, object]],
+    user_id: int,
+    status: PropertyStatus = PropertyStatus.pending,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportReport:
+    started = time.perf_counter()
+    rows_read = inserted = updated = failed = 0
+    errors: List[ImportRowError] = []
+
+    def record_errors(new_errors):
+        nonlocal failed
+        failed += len(new_errors)
+        errors.extend(new_errors[:max(MAX_REPORTED_ERRORS - len(errors), 0)])
+
+    batch: List[list] = []
+    batch_polygons: List[List[List[List[float]]]] = []
+    batch_names = {}
+
+    def flush():
+        nonlocal inserted, updated, batch, batch_polygons, batch_names
+        if batch:
+            rows, measure_errors = measure_batch(batch, batch_polygons)
+            record_errors(measure_errors)
+            if rows:
+                batch_inserted, batch_updated, batch_errors = load_batch(db, rows, user_id, status)
+                inserted += batch_inserted
+                updated += batch_updated
+                record_errors(batch_errors)
+            logger.info(f"Imported {rows_read} rows ({rows_read / (time.perf_counter() - started):.0f} rows/sec)")
+        batch, batch_polygons, batch_names = [], [], {}
+
+    input_error = None
+    iterator = iter(records)
+    while True:
+        try:
+            row_number, record = next(iterator)
+        except StopIteration:
+            break
+        except ValueError as e:
+            # The input itself became unreadable; what was read before it is still loaded
+            input_error = str(e)
+            break
+        rows_read += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            row, coordinates = normalize_record(row_number, record)
+        except ImportRowInvalid as e:
+            record_errors([ImportRowError(row=row_number, error=str(e))])
+            continue
+
+        # ON CONFLICT cannot touch the same key twice in one statement: the later record wins
+        property_name = row[PROPERTY_NAME_INDEX]
+        if property_name in batch_names:
+            previous = batch_names[property_name]
+            record_errors([ImportRowError(row=batch[previous][0], error=f"superseded by row {row_number} with the same property_name")])
+            batch[previous] = row
+            batch_polygons[previous] = coordinates
+            continue
+        batch_names[property_name] = len(batch)
+        batch.append(row)
+        batch_polygons.append(coordinates)
+
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    elapsed = time.perf_counter() - started
+    return ImportReport(
+        rows_read=rows_read,
+        rows_inserted=inserted,
+        rows_updated=updated,
+        rows_failed=failed,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_sec=round(rows_read / elapsed, 1) if elapsed > 0 else 0.0,
+        errors=errors,
+        errors_truncated=failed > len(errors),
+        input_error=input_error
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk import properties from GeoJSON, NDJSON or CSV")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat], default=ImportFormat.geojson.value)
+    parser.add_argument("--user-id", type=int, required=True, help="Owner recorded on inserted rows")
+    parser.add_argument("--status", choices=[s.value for s in PropertyStatus], default=PropertyStatus.pending.value)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = run_import(
+                db,
+                iter_import_records(stream, ImportFormat(args.format)),
+                user_id=args.user_id,
+                status=PropertyStatus(args.status),
+                batch_size=args.batch_size
+            )
+        print(report.model_dump_json(indent=2))
+    finally:
+        db.close()
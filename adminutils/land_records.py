@@ -0,0 +1,156 @@
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import text
+from models.properties import Property
+from schemas.properties import ImportRowError, LandRecordMatch, LandRecordBatchReport
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+import csv
+
+LAND_RECORD_COLUMNS = ("state", "district", "tehsil", "village", "murabba", "khasra", "khewat")
+# tehsil, murabba and khewat are often unknown in the field; left out, they match any value
+REQUIRED_COLUMNS = ("state", "district", "village", "khasra")
+# Largest batch lookup answered in one query
+MAX_LOOKUP_ROWS = 5000
+
+# The expressions of ux_properties_land_record (db/migrations/008) and
+# ix_properties_land_record_lookup (011), verbatim: the planner only uses an expression index
+# when the query repeats its expressions. The lookup index covers the required parts, so rows
+# that leave tehsil or murabba out still get an index probe on village and khasra.
+LAND_RECORD_KEY = {
+    "state": "coalesce(properties.state, '')",
+    "district": "coalesce(properties.district, '')",
+    "tehsil": "coalesce(properties.tehsil, '')",
+    "village": "coalesce(properties.village, '')",
+    "murabba": "coalesce(properties.murabba, -1)",
+    "khasra": "properties.khasra",
+    "khewat": "coalesce(properties.khewat, '')",
+}
+
+# Every row of the batch against the index in one statement; optional parts left empty in a
+# row match anything
+BATCH_LOOKUP_SQL = f"""
+    SELECT k.row_number, properties.id
+    FROM unnest(
+        CAST(:row_numbers AS integer[]), CAST(:states AS text[]), CAST(:districts AS text[]),
+        CAST(:tehsils AS text[]), CAST(:villages AS text[]), CAST(:murabbas AS integer[]),
+        CAST(:khasras AS text[]), CAST(:khewats AS text[])
+    ) AS k(row_number, state, district, tehsil, village, murabba, khasra, khewat)
+    JOIN properties
+      ON {LAND_RECORD_KEY["state"]} = k.state
+     AND {LAND_RECORD_KEY["district"]} = k.district
+     AND (k.tehsil IS NULL OR {LAND_RECORD_KEY["tehsil"]} = k.tehsil)
+     AND {LAND_RECORD_KEY["village"]} = k.village
+     AND (k.murabba IS NULL OR {LAND_RECORD_KEY["murabba"]} = k.murabba)
+     AND {LAND_RECORD_KEY["khasra"]} = k.khasra
+     AND (k.khewat IS NULL OR {LAND_RECORD_KEY["khewat"]} = k.khewat)
+    WHERE properties.khasra IS NOT NULL
+    ORDER BY k.row_number, properties.id
+"""
+
+
+class LandRecordInvalid(ValueError):
+    pass
+
+
+def normalize_land_record(values: Dict[str, object]) -> Dict[str, object]:
+    """
+    Stripped key parts, None for the ones not given; raises LandRecordInvalid with a readable reason.
+    """
+    record: Dict[str, object] = {}
+    for column in LAND_RECORD_COLUMNS:
+        value = values.get(column)
+        record[column] = (str(value).strip() or None) if value is not None else None
+
+    missing = [column for column in REQUIRED_COLUMNS if record[column] is None]
+    if missing:
+        raise LandRecordInvalid(f"missing {', '.join(missing)}")
+    if record["murabba"] is not None:
+        try:
+            record["murabba"] = int(record["murabba"])
+        except ValueError:
+            raise LandRecordInvalid("murabba is not an integer")
+    return record
+
+
+def find_land_records(db: Session, record: Dict[str, object]) -> List[Property]:
+    """
+    Parcels matching one normalized land record, served from ux_properties_land_record when
+    every key part is given (at most one match) and from ix_properties_land_record_lookup otherwise.
+    """
+    conditions = ["properties.khasra IS NOT NULL"] + [
+        f"{LAND_RECORD_KEY[column]} = :{column}"
+        for column in LAND_RECORD_COLUMNS
+        if record[column] is not None
+    ]
+    return (
+        db.query(Property)
+        .options(selectinload(Property.images))
+        .filter(text(" AND ".join(conditions)).bindparams(
+            **{column: value for column, value in record.items() if value is not None}
+        ))
+        .order_by(Property.id)
+        .all()
+    )
+
+
+def iter_lookup_rows(stream: TextIO, defaults: Dict[str, Optional[str]]) -> Iterator[Tuple[int, object]]:
+    """
+    CSV rows using the land-record column names. `defaults` fill the columns a row leaves empty,
+    so a list of khasra numbers from one village needs no other columns.
+    """
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None or "khasra" not in reader.fieldnames:
+        raise ValueError("CSV needs a header row with a khasra column")
+    for row_number, row in enumerate(reader, start=1):
+        values = {column: row.get(column) or defaults.get(column) for column in LAND_RECORD_COLUMNS}
+        try:
+            yield row_number, normalize_land_record(values)
+        except LandRecordInvalid as e:
+            yield row_number, e
+
+
+def batch_lookup(db: Session, rows: List[Tuple[int, Dict[str, object]]]) -> Dict[int, List[int]]:
+    """
+    Property ids per row number for many land records in a single query.
+    """
+    if not rows:
+        return {}
+    params = {"row_numbers": [row_number for row_number, _ in rows]}
+    for column in LAND_RECORD_COLUMNS:
+        params[f"{column}s"] = [record[column] for _, record in rows]
+    matches: Dict[int, List[int]] = {}
+    for row_number, property_id in db.execute(text(BATCH_LOOKUP_SQL), params):
+        matches.setdefault(row_number, []).append(property_id)
+    return matches
+
+
+def run_batch_lookup(db: Session, rows: Iterator[Tuple[int, object]], max_rows: int = MAX_LOOKUP_ROWS) -> LandRecordBatchReport:
+    """
+    Look up every record of an upload. Invalid rows are reported individually; more than
+    `max_rows` rows is a ValueError.
+    """
+    records: List[Tuple[int, Dict[str, object]]] = []
+    errors: List[ImportRowError] = []
+    rows_read = 0
+    for row_number, record in rows:
+        rows_read += 1
+        if rows_read > max_rows:
+            raise ValueError(f"at most {max_rows} rows can be looked up at once")
+        if isinstance(record, Exception):
+            errors.append(ImportRowError(row=row_number, error=str(record)))
+        else:
+            records.append((row_number, record))
+
+    matches = batch_lookup(db, records)
+    items = [
+        LandRecordMatch(row=row_number, khasra=record["khasra"], property_ids=matches.get(row_number, []))
+        for row_number, record in records
+    ]
+    matched = sum(1 for item in items if item.property_ids)
+    return LandRecordBatchReport(
+        rows_read=rows_read,
+        rows_matched=matched,
+        rows_unmatched=len(items) - matched,
+        rows_failed=len(errors),
+        items=items,
+        errors=errors
+    )
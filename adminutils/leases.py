@@ -0,0 +1,110 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from schemas.properties import LeaseInfo
+from typing import List
+
+# How long a claimed property stays reserved for the admin who claimed it
+DEFAULT_LEASE_SECONDS = 300
+MAX_LEASE_SECONDS = 3600
+MAX_CLAIM_SIZE = 50
+
+# Rows another transaction is claiming are skipped rather than waited on, so concurrent admins
+# each get a disjoint set. Leases that have expired are taken over in place.
+CLAIM_SQL = text("""
+    WITH candidates AS (
+        SELECT p.id
+        FROM properties p
+        WHERE p.status = 'pending'
+          AND p.user_uploaded = true
+          AND NOT EXISTS (
+              SELECT 1 FROM property_leases l
+              WHERE l.property_id = p.id AND l.expires_at > now()
+          )
+        ORDER BY p.created_at
+        LIMIT :limit
+        FOR NO KEY UPDATE OF p SKIP LOCKED
+    )
+    INSERT INTO property_leases (property_id, admin_id, leased_at, expires_at)
+    SELECT id, :admin_id, now(), now() + make_interval(secs => :lease_seconds)
+    FROM candidates
+    ON CONFLICT (property_id) DO UPDATE
+        SET admin_id = EXCLUDED.admin_id,
+            leased_at = EXCLUDED.leased_at,
+            expires_at = EXCLUDED.expires_at
+        WHERE property_leases.expires_at <= now()
+    RETURNING property_id, expires_at
+""")
+
+RENEW_SQL = text("""
+    UPDATE property_leases
+    SET expires_at = now() + make_interval(secs => :lease_seconds)
+    WHERE admin_id = :admin_id
+      AND property_id = ANY(:property_ids)
+      AND expires_at > now()
+    RETURNING property_id, expires_at
+""")
+
+RELEASE_SQL = text("""
+    DELETE FROM property_leases
+    WHERE admin_id = :admin_id AND property_id = ANY(:property_ids)
+    RETURNING property_id
+""")
+
+
+def clamp_lease_seconds(lease_seconds) -> int:
+    if not lease_seconds:
+        return DEFAULT_LEASE_SECONDS
+    return max(30, min(int(lease_seconds), MAX_LEASE_SECONDS))
+
+
+def claim_pending(db: Session, admin_id: int, limit: int, lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[LeaseInfo]:
+    """
+    Lease up to `limit` pending properties (oldest first) to `admin_id`.
+    """
+    rows = db.execute(CLAIM_SQL, {
+        "admin_id": admin_id,
+        "limit": max(1, min(limit, MAX_CLAIM_SIZE)),
+        "lease_seconds": clamp_lease_seconds(lease_seconds),
+    }).fetchall()
+    db.commit()
+    return [LeaseInfo(property_id=row.property_id, expires_at=row.expires_at) for row in rows]
+
+
+def renew_leases(db: Session, admin_id: int, property_ids: List[int], lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[LeaseInfo]:
+    """
+    Extend the admin's still-valid leases. Expired leases are not revived: the property may
+    already belong to someone else.
+    """
+    rows = db.execute(RENEW_SQL, {
+        "admin_id": admin_id,
+        "property_ids": property_ids,
+        "lease_seconds": clamp_lease_seconds(lease_seconds),
+    }).fetchall()
+    db.commit()
+    return [LeaseInfo(property_id=row.property_id, expires_at=row.expires_at) for row in rows]
+
+
+def release_leases(db: Session, admin_id: int, property_ids: List[int]) -> List[int]:
+    rows = db.execute(RELEASE_SQL, {"admin_id": admin_id, "property_ids": property_ids}).fetchall()
+    db.commit()
+    return [row.property_id for row in rows]
+
+
+def get_active_leases(db: Session, admin_id: int) -> List[LeaseInfo]:
+    rows = db.execute(
+        text("""
+            SELECT property_id, expires_at FROM property_leases
+            WHERE admin_id = :admin_id AND expires_at > now()
+            ORDER BY expires_at
+        """),
+        {"admin_id": admin_id}
+    ).fetchall()
+    return [LeaseInfo(property_id=row.property_id, expires_at=row.expires_at) for row in rows]
+
+
+def end_lease(db: Session, property_id: int) -> None:
+    """
+    Drop the lease of a property that has been moderated. Runs inside the caller's transaction.
+    """
+    db.execute(text("DELETE FROM property_leases WHERE property_id = :property_id"), {"property_id": property_id})
+
@@ -0,0 +1,105 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, tuple_
+from models.properties import ModerationEvent
+from adminutils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, parse_cursor_int
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+MAX_PAGE_SIZE = 200
+# Monthly partitions kept created ahead of time
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _status_value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def record_moderation_event(
+    db: Session,
+    property_id: int,
+    admin_id: Optional[int],
+    old_status,
+    new_status,
+    reason: Optional[str] = None
+) -> None:
+    """
+    Append a moderation action to the log. Runs inside the caller's transaction, so the entry
+    exists exactly when the change it describes does.
+    """
+    old_value, new_value = _status_value(old_status), _status_value(new_status)
+    db.execute(
+        text("""
+            INSERT INTO moderation_events (property_id, admin_id, action, status_from, status_to, reason)
+            VALUES (:property_id, :admin_id, :action, :status_from, :status_to, :reason)
+        """),
+        {
+            "property_id": property_id,
+            "admin_id": admin_id,
+            "action": "status_changed" if old_value != new_value else "updated",
+            "status_from": old_value,
+            "status_to": new_value,
+            "reason": reason,
+        }
+    )
+
+
+def list_moderation_events(
+    db: Session,
+    admin_id: Optional[int] = None,
+    property_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50
+) -> Tuple[List[ModerationEvent], Optional[str]]:
+    """
+    Newest-first keyset page of the log. The created_at bounds prune partitions, and filtering
+    by admin or property walks the matching (…, created_at, id) index.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(ModerationEvent)
+    if admin_id is not None:
+        query = query.filter(ModerationEvent.admin_id == admin_id)
+    if property_id is not None:
+        query = query.filter(ModerationEvent.property_id == property_id)
+    if since is not None:
+        query = query.filter(ModerationEvent.created_at >= since)
+    if until is not None:
+        query = query.filter(ModerationEvent.created_at < until)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        query = query.filter(
+            tuple_(ModerationEvent.created_at, ModerationEvent.id) < (parse_cursor_datetime(values[0]), parse_cursor_int(values[1]))
+        )
+
+    rows = query.order_by(ModerationEvent.created_at.desc(), ModerationEvent.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def ensure_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD) -> None:
+    db.execute(text("SELECT ensure_moderation_event_partitions(:months)"), {"months": months_ahead})
+    db.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Moderation log maintenance")
+    parser.add_argument("--ensure-partitions", action="store_true", help="Create the upcoming monthly partitions and any missed month found in the default partition")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.ensure_partitions:
+            ensure_partitions(db, args.months_ahead)
+            print(f"Partitions exist through {args.months_ahead} months ahead")
+    finally:
+        db.close()
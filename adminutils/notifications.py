@@ -0,0 +1,180 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text, tuple_
+from models.properties import Notification
+from adminutils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, parse_cursor_int
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+# Read notifications are kept this long, unread ones longer
+READ_RETENTION_DAYS = 30
+UNREAD_RETENTION_DAYS = 180
+COMPACTION_BATCH_SIZE = 10000
+
+
+def increment_unread(db: Session, user_id: int) -> None:
+    """
+    Bump the user's unread counter. Call in the same transaction that inserts the notification.
+    """
+    db.execute(
+        text("""
+            INSERT INTO notification_counters (user_id, unread_count) VALUES (:user_id, 1)
+            ON CONFLICT (user_id) DO UPDATE SET unread_count = notification_counters.unread_count + 1
+        """),
+        {"user_id": user_id}
+    )
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    count = db.execute(
+        text("SELECT unread_count FROM notification_counters WHERE user_id = :user_id"),
+        {"user_id": user_id}
+    ).scalar()
+    return count or 0
+
+
+def list_notifications(
+    db: Session,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    unread_only: bool = False
+) -> Tuple[List[Notification], Optional[str]]:
+    """
+    Newest-first keyset page of a user's notifications. Served straight off
+    ix_notifications_user_created, so deep pages cost the same as the first one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if unread_only:
+        query = query.filter(Notification.read_at.is_(None))
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        query = query.filter(
+            tuple_(Notification.created_at, Notification.id) < (parse_cursor_datetime(values[0]), parse_cursor_int(values[1]))
+        )
+
+    rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def mark_read(db: Session, user_id: int, ids: List[int], mark_all: bool = False) -> Tuple[int, int]:
+    """
+    Mark notifications read and adjust the unread counter in a single statement.
+    Returns (rows marked, remaining unread count).
+    """
+    row = db.execute(
+        text("""
+            WITH marked AS (
+                UPDATE notifications SET read_at = now()
+                WHERE user_id = :user_id
+                  AND read_at IS NULL
+                  AND (:mark_all OR id = ANY(:ids))
+                RETURNING id
+            )
+            INSERT INTO notification_counters (user_id, unread_count) VALUES (:user_id, 0)
+            ON CONFLICT (user_id) DO UPDATE
+                SET unread_count = greatest(notification_counters.unread_count - (SELECT count(*) FROM marked), 0)
+            RETURNING unread_count, (SELECT count(*) FROM marked) AS marked
+        """),
+        {"user_id": user_id, "ids": ids or [], "mark_all": mark_all}
+    ).one()
+    db.commit()
+    return row.marked, row.unread_count
+
+
+def compact_notifications(
+    db: Session,
+    read_retention_days: int = READ_RETENTION_DAYS,
+    unread_retention_days: int = UNREAD_RETENTION_DAYS,
+    batch_size: int = COMPACTION_BATCH_SIZE
+) -> int:
+    """
+    Delete notifications past retention in short batches, decrementing counters for any
+    unread rows removed. Safe to run while the API is serving traffic.
+    """
+    now = datetime.utcnow()
+    params = {
+        "read_cutoff": now - timedelta(days=read_retention_days),
+        "unread_cutoff": now - timedelta(days=unread_retention_days),
+        "batch_size": batch_size,
+    }
+    total = 0
+    while True:
+        deleted = db.execute(
+            text("""
+                WITH doomed AS (
+                    SELECT id FROM notifications
+                    WHERE created_at < :read_cutoff
+                      AND (read_at IS NOT NULL OR created_at < :unread_cutoff)
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                ), deleted AS (
+                    DELETE FROM notifications n USING doomed
+                    WHERE n.id = doomed.id
+                    RETURNING n.user_id, n.read_at
+                ), unread AS (
+                    SELECT user_id, count(*) AS removed FROM deleted WHERE read_at IS NULL GROUP BY user_id
+                ), adjusted AS (
+                    UPDATE notification_counters c
+                    SET unread_count = greatest(c.unread_count - unread.removed, 0)
+                    FROM unread WHERE c.user_id = unread.user_id
+                    RETURNING 1
+                )
+                SELECT count(*) FROM deleted
+            """),
+            params
+        ).scalar()
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def rebuild_unread_counters(db: Session) -> None:
+    """
+    Recompute every counter from the notifications table (repairs drift from out-of-band writes).
+    """
+    db.execute(text("""
+        WITH actual AS (
+            SELECT user_id, count(*) AS unread FROM notifications WHERE read_at IS NULL GROUP BY user_id
+        ), upserted AS (
+            INSERT INTO notification_counters (user_id, unread_count)
+            SELECT user_id, unread FROM actual
+            ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count
+            RETURNING user_id
+        )
+        UPDATE notification_counters SET unread_count = 0
+        WHERE user_id NOT IN (SELECT user_id FROM actual) AND unread_count <> 0
+    """))
+    db.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Notification retention / compaction job")
+    parser.add_argument("--read-retention-days", type=int, default=READ_RETENTION_DAYS)
+    parser.add_argument("--unread-retention-days", type=int, default=UNREAD_RETENTION_DAYS)
+    parser.add_argument("--rebuild-counters", action="store_true", help="Also recompute unread counters from scratch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        removed = compact_notifications(db, args.read_retention_days, args.unread_retention_days)
+        print(f"Deleted {removed} notifications")
+        if args.rebuild_counters:
+            rebuild_unread_counters(db)
+            print("Rebuilt unread counters")
+    finally:
+        db.close()
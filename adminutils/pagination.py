@@ -0,0 +1,43 @@
+from datetime import datetime
+import base64
+import json
+
+
+def encode_cursor(*values) -> str:
+    """
+    Opaque keyset cursor: URL-safe base64 of the JSON-encoded key values.
+    Datetimes are carried as ISO strings.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Inverse of encode_cursor; raises ValueError for anything that is not one of our cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_cursor_datetime(value) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_cursor_int(value) -> int:
+    # bool is an int subclass, but never one of our ids
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("Invalid cursor")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,224 @@
+from fastapi import Depends, HTTPException, WebSocket, status
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy import text, event
+from starlette.concurrency import run_in_threadpool
+from jose import jwt, JWTError
+from core.config import settings
+from adminutils.auth import get_current_user
+from models.user import User, UserProfile, UserRoleLink
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+ADMIN_ROLE_ID = 0
+# How long a cached principal is trusted; also bounds how stale other workers can be after a role change
+PRINCIPAL_CACHE_SECONDS = 60
+
+# User, profile and roles in one round trip. A user can have several profile rows; the first wins.
+PRINCIPAL_SQL = """
+    SELECT
+        u.user_id,
+        u.email,
+        u.hashed_password,
+        p.first_name,
+        p.last_name,
+        coalesce(p.active, true) AS active,
+        coalesce(p.email_verified, false) AS email_verified,
+        coalesce(array_agg(r.role_id ORDER BY r.role_id) FILTER (WHERE r.role_id IS NOT NULL), '{{}}') AS role_ids
+    FROM users u
+    LEFT JOIN user_profile p ON p.user_id = u.user_id
+    LEFT JOIN user_role_links r ON r.user_id = u.user_id
+    WHERE {where}
+    GROUP BY u.user_id, p.id
+    ORDER BY p.id
+    LIMIT 1
+"""
+
+
+class Principal:
+    """
+    What authorization needs to know about a user. Never carries the password hash.
+    """
+
+    __slots__ = ("user_id", "email", "first_name", "last_name", "active", "email_verified", "role_ids")
+
+    def __init__(self, user_id: int, email: str, first_name: Optional[str], last_name: Optional[str],
+                 active: bool, email_verified: bool, role_ids: Tuple[int, ...]):
+        self.user_id = user_id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.active = active
+        self.email_verified = email_verified
+        self.role_ids = role_ids
+
+    @property
+    def is_admin(self) -> bool:
+        return self.active and ADMIN_ROLE_ID in self.role_ids
+
+    @classmethod
+    def from_row(cls, row) -> "Principal":
+        return cls(row.user_id, row.email, row.first_name, row.last_name, row.active, row.email_verified, tuple(row.role_ids))
+
+
+def _load(db: Session, where: str, params: dict):
+    return db.execute(text(PRINCIPAL_SQL.format(where=where)), params).first()
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    row = _load(db, "u.user_id = :user_id", {"user_id": user_id})
+    return Principal.from_row(row) if row is not None else None
+
+
+def load_principal_for_login(db: Session, email: str) -> Optional[Tuple[Principal, str]]:
+    """
+    Principal and password hash by email, for the password check at login.
+    """
+    row = _load(db, "u.email = :email", {"email": email})
+    return (Principal.from_row(row), row.hashed_password) if row is not None else None
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache of principals by user id. User, profile and role changes made through
+    the ORM invalidate the affected user in this worker, at flush and again at commit; other
+    workers see them within `ttl`.
+    """
+
+    def __init__(self, ttl: float = PRINCIPAL_CACHE_SECONDS):
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def peek(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.user_id] = (time.monotonic() + self.ttl, principal)
+
+    def get(self, db: Session, user_id: int) -> Optional[Principal]:
+        principal = self.peek(user_id)
+        if principal is None:
+            principal = load_principal(db, user_id)
+            if principal is not None:
+                self.put(principal)
+        return principal
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+principal_cache = PrincipalCache()
+
+
+# session.info key: users whose principal changed in the session's open transaction
+_CHANGED_USERS = "principal_changed_user_ids"
+
+
+def _invalidate_on_principal_change(mapper, connection, target):
+    principal_cache.invalidate(target.user_id)
+    # A request loading between this flush and the commit still reads the old row and would
+    # cache it again, so the user is dropped once more when the transaction ends
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.user_id)
+
+
+for _model in (User, UserProfile, UserRoleLink):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_on_principal_change)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_changed_principals(session):
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        principal_cache.invalidate(user_id)
+
+
+def _load_uncached(user_id: int) -> Optional[Principal]:
+    from db.session import SessionLocal
+
+    # The primary: a replica behind a revocation would put the revoked principal back in the cache
+    db = SessionLocal()
+    try:
+        principal = load_principal(db, user_id)
+        if principal is not None:
+            principal_cache.put(principal)
+        return principal
+    finally:
+        db.close()
+
+
+async def _get_principal(user_id: int) -> Optional[Principal]:
+    principal = principal_cache.peek(user_id)
+    if principal is None:
+        principal = await run_in_threadpool(_load_uncached, user_id)
+    return principal
+
+
+async def get_current_principal(user_id: Optional[int] = Depends(get_current_user)) -> Principal:
+    """
+    The caller's principal. A cache hit costs no database work at all.
+    """
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = await _get_principal(user_id)
+    if principal is None or not principal.active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+async def require_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized as admin")
+    return principal
+
+
+async def authenticate_websocket(websocket: WebSocket) -> Tuple[Optional[Principal], Optional[str]]:
+    """
+    The active principal behind a WebSocket handshake, checked before accept(), plus the
+    subprotocol to accept with. Browsers cannot set an Authorization header on a WebSocket, so
+    the access token comes as the subprotocol pair `bearer, <token>` or a `token` query parameter.
+    """
+    protocols = [p.strip() for p in websocket.headers.get("sec-websocket-protocol", "").split(",") if p.strip()]
+    if len(protocols) >= 2 and protocols[0] == "bearer":
+        token, subprotocol = protocols[1], "bearer"
+    else:
+        token, subprotocol = websocket.query_params.get("token"), None
+    if not token:
+        return None, subprotocol
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None, subprotocol
+    # Refresh tokens are only good for /auth/admin/refresh
+    if payload.get("type") == "refresh" or payload.get("user_id") is None:
+        return None, subprotocol
+    principal = await _get_principal(payload["user_id"])
+    return (principal if principal is not None and principal.active else None), subprotocol
@@ -1,99 +1,167 @@
 from schemas.properties import GeoJSONFeature, PolygonGeometry, PointGeometry, Properties, GeoJSONResponse, PropertyImage
-from geoalchemy2.shape import to_shape
 from models.properties import Property
-from typing import List
+from adminutils.thumbnails import thumbnail_url
+from adminutils.signed_urls import signed_url_cache, with_signed_images
+from core.metrics import record_timing, timed
+from typing import List, Iterable, Iterator, Optional
 import logging
 import json
+import time
 
-def convert_properties_to_geojson(properties: List[Property]) -> GeoJSONResponse:
-    features = []
-    for prop in properties:
-        try:
-            polygon_geojson = json.loads(prop.geom) if isinstance(prop.geom, str) else prop.geom
-            polygon_coordinates = polygon_geojson.get("coordinates", [])
-            
-            if not isinstance(polygon_coordinates, list):
-                logging.error(f"Coordinates not a list for property {prop.id}")
-                polygon_coordinates = [[[]]]
-            elif len(polygon_coordinates) == 0:
-                polygon_coordinates = [[[]]]
-            elif any(not isinstance(x, list) for x in polygon_coordinates):
-                logging.error(f"Coordinates have improper nesting for property {prop.id}")
-                polygon_coordinates = [[[]]]
-            elif polygon_coordinates and isinstance(polygon_coordinates[0], list):
-                if polygon_coordinates[0] and not isinstance(polygon_coordinates[0][0], list):
-                    polygon_coordinates = [polygon_coordinates]
-                elif polygon_coordinates[0] and isinstance(polygon_coordinates[0][0], list) and isinstance(polygon_coordinates[0][0][0], list):
-                    polygon_coordinates = polygon_coordinates[0]
-        except (json.JSONDecodeError, AttributeError, ValueError, IndexError, TypeError) as e:
-            logging.error(f"Error processing property {prop.id} geometry: {str(e)}")
+def get_polygon_coordinates(prop: Property) -> List:
+    """
+    Normalize the stored `geom` JSON into Polygon ring coordinates, falling back to [[[]]].
+    """
+    try:
+        polygon_geojson = json.loads(prop.geom) if isinstance(prop.geom, str) else prop.geom
+        polygon_coordinates = polygon_geojson.get("coordinates", [])
+
+        if not isinstance(polygon_coordinates, list):
+            logging.error(f"Coordinates not a list for property {prop.id}")
+            polygon_coordinates = [[[]]]
+        elif len(polygon_coordinates) == 0:
+            polygon_coordinates = [[[]]]
+        elif any(not isinstance(x, list) for x in polygon_coordinates):
+            logging.error(f"Coordinates have improper nesting for property {prop.id}")
             polygon_coordinates = [[[]]]
+        elif polygon_coordinates and isinstance(polygon_coordinates[0], list):
+            if polygon_coordinates[0] and not isinstance(polygon_coordinates[0][0], list):
+                polygon_coordinates = [polygon_coordinates]
+            elif polygon_coordinates[0] and isinstance(polygon_coordinates[0][0], list) and isinstance(polygon_coordinates[0][0][0], list):
+                polygon_coordinates = polygon_coordinates[0]
+    except (json.JSONDecodeError, AttributeError, ValueError, IndexError, TypeError) as e:
+        logging.error(f"Error processing property {prop.id} geometry: {str(e)}")
+        polygon_coordinates = [[[]]]
 
-        flattened_coordinates = []
-        try:
-            if polygon_coordinates and isinstance(polygon_coordinates[0], list):
-                if polygon_coordinates[0] and isinstance(polygon_coordinates[0][0], list):
-                    flattened_coordinates = polygon_coordinates
-                else:
-                    flattened_coordinates = [polygon_coordinates]
+    flattened_coordinates = []
+    try:
+        if polygon_coordinates and isinstance(polygon_coordinates[0], list):
+            if polygon_coordinates[0] and isinstance(polygon_coordinates[0][0], list):
+                flattened_coordinates = polygon_coordinates
             else:
-                flattened_coordinates = [[[]]]
-        except (IndexError, TypeError) as e:
-            logging.error(f"Error flattening coordinates for property {prop.id}: {str(e)}")
+                flattened_coordinates = [polygon_coordinates]
+        else:
             flattened_coordinates = [[[]]]
+    except (IndexError, TypeError) as e:
+        logging.error(f"Error flattening coordinates for property {prop.id}: {str(e)}")
+        flattened_coordinates = [[[]]]
+
+    return flattened_coordinates
+
+def property_to_feature(prop: Property, sign_images: bool = True) -> GeoJSONFeature:
+    # shapely (and numpy behind it) is only loaded once a feature is actually built
+    from geoalchemy2.shape import to_shape
+
+    flattened_coordinates = get_polygon_coordinates(prop)
 
-        centroid_geom = to_shape(prop.centroid) if prop.centroid else None
-        centroid_coordinates = list(centroid_geom.coords)[0] if centroid_geom else None
+    centroid_geom = to_shape(prop.centroid) if prop.centroid else None
+    centroid_coordinates = list(centroid_geom.coords)[0] if centroid_geom else None
 
-        # Convert PropertyImage objects to PropertyImage schema
-        image_list = [
-            PropertyImage(
-                id=image.id,
-                image_url=image.image_url,
-                uploaded_at=image.uploaded_at
-            ) for image in prop.images
-        ]
+    # Convert PropertyImage objects to PropertyImage schema
+    image_list = [
+        PropertyImage(
+            id=image.id,
+            image_url=image.image_url,
+            uploaded_at=image.uploaded_at,
+            thumbnail_url=thumbnail_url(image),
+            signed_url=signed_url_cache.get(image.image_url) if sign_images else None
+        ) for image in prop.images
+    ]
 
-        feature = GeoJSONFeature(
-            type="Feature",
-            geometry=PolygonGeometry(
-                type="Polygon",
-                coordinates=flattened_coordinates
-            ),
-            properties=Properties(
-                id=prop.id,
-                property_name=prop.property_name,
-                owner_name=prop.owner_name,
-                property_type=prop.type,
-                price=float(prop.price) if prop.price else None,
-                area_sq_m=float(prop.area_sq_m) if prop.area_sq_m else None,
-                unit=prop.unit,
-                murabba=prop.murabba,
-                khasra=prop.khasra,
-                khewat=prop.khewat,
-                khata=prop.khata,
-                state=prop.state,
-                district=prop.district,
-                tehsil=prop.tehsil,
-                village=prop.village,
-                verified=prop.verified,
-                available=prop.available,
-                visits=prop.visits,
-                created_at=prop.created_at,
-                updated_at=prop.updated_at,
-                status=prop.status,
-                user_uploaded=prop.user_uploaded,
-                phone=prop.phone,
-                email=prop.email,
-                flag_reason=prop.flag_reason,
-                centroid=PointGeometry(
-                    type="Point",
-                    coordinates=[centroid_coordinates[0], centroid_coordinates[1]]
-                ) if centroid_coordinates else None,
-                images=image_list
-            ),
+    feature = GeoJSONFeature(
+        type="Feature",
+        geometry=PolygonGeometry(
+            type="Polygon",
+            coordinates=flattened_coordinates
+        ),
+        properties=Properties(
+            id=prop.id,
+            property_name=prop.property_name,
+            owner_name=prop.owner_name,
+            property_type=prop.type,
+            price=float(prop.price) if prop.price else None,
+            area_sq_m=float(prop.area_sq_m) if prop.area_sq_m else None,
+            unit=prop.unit,
+            murabba=prop.murabba,
+            khasra=prop.khasra,
+            khewat=prop.khewat,
+            khata=prop.khata,
+            state=prop.state,
+            district=prop.district,
+            tehsil=prop.tehsil,
+            village=prop.village,
+            verified=prop.verified,
+            available=prop.available,
+            visits=prop.visits,
+            created_at=prop.created_at,
+            updated_at=prop.updated_at,
+            status=prop.status,
+            user_uploaded=prop.user_uploaded,
+            phone=prop.phone,
+            email=prop.email,
+            flag_reason=prop.flag_reason,
+            centroid=PointGeometry(
+                type="Point",
+                coordinates=[centroid_coordinates[0], centroid_coordinates[1]]
+            ) if centroid_coordinates else None,
             images=image_list
-        )
-        features.append(feature)
-    
-    return GeoJSONResponse(type="FeatureCollection", features=features)
\ No newline at end of file
+        ),
+        images=image_list
+    )
+    return feature
+
+def convert_properties_to_geojson(properties: List[Property]) -> GeoJSONResponse:
+    signed_url_cache.warm(properties)
+    with timed("serialize"):
+        features = [property_to_feature(prop) for prop in properties]
+    return GeoJSONResponse(type="FeatureCollection", features=features)
+
+
+# Flush serialized features to the client in chunks of roughly this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def iter_feature_collection(properties: Iterable[Property], sign_images: bool = True) -> Iterator[bytes]:
+    """
+    Serialize properties as a GeoJSON FeatureCollection one feature at a time.
+    Only the current chunk is held in memory, so the cost no longer scales with the page size.
+    """
+    if sign_images:
+        properties = with_signed_images(properties)
+    buffer = [b'{"type":"FeatureCollection","features":[']
+    buffered = len(buffer[0])
+    first = True
+    serialize_seconds = 0.0
+    try:
+        for prop in properties:
+            started = time.perf_counter()
+            chunk = property_to_feature(prop, sign_images).model_dump_json().encode("utf-8")
+            serialize_seconds += time.perf_counter() - started
+            if not first:
+                buffer.append(b",")
+            buffer.append(chunk)
+            buffered += len(chunk) + 1
+            first = False
+            if buffered >= STREAM_CHUNK_SIZE:
+                yield b"".join(buffer)
+                buffer, buffered = [], 0
+        buffer.append(b"]}")
+        yield b"".join(buffer)
+    finally:
+        # Fetching rows is already counted as DB time; this is the GeoJSON encoding alone
+        record_timing("serialize", serialize_seconds)
+
+def stream_paginated_geojson(
+    properties: Iterable[Property],
+    total_count: int,
+    has_more: bool,
+    next_page: Optional[int]
+) -> Iterator[bytes]:
+    """
+    Streaming counterpart of PaginatedGeoJSONResponse: same document, emitted incrementally.
+    """
+    yield b'{"data":'
+    yield from iter_feature_collection(properties)
+    yield (
+        f',"total_count":{json.dumps(total_count)},"has_more":{json.dumps(has_more)},'
+        f'"next_page":{json.dumps(next_page)}}}'
+    ).encode("utf-8")
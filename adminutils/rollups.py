@@ -0,0 +1,294 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from adminutils.sync import get_sync_upper_bound
+from db.session import SessionLocal
+from models.properties import DistrictRollup, PropertyStatus
+from schemas.properties import DistrictRollupItem, DistrictRollupResponse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_LEVELS = ("district", "tehsil")
+ALL_STATUSES = "all"
+# The background refresher brings the rollups up to date this often; reads never refresh
+ROLLUP_REFRESH_SECONDS = 60
+# pg_try_advisory_xact_lock key, so only one worker refreshes at a time
+ROLLUP_LOCK_KEY = 804401
+STATE_NAME = "district_rollups"
+
+# Both levels, per status and across all statuses, in one pass. Medians do not add up across
+# groups, which is why every combination is aggregated from the rows rather than from each other.
+AGGREGATE_SQL = """
+    INSERT INTO property_district_rollups (
+        level, state, district, tehsil, status, listings, priced, price_sum, median_price,
+        area_sq_m_sum, xmin, ymin, xmax, ymax, refreshed_at
+    )
+    SELECT
+        CASE WHEN GROUPING(p.tehsil) = 0 THEN 'tehsil' ELSE 'district' END,
+        p.state,
+        p.district,
+        CASE WHEN GROUPING(p.tehsil) = 0 THEN p.tehsil ELSE '' END,
+        CASE WHEN GROUPING(p.status) = 0 THEN p.status ELSE 'all' END,
+        count(*),
+        count(p.price),
+        sum(p.price),
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY p.price),
+        sum(p.area_sq_m),
+        ST_XMin(ST_Extent(p.centroid)),
+        ST_YMin(ST_Extent(p.centroid)),
+        ST_XMax(ST_Extent(p.centroid)),
+        ST_YMax(ST_Extent(p.centroid)),
+        now()
+    FROM (
+        SELECT
+            coalesce(state, '') AS state,
+            coalesce(district, '') AS district,
+            coalesce(tehsil, '') AS tehsil,
+            coalesce(CAST(status AS text), 'pending') AS status,
+            price,
+            area_sq_m,
+            CAST(centroid AS geometry) AS centroid
+        FROM properties
+        {where}
+    ) AS p
+    GROUP BY p.state, p.district, GROUPING SETS ((p.tehsil, p.status), (p.tehsil), (p.status), ())
+"""
+
+
+def _try_lock(db: Session) -> bool:
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}).scalar())
+
+
+def _save_watermark(db: Session, through: datetime) -> None:
+    db.execute(
+        text("""
+            INSERT INTO rollup_refresh_state (name, refreshed_through) VALUES (:name, :through)
+            ON CONFLICT (name) DO UPDATE SET refreshed_through = EXCLUDED.refreshed_through
+        """),
+        {"name": STATE_NAME, "through": through}
+    )
+
+
+def get_refreshed_through(db: Session) -> Optional[datetime]:
+    return db.execute(
+        text("SELECT refreshed_through FROM rollup_refresh_state WHERE name = :name"),
+        {"name": STATE_NAME}
+    ).scalar()
+
+
+def rebuild_rollups(db: Session) -> Optional[int]:
+    """
+    Recompute every rollup row. Returns the number of rows written, or None when another
+    refresh holds the lock.
+    """
+    if not _try_lock(db):
+        db.rollback()
+        return None
+    through = get_sync_upper_bound(db)
+    db.execute(text("DELETE FROM district_rollup_dirty"))
+    db.execute(text("DELETE FROM property_district_rollups"))
+    written = db.execute(text(AGGREGATE_SQL.format(where=""))).rowcount
+    _save_watermark(db, through)
+    db.commit()
+    return written
+
+
+def refresh_rollups(db: Session) -> Optional[int]:
+    """
+    Recompute only the districts touched since the last refresh: those with rows modified after
+    the watermark, plus those a property was deleted from or moved out of. Returns the number of
+    districts refreshed, or None when another refresh holds the lock. The first refresh is a
+    full rebuild.
+
+    The watermark trails the database clock by the sync settle window (see adminutils.sync), so a
+    slow transaction committing with an older updated_at is still picked up by the next refresh.
+    """
+    if not _try_lock(db):
+        db.rollback()
+        return None
+    since = get_refreshed_through(db)
+    if since is None:
+        rebuild_rollups(db)
+        return db.execute(text("SELECT count(DISTINCT (state, district)) FROM property_district_rollups")).scalar()
+
+    through = get_sync_upper_bound(db)
+    rows = db.execute(
+        text("""
+            WITH relocated AS (
+                DELETE FROM district_rollup_dirty RETURNING state, district
+            )
+            SELECT coalesce(state, '') AS state, coalesce(district, '') AS district
+            FROM properties WHERE updated_at > :since
+            UNION
+            SELECT state, district FROM relocated
+        """),
+        {"since": since}
+    ).fetchall()
+
+    if rows:
+        keys = {"states": [row.state for row in rows], "districts": [row.district for row in rows]}
+        db.execute(
+            text("""
+                DELETE FROM property_district_rollups AS r
+                USING unnest(CAST(:states AS text[]), CAST(:districts AS text[])) AS d(state, district)
+                WHERE r.state = d.state AND r.district = d.district
+            """),
+            keys
+        )
+        db.execute(
+            text(AGGREGATE_SQL.format(where="""
+                WHERE (coalesce(state, ''), coalesce(district, '')) IN (
+                    SELECT * FROM unnest(CAST(:states AS text[]), CAST(:districts AS text[]))
+                )
+            """)),
+            keys
+        )
+    _save_watermark(db, through)
+    db.commit()
+    return len(rows)
+
+
+class RollupRefresher:
+    """
+    Background task that runs refresh_rollups every ROLLUP_REFRESH_SECONDS, starting right away.
+    Every worker runs one; the advisory lock lets only one of them refresh at a time and the
+    others skip that round.
+    """
+
+    def __init__(self, session_factory, interval: float = ROLLUP_REFRESH_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def refresh_now(self) -> Optional[int]:
+        db = self.session_factory()
+        try:
+            started = time.perf_counter()
+            districts = refresh_rollups(db)
+            if districts:
+                logger.info(f"Refreshed rollups for {districts} districts in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return districts
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.refresh_now)
+            except Exception as e:
+                logger.error(f"Rollup refresh failed, serving previous data: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Refreshing writes, so it uses the primary
+rollup_refresher = RollupRefresher(SessionLocal)
+
+
+def _as_float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def get_district_rollups(
+    db: Session,
+    level: str = "district",
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    status: Optional[PropertyStatus] = None
+) -> DistrictRollupResponse:
+    """
+    One item per district (or tehsil) with its status mix. Prices, area and extent are taken over
+    all statuses, or over `status` only when one is given.
+    """
+    query = db.query(DistrictRollup).filter(DistrictRollup.level == level)
+    if state is not None:
+        query = query.filter(DistrictRollup.state == state)
+    if district is not None:
+        query = query.filter(DistrictRollup.district == district)
+
+    measured_status = status.value if status is not None else ALL_STATUSES
+    groups: Dict[Tuple[str, str, str], List[DistrictRollup]] = {}
+    for row in query.order_by(DistrictRollup.state, DistrictRollup.district, DistrictRollup.tehsil):
+        groups.setdefault((row.state, row.district, row.tehsil), []).append(row)
+
+    items = []
+    for (state_name, district_name, tehsil), rows in groups.items():
+        by_status = {row.status: row.listings for row in rows if row.status != ALL_STATUSES}
+        measured = next((row for row in rows if row.status == measured_status), None)
+        if status is not None and measured is None:
+            continue
+        decided = by_status.get("approved", 0) + by_status.get("disapproved", 0)
+        items.append(DistrictRollupItem(
+            level=level,
+            state=state_name,
+            district=district_name,
+            tehsil=tehsil if level == "tehsil" else None,
+            listings=measured.listings if measured else 0,
+            by_status=by_status,
+            approval_rate=round(by_status.get("approved", 0) / decided, 4) if decided else None,
+            median_price=_as_float(measured.median_price) if measured else None,
+            average_price=round(float(measured.price_sum) / measured.priced, 2) if measured and measured.priced else None,
+            total_area_sq_m=_as_float(measured.area_sq_m_sum) if measured else None,
+            bbox=[measured.xmin, measured.ymin, measured.xmax, measured.ymax]
+            if measured is not None and measured.xmin is not None else None
+        ))
+    return DistrictRollupResponse(level=level, refreshed_through=get_refreshed_through(db), items=items)
+
+
+def rollups_to_feature_collection(response: DistrictRollupResponse) -> dict:
+    """
+    GeoJSON for choropleth maps: each area is drawn as the box around its parcels' centroids,
+    so the map renders without fetching any parcel geometry.
+    """
+    features = []
+    for item in response.items:
+        geometry = None
+        if item.bbox is not None:
+            xmin, ymin, xmax, ymax = item.bbox
+            geometry = {
+                "type": "Polygon",
+                "coordinates": [[[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax], [xmin, ymin]]]
+            }
+        features.append({
+            "type": "Feature",
+            "geometry": geometry,
+            "properties": item.model_dump(exclude={"bbox"}),
+            "bbox": item.bbox,
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Refresh the per-district property rollups")
+    parser.add_argument("--full", action="store_true", help="Rebuild every district instead of only the changed ones")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = rebuild_rollups(db) if args.full else refresh_rollups(db)
+        if result is None:
+            print("Another refresh is running")
+        elif args.full:
+            print(f"Rebuilt {result} rollup rows")
+        else:
+            print(f"Refreshed {result} districts")
+    finally:
+        db.close()
@@ -0,0 +1,218 @@
+from abc import ABC, abstractmethod
+from core.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse, urlencode
+import threading
+import hashlib
+import logging
+import hmac
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIGNED_URL_TTL_SECONDS = 3600
+# Cached URLs are re-signed this long before they expire, so clients never receive a nearly dead one
+REFRESH_MARGIN_SECONDS = 300
+MAX_CACHED_URLS = 50000
+# Parallel signing calls when a page has many cache misses (signing may be a network call to IAM)
+SIGNING_WORKERS = 8
+
+GCS_HOSTS = ("storage.googleapis.com", "storage.cloud.google.com")
+
+
+def parse_object_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    (bucket, object name) for gs:// and storage.googleapis.com URLs; None for anything else.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "gs":
+        return parsed.netloc, parsed.path.lstrip("/")
+    if parsed.scheme in ("http", "https") and parsed.netloc in GCS_HOSTS:
+        bucket, _, name = parsed.path.lstrip("/").partition("/")
+        if bucket and name:
+            return bucket, name
+    return None
+
+
+class SignedUrlProvider(ABC):
+    """
+    Turns a stored object URL into a time-limited URL a browser can fetch directly.
+    """
+
+    @abstractmethod
+    def sign(self, bucket: str, name: str, expires_in: int) -> str:
+        ...
+
+    def sign_many(self, objects: List[Tuple[str, str]], expires_in: int) -> List[str]:
+        return [self.sign(bucket, name, expires_in) for bucket, name in objects]
+
+
+class GCSSignedUrlProvider(SignedUrlProvider):
+    def __init__(self):
+        from google.cloud import storage
+
+        self.client = storage.Client()
+        self._pool = ThreadPoolExecutor(max_workers=SIGNING_WORKERS, thread_name_prefix="url-signer")
+
+    def sign(self, bucket: str, name: str, expires_in: int) -> str:
+        blob = self.client.bucket(bucket).blob(name)
+        return blob.generate_signed_url(version="v4", expiration=timedelta(seconds=expires_in), method="GET")
+
+    def sign_many(self, objects: List[Tuple[str, str]], expires_in: int) -> List[str]:
+        if len(objects) <= 1:
+            return super().sign_many(objects, expires_in)
+        return list(self._pool.map(lambda obj: self.sign(obj[0], obj[1], expires_in), objects))
+
+
+class LocalSignedUrlProvider(SignedUrlProvider):
+    """
+    Fake for development and tests: HMAC-signed URLs in the same shape, no cloud credentials needed.
+    """
+
+    def __init__(self, secret: str, base_url: str = "http://localhost/storage"):
+        self.secret = secret.encode("utf-8")
+        self.base_url = base_url.rstrip("/")
+        self.signed = 0
+
+    def _signature(self, bucket: str, name: str, expires: int) -> str:
+        message = f"{bucket}/{name}:{expires}".encode("utf-8")
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def sign(self, bucket: str, name: str, expires_in: int) -> str:
+        self.signed += 1
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": self._signature(bucket, name, expires)})
+        return f"{self.base_url}/{bucket}/{name}?{query}"
+
+    def verify(self, bucket: str, name: str, expires: int, signature: str) -> bool:
+        return expires > time.time() and hmac.compare_digest(signature, self._signature(bucket, name, expires))
+
+
+class SignedUrlCache:
+    """
+    Expiry-aware LRU of signed URLs keyed by the stored object URL. Time is cut into signing
+    epochs of ttl - refresh_margin seconds; entries are re-signed when the epoch they were signed
+    in ends, so every URL handed out during an epoch outlives it by at least refresh_margin.
+    Responses that embed signed URLs put epoch() into their cache keys and validators.
+    """
+
+    def __init__(self, provider: Optional[SignedUrlProvider], ttl: int = DEFAULT_SIGNED_URL_TTL_SECONDS,
+                 refresh_margin: int = REFRESH_MARGIN_SECONDS, max_entries: int = MAX_CACHED_URLS):
+        self.provider = provider
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl // 2)
+        self.epoch_seconds = ttl - self.refresh_margin
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, url: str, now: float) -> Optional[str]:
+        entry = self._entries.get(url)
+        if entry is None or entry[1] <= now:
+            return None
+        self._entries.move_to_end(url)
+        return entry[0]
+
+    def epoch(self, now: Optional[float] = None) -> int:
+        """
+        Current signing epoch; 0 when URLs are not signed at all.
+        """
+        if self.provider is None:
+            return 0
+        return int((time.time() if now is None else now) // self.epoch_seconds)
+
+    def epoch_started_at(self, epoch: int) -> Optional[datetime]:
+        """
+        Naive UTC start of `epoch`, for Last-Modified of bodies that embed its URLs.
+        """
+        if self.provider is None:
+            return None
+        return datetime.utcfromtimestamp(epoch * self.epoch_seconds)
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, str]:
+        """
+        Signed URLs for every signable object among `urls`, signing all misses in one batch.
+        URLs that are not storage objects (data:, external hosts) are left out.
+        """
+        if self.provider is None:
+            return {}
+
+        now = time.time()
+        result: Dict[str, str] = {}
+        missing: Dict[str, Tuple[str, str]] = {}
+        with self._lock:
+            for url in urls:
+                if url in result or url in missing:
+                    continue
+                signed = self._lookup(url, now)
+                if signed is not None:
+                    result[url] = signed
+                    self.hits += 1
+                    continue
+                obj = parse_object_url(url)
+                if obj is not None:
+                    missing[url] = obj
+                    self.misses += 1
+
+        if missing:
+            refresh_at = (self.epoch(now) + 1) * self.epoch_seconds
+            signed_urls = self.provider.sign_many(list(missing.values()), self.ttl)
+            with self._lock:
+                for url, signed in zip(missing, signed_urls):
+                    self._entries[url] = (signed, refresh_at)
+                    self._entries.move_to_end(url)
+                    result[url] = signed
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def get(self, url: str) -> Optional[str]:
+        return self.get_many([url]).get(url)
+
+    def warm(self, properties: Iterable) -> None:
+        self.get_many(image.image_url for prop in properties for image in prop.images)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "ttl_seconds": self.ttl, "epoch": self.epoch()
+            }
+
+
+def with_signed_images(properties: Iterable, batch_size: int = 100) -> Iterator:
+    """
+    Pass properties through unchanged, signing each batch's image URLs in one go first so the
+    per-feature lookups during serialization are all cache hits.
+    """
+    batch = []
+    for prop in properties:
+        batch.append(prop)
+        if len(batch) >= batch_size:
+            signed_url_cache.warm(batch)
+            yield from batch
+            batch = []
+    if batch:
+        signed_url_cache.warm(batch)
+        yield from batch
+
+
+def create_signed_url_provider(name: str) -> Optional[SignedUrlProvider]:
+    if name == "gcs":
+        return GCSSignedUrlProvider()
+    if name == "local":
+        return LocalSignedUrlProvider(settings.SECRET_KEY)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown signed URL provider '{name}'")
+
+
+signed_url_cache = SignedUrlCache(
+    create_signed_url_provider(settings.SIGNED_URL_PROVIDER),
+    ttl=settings.SIGNED_URL_TTL_SECONDS
+)
@@ -0,0 +1,201 @@
+from abc import ABC, abstractmethod
+from core.config import settings
+from typing import Optional, Set
+from urllib.parse import urlparse
+import http.client
+import ipaddress
+import logging
+import base64
+import socket
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Source images larger than this are refused rather than decoded
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+SOURCE_FETCH_TIMEOUT_SECONDS = 10
+
+
+class SourceRefused(ValueError):
+    """
+    The original image lives somewhere thumbnails are not allowed to fetch from.
+    """
+
+
+class ObjectStore(ABC):
+    """
+    Minimal blob store used for generated derivatives. Keys are '/'-separated relative paths.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        ...
+
+
+class LocalFileStore(ObjectStore):
+    """
+    Filesystem stand-in for the bucket, for development and single-host deployments.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid object key: {key}")
+        return path
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+class GCSObjectStore(ObjectStore):
+    def __init__(self, bucket_name: str, prefix: str = ""):
+        from google.cloud import storage
+
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = prefix.strip("/")
+
+    def _blob(self, key: str):
+        return self.bucket.blob(f"{self.prefix}/{key}" if self.prefix else key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self._blob(key).download_as_bytes()
+        except NotFound:
+            return None
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        blob = self._blob(key)
+        blob.cache_control = "public, max-age=31536000, immutable"
+        blob.upload_from_string(data, content_type=content_type)
+
+
+def create_object_store(backend: str, location: str) -> ObjectStore:
+    if backend == "gcs":
+        return GCSObjectStore(location)
+    if backend == "local":
+        return LocalFileStore(location)
+    raise ValueError(f"Unknown object store backend '{backend}'")
+
+
+def _allowlist(value: str) -> Set[str]:
+    return {item.strip().lower() for item in value.split(",") if item.strip()}
+
+
+def _public_address(host: str, port: int) -> str:
+    """
+    An address `host` resolves to, refusing hosts that resolve to anything non-public
+    (loopback, private, link-local such as metadata endpoints, reserved).
+    """
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise SourceRefused(f"Cannot resolve image host {host}: {e}")
+    addresses = sorted({info[4][0] for info in infos})
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise SourceRefused(f"Image host {host} resolves to a non-public address")
+    return addresses[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    # Connects to the address that was checked, so a second DNS answer cannot redirect it
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self._address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, host: str, address: str, **kwargs):
+        super().__init__(host, **kwargs)
+        self._address = address
+
+    def connect(self):
+        sock = socket.create_connection((self._address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def _fetch_http(parsed) -> bytes:
+    host = (parsed.hostname or "").lower()
+    if host not in _allowlist(settings.IMAGE_SOURCE_HOSTS):
+        raise SourceRefused(f"Image host {host} is not in IMAGE_SOURCE_HOSTS")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    connection_class = _PinnedHTTPSConnection if parsed.scheme == "https" else _PinnedHTTPConnection
+    connection = connection_class(host, _public_address(host, port), port=port, timeout=SOURCE_FETCH_TIMEOUT_SECONDS)
+    try:
+        path = parsed.path or "/"
+        connection.request("GET", f"{path}?{parsed.query}" if parsed.query else path)
+        response = connection.getresponse()
+        # Redirects are not followed: the target would bypass the host checks
+        if response.status != 200:
+            raise ValueError(f"Image host answered {response.status}")
+        length = response.getheader("Content-Length")
+        if length and length.isdigit() and int(length) > MAX_SOURCE_BYTES:
+            raise ValueError(f"Source image exceeds {MAX_SOURCE_BYTES} bytes")
+        data = response.read(MAX_SOURCE_BYTES + 1)
+    finally:
+        connection.close()
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"Source image exceeds {MAX_SOURCE_BYTES} bytes")
+    return data
+
+
+def fetch_source_image(image_url: str) -> bytes:
+    """
+    Load an original image from whatever PropertyImage.image_url holds: a gs:// object in an
+    allowed bucket, an http(s) URL on an allowed public host or an inline base64 data: URL.
+    Anything else raises SourceRefused.
+    """
+    if image_url.startswith("data:"):
+        _, _, encoded = image_url.partition(",")
+        # Checked before decoding: base64 is 4 characters per 3 bytes
+        if len(encoded) > (MAX_SOURCE_BYTES // 3 + 1) * 4:
+            raise ValueError(f"Source image exceeds {MAX_SOURCE_BYTES} bytes")
+        return base64.b64decode(encoded)
+
+    parsed = urlparse(image_url)
+    if parsed.scheme == "gs":
+        from google.cloud import storage
+
+        if parsed.netloc.lower() not in _allowlist(settings.IMAGE_SOURCE_BUCKETS):
+            raise SourceRefused(f"Bucket {parsed.netloc} is not in IMAGE_SOURCE_BUCKETS")
+        blob = storage.Client().bucket(parsed.netloc).get_blob(parsed.path.lstrip("/"))
+        if blob is None:
+            raise ValueError("Source image not found")
+        if blob.size is not None and blob.size > MAX_SOURCE_BYTES:
+            raise ValueError(f"Source image exceeds {MAX_SOURCE_BYTES} bytes")
+        return blob.download_as_bytes()
+
+    if parsed.scheme in ("http", "https"):
+        return _fetch_http(parsed)
+
+    raise SourceRefused(f"Unsupported image URL: {image_url[:100]}")
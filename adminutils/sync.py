@@ -0,0 +1,166 @@
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import text, tuple_
+from models.properties import Property, PropertyChange, PropertyStatus
+from schemas.properties import DeltaSyncResponse, RemovedProperty
+from adminutils.property import convert_properties_to_geojson
+from adminutils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime, parse_cursor_int
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# updated_at is the transaction start time, so a row can become visible with a timestamp that is
+# already behind a client's watermark. Rows younger than this are held back until any transaction
+# that could still commit behind them has finished.
+SYNC_SETTLE_SECONDS = 5
+MAX_SYNC_PAGE_SIZE = 500
+# Tombstones older than this are pruned; clients holding an older watermark must reload in full
+TOMBSTONE_RETENTION_DAYS = 30
+
+# Ordering of the merged change stream at equal timestamps: removals first, then upserts
+_REMOVED, _UPSERT = 0, 1
+
+
+class WatermarkExpired(Exception):
+    pass
+
+
+Position = Optional[Tuple[datetime, int]]
+
+
+def encode_watermark(properties_at: Position, changes_at: Position) -> str:
+    """
+    A watermark holds the (timestamp, id) keyset position reached in each of the two streams.
+    """
+    return encode_cursor(*(properties_at or (None, None)), *(changes_at or (None, None)))
+
+
+def decode_watermark(watermark: Optional[str]) -> Tuple[Position, Position]:
+    if not watermark:
+        return None, None
+    values = decode_cursor(watermark)
+    if len(values) != 4:
+        raise ValueError("Invalid watermark")
+
+    def position(at, row_id) -> Position:
+        if at is None:
+            return None
+        return parse_cursor_datetime(at), parse_cursor_int(row_id)
+
+    return position(values[0], values[1]), position(values[2], values[3])
+
+
+def get_sync_upper_bound(db: Session, settle_seconds: int = SYNC_SETTLE_SECONDS) -> datetime:
+    # Database clock, so app servers with skewed clocks agree on the window
+    return db.execute(
+        text("SELECT CAST(now() AS timestamp) - make_interval(secs => :settle)"),
+        {"settle": settle_seconds}
+    ).scalar()
+
+
+def get_changes_since(
+    db: Session,
+    watermark: Optional[str] = None,
+    status: Optional[PropertyStatus] = None,
+    limit: int = 200
+) -> DeltaSyncResponse:
+    """
+    Properties modified after `watermark`, plus removals: deletions, and with a status filter,
+    properties that moved out of that status.
+
+    Both streams are read in (timestamp, id) order and cut at the same point, so every response
+    covers one contiguous slice of history. Clients apply `removed` first, then `data`.
+    Rows re-modified while a client is paging simply show up again later with their new state.
+    """
+    limit = max(1, min(limit, MAX_SYNC_PAGE_SIZE))
+    properties_at, changes_at = decode_watermark(watermark)
+    upper = get_sync_upper_bound(db)
+
+    if changes_at is not None and changes_at[0] < upper - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        raise WatermarkExpired(f"Watermark is older than {TOMBSTONE_RETENTION_DAYS} days")
+
+    properties_query = db.query(Property).options(selectinload(Property.images)).filter(
+        Property.user_uploaded == True,
+        Property.updated_at <= upper
+    )
+    if status is not None:
+        properties_query = properties_query.filter(Property.status == status)
+    if properties_at is not None:
+        properties_query = properties_query.filter(tuple_(Property.updated_at, Property.id) > properties_at)
+    properties = properties_query.order_by(Property.updated_at, Property.id).limit(limit + 1).all()
+
+    changes_query = db.query(PropertyChange).filter(PropertyChange.changed_at <= upper)
+    if status is not None:
+        changes_query = changes_query.filter(
+            (PropertyChange.change_type == "deleted") |
+            ((PropertyChange.status_from == status.value) & (PropertyChange.status_to != status.value))
+        )
+    else:
+        changes_query = changes_query.filter(PropertyChange.change_type == "deleted")
+    if changes_at is not None:
+        changes_query = changes_query.filter(tuple_(PropertyChange.changed_at, PropertyChange.id) > changes_at)
+    changes = changes_query.order_by(PropertyChange.changed_at, PropertyChange.id).limit(limit + 1).all()
+
+    property_keys = [(prop.updated_at, _UPSERT, prop.id) for prop in properties]
+    change_keys = [(change.changed_at, _REMOVED, change.id) for change in changes]
+    cutoffs = []
+    if len(properties) > limit:
+        cutoffs.append(property_keys[limit])
+    if len(changes) > limit:
+        cutoffs.append(change_keys[limit])
+    if cutoffs:
+        cutoff = min(cutoffs)
+        properties = [prop for prop, key in zip(properties, property_keys) if key < cutoff]
+        changes = [change for change, key in zip(changes, change_keys) if key < cutoff]
+
+    if properties:
+        properties_at = (properties[-1].updated_at, properties[-1].id)
+    if changes:
+        changes_at = (changes[-1].changed_at, changes[-1].id)
+    elif changes_at is None:
+        # Nothing to remove yet: start the tombstone stream at the window edge
+        changes_at = (upper, 0)
+
+    # A removal followed by a later upsert of the same property in this slice is moot
+    upserted = {prop.id for prop in properties}
+    removed = [
+        RemovedProperty(
+            property_id=change.property_id,
+            change_type=change.change_type,
+            status_to=change.status_to,
+            changed_at=change.changed_at
+        )
+        for change in changes if change.property_id not in upserted
+    ]
+
+    return DeltaSyncResponse(
+        data=convert_properties_to_geojson(properties),
+        removed=removed,
+        watermark=encode_watermark(properties_at, changes_at),
+        has_more=bool(cutoffs)
+    )
+
+
+def prune_tombstones(db: Session, retention_days: int = TOMBSTONE_RETENTION_DAYS) -> int:
+    result = db.execute(
+        text("DELETE FROM property_changes WHERE changed_at < CAST(now() AS timestamp) - make_interval(days => :days)"),
+        {"days": retention_days}
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    import argparse
+    from db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Prune the property change (tombstone) log")
+    parser.add_argument("--retention-days", type=int, default=TOMBSTONE_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Deleted {prune_tombstones(db, args.retention_days)} tombstones")
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+from adminutils.storage import ObjectStore, create_object_store, fetch_source_image
+from core.config import settings
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+import threading
+import hashlib
+import logging
+import io
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels for each named size
+THUMBNAIL_SIZES = {"sm": 160, "md": 480, "lg": 1024}
+DEFAULT_THUMBNAIL_SIZE = "md"
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+THUMBNAIL_QUALITY = 80
+# Versioned thumbnail URLs never change content, so they can be cached for good
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Used when the request did not carry the current version
+UNVERSIONED_CACHE_CONTROL = "public, max-age=300"
+
+# Derivatives being generated, by key; later requests for the same key wait on the future
+_in_flight: Dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+class ThumbnailsUnavailable(Exception):
+    pass
+
+
+def thumbnails_available() -> bool:
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def image_version(image) -> str:
+    """
+    Changes whenever the original is replaced, which is what keeps the immutable caching safe.
+    """
+    source = f"{image.image_url}|{image.uploaded_at.isoformat() if image.uploaded_at else ''}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+
+def thumbnail_url(image, size: str = DEFAULT_THUMBNAIL_SIZE) -> str:
+    return f"/properties/images/{image.id}/thumbnail?size={size}&v={image_version(image)}"
+
+
+def negotiate_thumbnail_format(accept: Optional[str]) -> str:
+    return "webp" if accept and "image/webp" in accept else "jpeg"
+
+
+def thumbnail_key(image_id: int, version: str, size: str, fmt: str) -> str:
+    return f"thumbnails/{image_id}/{version}/{size}.{fmt}"
+
+
+def render_thumbnail(data: bytes, max_side: int, fmt: str) -> bytes:
+    from PIL import Image, ImageOps
+
+    pil_format, _ = THUMBNAIL_FORMATS[fmt]
+    with Image.open(io.BytesIO(data)) as img:
+        # Let the JPEG decoder downscale by a power of two while decoding: far less work than full size
+        img.draft("RGB", (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGBA")
+        out = io.BytesIO()
+        img.save(out, pil_format, quality=THUMBNAIL_QUALITY, optimize=pil_format == "JPEG")
+        return out.getvalue()
+
+
+class ThumbnailService:
+    """
+    Generate-on-first-request derivative cache. Each (image, version, size, format) is rendered
+    once and kept in the object store; concurrent requests for the same derivative wait on the
+    first one instead of rendering it again.
+    """
+
+    def __init__(self, store: ObjectStore):
+        self.store = store
+
+    def get_thumbnail(self, image, size: str, fmt: str) -> Tuple[bytes, str]:
+        if not thumbnails_available():
+            raise ThumbnailsUnavailable("Thumbnail generation requires Pillow to be installed")
+
+        _, media_type = THUMBNAIL_FORMATS[fmt]
+        key = thumbnail_key(image.id, image_version(image), size, fmt)
+        data = self.store.get(key)
+        if data is not None:
+            return data, media_type
+
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = _in_flight[key] = Future()
+        if not owner:
+            # Only requests for this very derivative wait; no lock is held meanwhile
+            return future.result(), media_type
+
+        try:
+            data = self.store.get(key)
+            if data is None:
+                data = render_thumbnail(fetch_source_image(image.image_url), THUMBNAIL_SIZES[size], fmt)
+                self.store.put(key, data, media_type)
+                logger.info(f"Generated thumbnail {key} ({len(data)} bytes)")
+            future.set_result(data)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+        return data, media_type
+
+
+thumbnail_service = ThumbnailService(create_object_store(settings.THUMBNAIL_STORE, settings.THUMBNAIL_LOCATION))
@@ -0,0 +1,142 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from jose import jwt, JWTError
+from core.config import settings
+from adminutils.auth import create_access_token
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import secrets
+import logging
+
+logger = logging.getLogger(__name__)
+
+REFRESH_COOKIE = "refresh_token"
+# A token rotated this recently is a client race (two tabs refreshing at once), not a replay
+REFRESH_REUSE_GRACE_SECONDS = 10
+
+
+class RefreshTokenInvalid(Exception):
+    pass
+
+
+class RefreshTokenReused(RefreshTokenInvalid):
+    """
+    A refresh token that was already rotated away was presented again: the token leaked.
+    The whole session family has been revoked.
+    """
+
+
+class RefreshTokenRaced(RefreshTokenInvalid):
+    """
+    The token was rotated moments ago by a concurrent refresh; the client should retry with
+    the cookie that refresh set.
+    """
+
+
+def _new_id() -> str:
+    return secrets.token_urlsafe(16)[:22]
+
+
+def _encode(subject: str, user_id: int, family_id: str, jti: str, expires_at: datetime) -> str:
+    return create_access_token(
+        data={"sub": subject, "user_id": user_id, "type": "refresh", "fam": family_id, "jti": jti},
+        expires_delta=expires_at - datetime.now(timezone.utc)
+    )
+
+
+def issue_refresh_token(db: Session, user_id: int, subject: str, lifetime: timedelta) -> Tuple[str, datetime]:
+    """
+    Start a session family at login. The family's lifetime is fixed here; rotation hands out
+    new tokens but never extends it. Runs inside the caller's transaction.
+    """
+    family_id, jti = _new_id(), _new_id()
+    expires_at = datetime.now(timezone.utc) + lifetime
+    db.execute(
+        text("""
+            INSERT INTO refresh_token_families (family_id, user_id, current_jti, expires_at)
+            VALUES (:family_id, :user_id, :jti, :expires_at)
+        """),
+        {"family_id": family_id, "user_id": user_id, "jti": jti, "expires_at": expires_at}
+    )
+    return _encode(subject, user_id, family_id, jti, expires_at), expires_at
+
+
+def decode_refresh_token(token: Optional[str]) -> dict:
+    if not token:
+        raise RefreshTokenInvalid("Missing refresh token")
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise RefreshTokenInvalid(f"Invalid refresh token: {str(e)}")
+    if payload.get("type") != "refresh" or not payload.get("fam") or not payload.get("jti"):
+        # Tokens issued before rotation existed carry no family and cannot be rotated
+        raise RefreshTokenInvalid("Not a rotatable refresh token")
+    return payload
+
+
+def rotate_refresh_token(db: Session, token: Optional[str]) -> Tuple[dict, str, datetime]:
+    """
+    Swap a refresh token for a new one in a single conditional UPDATE: it only succeeds while the
+    presented jti is the family's current one. Returns (old claims, new token, family expiry).
+    """
+    payload = decode_refresh_token(token)
+    new_jti = _new_id()
+    row = db.execute(
+        text("""
+            UPDATE refresh_token_families
+            SET previous_jti = current_jti, current_jti = :new_jti, rotated_at = now()
+            WHERE family_id = :family_id AND current_jti = :jti
+              AND revoked_at IS NULL AND expires_at > now()
+            RETURNING user_id, expires_at
+        """),
+        {"family_id": payload["fam"], "jti": payload["jti"], "new_jti": new_jti}
+    ).first()
+    if row is not None:
+        db.commit()
+        return payload, _encode(payload.get("sub"), row.user_id, payload["fam"], new_jti, row.expires_at), row.expires_at
+
+    family = db.execute(
+        text("""
+            SELECT previous_jti, rotated_at, revoked_at, expires_at, now() AS db_now
+            FROM refresh_token_families WHERE family_id = :family_id
+        """),
+        {"family_id": payload["fam"]}
+    ).first()
+    db.rollback()
+    if family is None or family.revoked_at is not None or family.expires_at <= family.db_now:
+        raise RefreshTokenInvalid("Session has ended")
+    if (family.previous_jti == payload["jti"] and family.rotated_at is not None
+            and (family.db_now - family.rotated_at).total_seconds() < REFRESH_REUSE_GRACE_SECONDS):
+        raise RefreshTokenRaced("Refresh token was just rotated")
+
+    revoke_refresh_family(db, payload["fam"])
+    logger.warning(f"Refresh token reuse for user {payload.get('user_id')}; revoked session {payload['fam']}")
+    raise RefreshTokenReused("Refresh token was already used")
+
+
+def revoke_refresh_family(db: Session, family_id: str) -> None:
+    db.execute(
+        text("UPDATE refresh_token_families SET revoked_at = now() WHERE family_id = :family_id AND revoked_at IS NULL"),
+        {"family_id": family_id}
+    )
+    db.commit()
+
+
+def prune_refresh_families(db: Session) -> int:
+    """
+    Drop ended sessions. Revoked families are kept until they expire, so a replay of a stolen
+    token still fails as a reuse rather than as an unknown session.
+    """
+    deleted = db.execute(text("DELETE FROM refresh_token_families WHERE expires_at <= now()")).rowcount
+    db.commit()
+    return deleted
+
+
+if __name__ == "__main__":
+    from db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Pruned {prune_refresh_families(db)} expired refresh sessions")
+    finally:
+        db.close()
@@ -0,0 +1,184 @@
+from adminutils.property import get_polygon_coordinates, property_to_feature
+from models.properties import Property
+from core.metrics import timed
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+
+# Grid steps per axis over the collection's bounding box; 1e5 is ~0.5 m across a 50 km window
+DEFAULT_QUANTIZATION = 100000
+MIN_QUANTIZATION = 1000
+MAX_QUANTIZATION = 10000000
+
+Point = Tuple[int, int]
+
+
+def clamp_quantization(quantization: Optional[int]) -> int:
+    if not quantization:
+        return DEFAULT_QUANTIZATION
+    return max(MIN_QUANTIZATION, min(int(quantization), MAX_QUANTIZATION))
+
+
+class _Transform:
+    def __init__(self, bbox: List[float], quantization: int):
+        min_x, min_y, max_x, max_y = bbox
+        self.translate = [min_x, min_y]
+        self.scale = [
+            (max_x - min_x) / (quantization - 1) if max_x > min_x else 1.0,
+            (max_y - min_y) / (quantization - 1) if max_y > min_y else 1.0,
+        ]
+
+    def quantize(self, ring: List[List[float]]) -> List[Point]:
+        """
+        Ring on the integer grid, open (no repeated closing point) and without consecutive duplicates.
+        """
+        (x0, y0), (kx, ky) = self.translate, self.scale
+        points: List[Point] = []
+        for x, y, *_ in ring:
+            point = (int(round((x - x0) / kx)), int(round((y - y0) / ky)))
+            if not points or point != points[-1]:
+                points.append(point)
+        while len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        return points
+
+
+def _bbox(rings: Iterable[List[List[float]]]) -> Optional[List[float]]:
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for ring in rings:
+        for x, y, *_ in ring:
+            min_x, max_x = min(min_x, x), max(max_x, x)
+            min_y, max_y = min(min_y, y), max(max_y, y)
+    if min_x == math.inf:
+        return None
+    return [min_x, min_y, max_x, max_y]
+
+
+def _find_junctions(rings: List[List[Point]]) -> set:
+    """
+    Points where boundaries meet or part: visited more than once with different neighbours.
+    A shared edge runs between two junctions, so cutting every ring at them yields arcs that
+    neighbouring parcels can reference instead of repeating.
+    """
+    neighbours: Dict[Point, Tuple[Point, Point]] = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            previous, following = ring[i - 1], ring[(i + 1) % n]
+            pair = (previous, following) if previous <= following else (following, previous)
+            seen = neighbours.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _canonical_ring(points: List[Point]) -> Tuple[Point, ...]:
+    """
+    Rotation- and direction-independent key of a closed ring that has no junctions,
+    so a parcel duplicated exactly still shares one arc.
+    """
+    start = points.index(min(points))
+    forward = points[start:] + points[:start]
+    backward = [forward[0]] + forward[:0:-1]
+    return tuple(min(forward, backward))
+
+
+class _ArcIndex:
+    def __init__(self):
+        self.arcs: List[List[Point]] = []
+        self._by_key: Dict[Tuple[Point, ...], int] = {}
+
+    def add(self, points: List[Point], key: Optional[Tuple[Point, ...]] = None) -> int:
+        """
+        Index of the arc, reusing an existing one when the same points were already seen in either
+        direction. Reversed references use TopoJSON's one's complement (~index).
+        """
+        key = key or tuple(points)
+        index = self._by_key.get(key)
+        if index is not None:
+            return index
+        reversed_index = self._by_key.get(tuple(reversed(points)))
+        if reversed_index is not None:
+            return ~reversed_index
+        index = len(self.arcs)
+        self.arcs.append(points)
+        self._by_key[key] = index
+        return index
+
+    def encoded(self) -> List[List[List[int]]]:
+        """
+        Delta encoding: the first position is absolute, every following one is relative to the previous.
+        """
+        encoded = []
+        for arc in self.arcs:
+            previous_x = previous_y = 0
+            positions = []
+            for x, y in arc:
+                positions.append([x - previous_x, y - previous_y])
+                previous_x, previous_y = x, y
+            encoded.append(positions)
+        return encoded
+
+
+def _cut_ring(ring: List[Point], junctions: set, arcs: _ArcIndex) -> List[int]:
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    if not cuts:
+        # Store one orientation of the whole ring; this ring references it forwards or reversed
+        canonical = _canonical_ring(ring)
+        index = arcs.add(list(canonical) + [canonical[0]])
+        start = ring.index(min(ring))
+        return [index if tuple(ring[start:] + ring[:start]) == canonical else ~index]
+
+    rotated = ring[cuts[0]:] + ring[:cuts[0]]
+    rotated.append(rotated[0])
+    offsets = [i - cuts[0] for i in cuts] + [len(ring)]
+    return [arcs.add(rotated[start:end + 1]) for start, end in zip(offsets, offsets[1:])]
+
+
+def build_topology(
+    properties: Iterable[Property],
+    quantization: int = DEFAULT_QUANTIZATION,
+    object_name: str = "properties"
+) -> dict:
+    """
+    Encode parcels as a TopoJSON Topology. Coordinates are quantized onto a grid before shared
+    boundaries are detected, so edges digitized separately by neighbouring parcels still match,
+    and every shared edge is stored once as a delta-encoded arc. Feature properties are the same
+    as in the GeoJSON listing.
+    """
+    quantization = clamp_quantization(quantization)
+    with timed("serialize"):
+        parcels = [(prop, get_polygon_coordinates(prop)) for prop in properties]
+        bbox = _bbox(ring for _, rings in parcels for ring in rings if ring and ring[0])
+        topology = {"type": "Topology", "objects": {object_name: {"type": "GeometryCollection", "geometries": []}}, "arcs": []}
+        if bbox is None:
+            return topology
+
+        transform = _Transform(bbox, quantization)
+        quantized = [
+            (prop, [transform.quantize(ring) for ring in rings if ring and ring[0]])
+            for prop, rings in parcels
+        ]
+        junctions = _find_junctions([ring for _, rings in quantized for ring in rings if len(ring) >= 3])
+
+        arcs = _ArcIndex()
+        geometries = topology["objects"][object_name]["geometries"]
+        for prop, rings in quantized:
+            ring_arcs = [_cut_ring(ring, junctions, arcs) for ring in rings if len(ring) >= 3]
+            geometry = {
+                "type": "Polygon",
+                "id": prop.id,
+                "arcs": ring_arcs,
+                "properties": property_to_feature(prop, sign_images=False).properties.model_dump(mode="json"),
+            }
+            if not ring_arcs:
+                # TopoJSON's null geometry
+                geometry["type"] = None
+                del geometry["arcs"]
+            geometries.append(geometry)
+
+        topology["bbox"] = bbox
+        topology["transform"] = {"scale": transform.scale, "translate": transform.translate}
+        topology["arcs"] = arcs.encoded()
+    return topology
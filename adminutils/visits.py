@@ -0,0 +1,290 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from db.session import SessionLocal
+from datetime import datetime
+from typing import Dict, List, Optional
+import threading
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+VISIT_SHARDS = 16
+# Upper bound on how long an increment can sit in memory (and be lost on a crash)
+FLUSH_INTERVAL_SECONDS = 10
+# Rows per UPDATE ... FROM (VALUES ...) statement
+FLUSH_BATCH_SIZE = 1000
+TOP_VISITED_SIZE = 100
+# The top-N snapshot is a full ORDER BY visits scan, so it is rebuilt less often than flushes
+TOP_REFRESH_SECONDS = 60
+# properties.id is an int4; anything outside this cannot be a property
+MAX_PROPERTY_ID = 2 ** 31 - 1
+# Distinct properties buffered at once; visits to further properties are dropped until a flush
+MAX_PENDING_PROPERTIES = 50000
+# Visits one client may record per window; more answer 429
+MAX_VISITS_PER_CLIENT = 120
+VISIT_RATE_WINDOW_SECONDS = 60
+# Clients tracked per window; beyond this, new clients are limited until the window rolls over
+MAX_TRACKED_CLIENTS = 100000
+
+
+class _Shard:
+    __slots__ = ("lock", "counts", "dropped")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[int, int] = {}
+        # Increments refused because the shard already held its share of MAX_PENDING_PROPERTIES
+        self.dropped = 0
+
+
+class VisitBuffer:
+    """
+    In-process visit counters. Increments land in one of several lock-striped shards
+    (keyed by property id) and are periodically written out in bulk, so a popular property
+    costs one UPDATE per flush instead of one per page view. At most `max_pending` distinct
+    properties are held between flushes, so arbitrary ids cannot grow the buffer without bound.
+    """
+
+    def __init__(self, shards: int = VISIT_SHARDS, max_pending: int = MAX_PENDING_PROPERTIES):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_per_shard = max(1, max_pending // shards)
+        self._flush_lock = threading.Lock()
+        self.last_flush_at: Optional[datetime] = None
+        self.last_flush_rows = 0
+        self.flushed_total = 0
+        self.failed_flushes = 0
+        # Increments known to be lost (e.g. the final flush on shutdown failed)
+        self.dropped_increments = 0
+        # When the oldest increment still in memory was recorded; what a crash would lose goes back this far
+        self._oldest_pending_at: Optional[float] = None
+        self.top_visited: List[dict] = []
+        self.top_refreshed_at = 0.0
+        # Increments written since top_visited was read, which the snapshot does not include yet
+        self._flushed_since_top: Dict[int, int] = {}
+
+    def record(self, property_id: int, count: int = 1) -> bool:
+        """
+        Buffer `count` visits; False (and counted as dropped) when the buffer is full.
+        """
+        shard = self._shards[property_id % len(self._shards)]
+        with shard.lock:
+            if property_id not in shard.counts and len(shard.counts) >= self._max_per_shard:
+                shard.dropped += count
+                return False
+            shard.counts[property_id] = shard.counts.get(property_id, 0) + count
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = time.monotonic()
+        return True
+
+    def pending(self) -> Dict[int, int]:
+        snapshot = {}
+        for shard in self._shards:
+            with shard.lock:
+                snapshot.update(shard.counts)
+        return snapshot
+
+    def _drain(self) -> Dict[int, int]:
+        drained = {}
+        for shard in self._shards:
+            with shard.lock:
+                counts, shard.counts = shard.counts, {}
+            drained.update(counts)
+        return drained
+
+    def _restore(self, counts: Dict[int, int], oldest: Optional[float]) -> None:
+        for property_id, count in counts.items():
+            self.record(property_id, count)
+        if oldest is not None:
+            self._oldest_pending_at = min(oldest, self._oldest_pending_at or oldest)
+
+    def drop_pending(self) -> int:
+        """
+        Discard everything buffered, counting it as lost. For shutdown after a failed final flush.
+        """
+        with self._flush_lock:
+            dropped = sum(self._drain().values())
+            self._oldest_pending_at = None
+            self.dropped_increments += dropped
+            return dropped
+
+    def flush(self, db: Session) -> int:
+        """
+        Write all buffered increments, FLUSH_BATCH_SIZE properties per statement.
+        On failure the increments go back into the buffer for the next attempt.
+        """
+        with self._flush_lock:
+            oldest, self._oldest_pending_at = self._oldest_pending_at, None
+            counts = self._drain()
+            if not counts:
+                return 0
+            items = sorted(counts.items())  # stable lock order across concurrent flushers
+            try:
+                for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                    batch = items[start:start + FLUSH_BATCH_SIZE]
+                    params = {}
+                    values = []
+                    for i, (property_id, count) in enumerate(batch):
+                        params[f"id_{i}"] = property_id
+                        params[f"n_{i}"] = count
+                        values.append(f"(CAST(:id_{i} AS integer), CAST(:n_{i} AS integer))")
+                    # updated_at is deliberately untouched: a visit is not a content change
+                    db.execute(text(f"""
+                        UPDATE properties AS p
+                        SET visits = COALESCE(p.visits, 0) + v.delta
+                        FROM (VALUES {", ".join(values)}) AS v(id, delta)
+                        WHERE p.id = v.id
+                    """), params)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.failed_flushes += 1
+                self._restore(counts, oldest)
+                logger.error(f"Visit flush of {len(items)} properties failed: {str(e)}")
+                raise
+
+            self.last_flush_at = datetime.utcnow()
+            self.last_flush_rows = len(items)
+            self.flushed_total += sum(counts.values())
+            for property_id, count in counts.items():
+                self._flushed_since_top[property_id] = self._flushed_since_top.get(property_id, 0) + count
+            return len(items)
+
+    def refresh_top_visited(self, db: Session, size: int = TOP_VISITED_SIZE) -> None:
+        # Under the flush lock, so the snapshot and _flushed_since_top never overlap
+        with self._flush_lock:
+            rows = db.execute(
+                text("""
+                    SELECT id, property_name, visits FROM properties
+                    WHERE visits > 0
+                    ORDER BY visits DESC
+                    LIMIT :size
+                """),
+                {"size": size}
+            ).fetchall()
+            self.top_visited = [{"id": row.id, "property_name": row.property_name, "visits": row.visits} for row in rows]
+            self._flushed_since_top = {}
+            self.top_refreshed_at = time.monotonic()
+
+    def top(self, n: int) -> List[dict]:
+        """
+        Most visited properties: the last aggregated snapshot plus this worker's increments since
+        then, flushed or not, re-ranked together. A property that became hot after the snapshot
+        ranks on its recent visits alone (a lower bound) until the next snapshot names it.
+        """
+        recent = dict(self._flushed_since_top)
+        for property_id, count in self.pending().items():
+            recent[property_id] = recent.get(property_id, 0) + count
+
+        merged = {item["id"]: dict(item) for item in self.top_visited}
+        for property_id, count in recent.items():
+            item = merged.setdefault(property_id, {"id": property_id, "property_name": None, "visits": 0})
+            item["visits"] += count
+        return sorted(merged.values(), key=lambda item: item["visits"], reverse=True)[:n]
+
+    def stats(self) -> dict:
+        pending = self.pending()
+        oldest = self._oldest_pending_at
+        return {
+            "pending_properties": len(pending),
+            # What a hard crash right now would lose
+            "pending_increments": sum(pending.values()),
+            "flush_interval_seconds": FLUSH_INTERVAL_SECONDS,
+            # How far back that loss reaches; grows past the flush interval while flushes fail
+            "max_loss_window_seconds": round(time.monotonic() - oldest, 1) if oldest is not None else 0.0,
+            "dropped_increments": self.dropped_increments + sum(shard.dropped for shard in self._shards),
+            "last_flush_at": self.last_flush_at,
+            "last_flush_rows": self.last_flush_rows,
+            "flushed_total": self.flushed_total,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+class VisitRateLimiter:
+    """
+    Fixed-window cap on the visits each client may record, so a single client cannot inflate
+    counts or keep the buffer full.
+    """
+
+    def __init__(self, limit: int = MAX_VISITS_PER_CLIENT, window: float = VISIT_RATE_WINDOW_SECONDS,
+                 max_clients: int = MAX_TRACKED_CLIENTS):
+        self.limit = limit
+        self.window = window
+        self.max_clients = max_clients
+        self._window_index = 0
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.limited = 0
+
+    def allow(self, client: str) -> bool:
+        index = int(time.time() // self.window)
+        with self._lock:
+            if index != self._window_index:
+                self._window_index, self._counts = index, {}
+            count = self._counts.get(client)
+            if (count is None and len(self._counts) >= self.max_clients) or (count or 0) >= self.limit:
+                self.limited += 1
+                return False
+            self._counts[client] = (count or 0) + 1
+            return True
+
+    def retry_after(self) -> int:
+        return max(1, int(self.window - time.time() % self.window))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rate_limited": self.limited, "tracked_clients": len(self._counts)}
+
+
+visit_buffer = VisitBuffer()
+visit_rate_limiter = VisitRateLimiter()
+
+
+class VisitFlusher:
+    """
+    Background task that flushes the buffer every FLUSH_INTERVAL_SECONDS and once more on shutdown.
+    """
+
+    def __init__(self, buffer: VisitBuffer, session_factory):
+        self.buffer = buffer
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def flush_now(self, refresh_top: bool = True) -> int:
+        db = self.session_factory()
+        try:
+            started = time.perf_counter()
+            rows = self.buffer.flush(db)
+            if refresh_top and time.monotonic() - self.buffer.top_refreshed_at >= TOP_REFRESH_SECONDS:
+                self.buffer.refresh_top_visited(db)
+            if rows:
+                logger.info(f"Flushed visits for {rows} properties in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return rows
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+            try:
+                await loop.run_in_executor(None, self.flush_now)
+            except Exception as e:
+                logger.error(f"Periodic visit flush failed: {str(e)}")
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.flush_now, False)
+        except Exception as e:
+            logger.error(f"Final visit flush failed, {self.buffer.drop_pending()} increments lost: {str(e)}")
+
+
+visit_flusher = VisitFlusher(visit_buffer, SessionLocal)
@@ -0,0 +1,312 @@
+"""
+Synthetic land-record dataset for benchmarks.
+
+Fills a local Postgres/PostGIS (see the `db` service in docker-compose.yml) with realistic,
+reproducible Property rows: irregular parcel polygons around real district locations, centroids,
+images, English/Hindi owner details and a skewed status mix. Every generated row is tagged with a
+BENCH- property name so it can be removed again with --reset.
+
+    python -m benchmarks.generate_data --create-schema --properties 100000 --seed 42
+"""
+from sqlalchemy import text
+from db.session import get_engine, SessionLocal
+from models import Base
+from adminutils.auth import hash_password
+from adminutils.geometry import polygon_area_sq_m
+from datetime import datetime, timedelta
+from typing import List, Tuple
+import argparse
+import logging
+import random
+import math
+import json
+import glob
+import time
+import csv
+import io
+import os
+
+logger = logging.getLogger(__name__)
+
+BENCH_PREFIX = "BENCH-"
+BENCH_ADMIN_EMAIL = "bench-admin@example.com"
+BENCH_ADMIN_PASSWORD = "Bench@12345"
+ADMIN_ROLE_ID = 0
+IMAGE_BUCKET = "bench-property-images"
+BATCH_SIZE = 10000
+METRES_PER_DEGREE = 111320.0
+
+# (state, district, tehsil, village, village in Devanagari, lat, lon)
+LOCATIONS = [
+    ("Haryana", "Karnal", "Assandh", "Salwan", "सालवन", 29.52, 76.60),
+    ("Haryana", "Hisar", "Hansi", "Sisai", "सिसाय", 29.06, 75.97),
+    ("Haryana", "Sonipat", "Gohana", "Butana", "बुटाना", 29.14, 76.69),
+    ("Haryana", "Jind", "Safidon", "Hatt", "हाट", 29.41, 76.67),
+    ("Punjab", "Ludhiana", "Khanna", "Isru", "ईसड़ू", 30.70, 76.22),
+    ("Punjab", "Bathinda", "Talwandi Sabo", "Jagga Ram Tirath", "जग्गा राम तीरथ", 29.98, 75.08),
+    ("Punjab", "Sangrur", "Sunam", "Ubhawal", "उभावाल", 30.13, 75.80),
+    ("Rajasthan", "Jhunjhunu", "Chirawa", "Kidwana", "किड़वाना", 28.24, 75.65),
+    ("Rajasthan", "Sikar", "Fatehpur", "Ramgarh", "रामगढ़", 28.00, 74.96),
+    ("Uttar Pradesh", "Meerut", "Mawana", "Kithore", "किठौर", 28.91, 77.88),
+    ("Uttar Pradesh", "Agra", "Kheragarh", "Saiyan", "सैंया", 26.95, 77.83),
+    ("Madhya Pradesh", "Sehore", "Ashta", "Jawar", "जावर", 23.01, 76.51),
+]
+
+# (English, Devanagari)
+FIRST_NAMES = [
+    ("Ramesh", "रमेश"), ("Suresh", "सुरेश"), ("Mahender", "महेंद्र"), ("Balwant", "बलवंत"),
+    ("Gurpreet", "गुरप्रीत"), ("Harjit", "हरजीत"), ("Sunita", "सुनीता"), ("Kamla", "कमला"),
+    ("Rajbir", "राजबीर"), ("Omprakash", "ओमप्रकाश"), ("Satbir", "सतबीर"), ("Manjeet", "मनजीत"),
+    ("Jagdish", "जगदीश"), ("Savitri", "सावित्री"), ("Krishan", "कृष्ण"), ("Dharampal", "धर्मपाल"),
+]
+FATHER_NAMES = [
+    ("Ram Kishan", "राम किशन"), ("Hoshiyar", "होशियार"), ("Lakhbir", "लखबीर"), ("Shiv Ram", "शिव राम"),
+    ("Bhagat", "भगत"), ("Mangal", "मंगल"), ("Chandgi Ram", "चांदगी राम"), ("Dalip", "दलीप"),
+]
+SURNAMES = [
+    ("Singh", "सिंह"), ("Kumar", "कुमार"), ("Sharma", "शर्मा"), ("Yadav", "यादव"),
+    ("Malik", "मलिक"), ("Sandhu", "संधू"), ("Choudhary", "चौधरी"), ("Devi", "देवी"),
+]
+PROPERTY_TYPES = ["Agricultural", "Agricultural", "Agricultural", "Residential Plot", "Orchard", "Farmhouse", "Commercial"]
+UNITS = ["Bigha", "Acre", "Kanal", "Hectare", "Sq. Yard"]
+# Moderation queues are dominated by approved listings with a long pending tail
+STATUS_WEIGHTS = {"approved": 60, "pending": 25, "disapproved": 7, "flagged": 5, "draft": 3}
+
+PROPERTY_COLUMNS = [
+    "property_name", "owner_name", "type", "price", "area_sq_m", "unit", "murabba", "khasra", "khewat",
+    "khata", "owner_details_en", "owner_details_hi", "state", "district", "tehsil", "village", "landmark",
+    "verified", "available", "centroid", "geom", "visits", "listed_date", "created_at", "updated_at",
+    "status", "flag_reason", "user_uploaded", "phone", "email", "user_id",
+]
+
+
+def split_sql(script: str) -> List[str]:
+    """
+    Split a migration into statements, keeping $$-quoted function bodies intact.
+    """
+    statements, current, in_dollar = [], [], False
+    for line in script.splitlines():
+        stripped = line.strip()
+        if not in_dollar and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        in_dollar ^= line.count("$$") % 2 == 1
+        if not in_dollar and stripped.endswith(";"):
+            statements.append("\n".join(current))
+            current = []
+    if current:
+        statements.append("\n".join(current))
+    return statements
+
+
+def create_schema() -> None:
+    """
+    Tables from the models, then every migration. Migrations use CREATE INDEX CONCURRENTLY,
+    so they run statement by statement in autocommit.
+    """
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS postgis")
+    Base.metadata.create_all(get_engine())
+    migrations_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "migrations")
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for path in sorted(glob.glob(os.path.join(migrations_dir, "*.sql"))):
+            with open(path, encoding="utf-8") as f:
+                for statement in split_sql(f.read()):
+                    connection.exec_driver_sql(statement)
+            logger.info(f"Applied {os.path.basename(path)}")
+
+
+def parcel_polygon(rng: random.Random, lat: float, lon: float) -> List[List[float]]:
+    """
+    Irregular convex-ish parcel of 4-8 vertices, mostly 0.1-2 ha, as a closed lon/lat ring.
+    """
+    radius_m = min(rng.lognormvariate(math.log(60), 0.6), 600)
+    vertices = rng.randint(4, 8)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(vertices))
+    metres_per_lon = METRES_PER_DEGREE * math.cos(math.radians(lat))
+    ring = []
+    for angle in angles:
+        r = radius_m * rng.uniform(0.7, 1.3)
+        ring.append([
+            round(lon + r * math.cos(angle) / metres_per_lon, 7),
+            round(lat + r * math.sin(angle) / METRES_PER_DEGREE, 7),
+        ])
+    ring.append(list(ring[0]))
+    return ring
+
+
+def ensure_users(users: int) -> List[int]:
+    """
+    The bench admin (used by the harness to log in) plus `users` owner accounts.
+    Returns the owner user ids.
+    """
+    hashed = hash_password(BENCH_ADMIN_PASSWORD)  # bcrypt once; every bench account shares it
+    db = SessionLocal()
+    try:
+        db.execute(text("INSERT INTO roles (id, name) VALUES (:id, 'admin') ON CONFLICT DO NOTHING"), {"id": ADMIN_ROLE_ID})
+        emails = [BENCH_ADMIN_EMAIL] + [f"bench-user-{i}@example.com" for i in range(users)]
+        db.execute(
+            text("""
+                INSERT INTO users (email, hashed_password)
+                SELECT email, :hashed FROM unnest(CAST(:emails AS text[])) AS email
+                ON CONFLICT (email) DO NOTHING
+            """),
+            {"emails": emails, "hashed": hashed}
+        )
+        db.execute(
+            text("""
+                INSERT INTO user_role_links (user_id, role_id)
+                SELECT user_id, :role_id FROM users WHERE email = :email
+                ON CONFLICT DO NOTHING
+            """),
+            {"role_id": ADMIN_ROLE_ID, "email": BENCH_ADMIN_EMAIL}
+        )
+        rows = db.execute(
+            text("SELECT user_id FROM users WHERE email = ANY(:emails) ORDER BY user_id"),
+            {"emails": emails[1:]}
+        ).fetchall()
+        db.commit()
+        return [row.user_id for row in rows]
+    finally:
+        db.close()
+
+
+def generate_rows(rng: random.Random, start: int, count: int, seed: int, user_ids: List[int]) -> Tuple[list, list]:
+    """
+    One batch of property rows (in PROPERTY_COLUMNS order) and the image counts per row.
+    """
+    now = datetime.utcnow()
+    statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+    # Zipf-like skew: a few districts hold most of the listings
+    location_weights = [1 / (rank + 1) for rank in range(len(LOCATIONS))]
+    rows, image_counts = [], []
+    for i in range(start, start + count):
+        state, district, tehsil, village, village_hi, lat, lon = rng.choices(LOCATIONS, location_weights)[0]
+        lat += rng.gauss(0, 0.05)
+        lon += rng.gauss(0, 0.05)
+        ring = parcel_polygon(rng, lat, lon)
+        centroid_lon = sum(p[0] for p in ring[:-1]) / (len(ring) - 1)
+        centroid_lat = sum(p[1] for p in ring[:-1]) / (len(ring) - 1)
+
+        area = polygon_area_sq_m([ring])
+        # A few listings carry the figure in their local unit, as real uploads do
+        declared = area * rng.uniform(0.97, 1.03) if rng.random() > 0.03 else area / rng.choice([2529.3, 4046.9, 505.9])
+
+        first, first_hi = rng.choice(FIRST_NAMES)
+        surname, surname_hi = rng.choice(SURNAMES)
+        father, father_hi = rng.choice(FATHER_NAMES)
+        status = rng.choices(statuses, status_weights)[0]
+        created_at = now - timedelta(days=rng.uniform(0, 730))
+        updated_at = min(created_at + timedelta(days=rng.expovariate(1 / 20)), now)
+
+        rows.append([
+            f"{BENCH_PREFIX}{seed}-{i:08d}",
+            f"{first} {surname}",
+            rng.choice(PROPERTY_TYPES),
+            round(rng.lognormvariate(math.log(2500000), 0.9), 2),
+            round(min(declared, 99999999), 2),
+            rng.choice(UNITS),
+            rng.randint(1, 400),
+            f"{rng.randint(1, 999)}//{rng.randint(1, 25)}",
+            str(rng.randint(1, 1500)),
+            str(rng.randint(1, 2500)),
+            f"{first} {surname} S/O {father} {surname}, Village {village}, Tehsil {tehsil}, District {district}",
+            f"{first_hi} {surname_hi} पुत्र {father_hi} {surname_hi}, गाँव {village_hi}",
+            state,
+            district,
+            tehsil,
+            village,
+            f"Near {village} bus stand" if rng.random() < 0.4 else None,
+            status == "approved",
+            rng.random() < 0.9,
+            f"SRID=4326;POINT({centroid_lon:.7f} {centroid_lat:.7f})",
+            json.dumps({"type": "Polygon", "coordinates": [ring]}),
+            int(rng.paretovariate(1.2)) - 1,
+            created_at.date(),
+            created_at,
+            updated_at,
+            status,
+            "Boundary overlaps a neighbouring khasra" if status == "flagged" else None,
+            rng.random() < 0.8,
+            f"9{rng.randint(100000000, 999999999)}",
+            f"owner{i}@example.com",
+            rng.choice(user_ids),
+        ])
+        image_counts.append(rng.choices([0, 1, 2, 3, 4], [10, 25, 30, 20, 15])[0])
+    return rows, image_counts
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows: list) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def load_batch(rows: list, image_counts: List[int], rng: random.Random) -> None:
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        copy_rows(cursor, "properties", PROPERTY_COLUMNS, rows)
+        names = [row[0] for row in rows]
+        cursor.execute("SELECT property_name, id, created_at FROM properties WHERE property_name = ANY(%s)", (names,))
+        ids = {name: (property_id, created_at) for name, property_id, created_at in cursor.fetchall()}
+        images = []
+        for row, count in zip(rows, image_counts):
+            property_id, created_at = ids[row[0]]
+            for k in range(count):
+                uploaded_at = created_at + timedelta(minutes=rng.uniform(0, 60))
+                images.append([property_id, f"gs://{IMAGE_BUCKET}/{row[0]}/{k}.jpg", uploaded_at])
+        copy_rows(cursor, "property_images", ["property_id", "image_url", "uploaded_at"], images)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def reset() -> None:
+    db = SessionLocal()
+    try:
+        bench = "SELECT id FROM properties WHERE property_name LIKE :prefix"
+        params = {"prefix": f"{BENCH_PREFIX}%"}
+        db.execute(text(f"DELETE FROM notifications WHERE property_id IN ({bench})"), params)
+        db.execute(text(f"DELETE FROM property_images WHERE property_id IN ({bench})"), params)
+        deleted = db.execute(text("DELETE FROM properties WHERE property_name LIKE :prefix"), params).rowcount
+        db.commit()
+        logger.info(f"Removed {deleted} benchmark properties")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic land-record dataset for benchmarks")
+    parser.add_argument("--properties", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=200, help="Owner accounts the properties are spread over")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-schema", action="store_true", help="Create tables, PostGIS and apply db/migrations first")
+    parser.add_argument("--reset", action="store_true", help="Remove previously generated rows first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.create_schema:
+        create_schema()
+    if args.reset:
+        reset()
+
+    rng = random.Random(args.seed)
+    user_ids = ensure_users(args.users)
+    started = time.perf_counter()
+    for start in range(0, args.properties, BATCH_SIZE):
+        rows, image_counts = generate_rows(rng, start, min(BATCH_SIZE, args.properties - start), args.seed, user_ids)
+        load_batch(rows, image_counts, rng)
+        logger.info(f"Loaded {start + len(rows)}/{args.properties} properties")
+
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("ANALYZE properties")
+        connection.exec_driver_sql("ANALYZE property_images")
+    logger.info(f"Generated {args.properties} properties in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Import-time (cold start) report.
+
+Imports the app in a fresh interpreter under `python -X importtime`, prints the total and the
+costliest modules, and stores the result next to the HTTP benchmarks so startup cost can be
+tracked across commits:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 40 --compare benchmarks/results/import-<sha>.json
+"""
+from benchmarks.run import RESULTS_DIR, git_revision
+from datetime import datetime
+from typing import List, Tuple
+import subprocess
+import argparse
+import json
+import sys
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> List[Tuple[str, int, int]]:
+    """
+    (module, self us, cumulative us) for every module imported by `import <module>`.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report what importing the app costs")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to take the fastest of")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/import-<git sha>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    args = parser.parse_args()
+
+    # The fastest run is the least disturbed by disk cache and scheduler noise
+    runs = [measure(args.module) for _ in range(args.runs)]
+    entries = min(runs, key=lambda run: next(c for name, _, c in run if name == args.module))
+    total_ms = next(c for name, _, c in entries if name == args.module) / 1000
+
+    by_package = {}
+    for name, self_us, _ in entries:
+        top_level = name.split(".")[0]
+        by_package[top_level] = by_package.get(top_level, 0) + self_us
+
+    print(f"import {args.module}: {total_ms:.1f} ms, {len(entries)} modules\n")
+    print(f"{'package':<30}{'self ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<30}{self_us / 1000:>10.1f}")
+
+    result = {
+        "revision": git_revision(),
+        "started_at": datetime.utcnow().isoformat(),
+        "python": sys.version.split()[0],
+        "module": args.module,
+        "total_ms": round(total_ms, 1),
+        "modules": len(entries),
+        "packages_ms": {package: round(us / 1000, 1) for package, us in sorted(by_package.items(), key=lambda item: -item[1])},
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"import-{result['revision']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        change = (result["total_ms"] - baseline["total_ms"]) / baseline["total_ms"]
+        print(f"Compared with {baseline['revision']}: {baseline['total_ms']} -> {result['total_ms']} ms ({change:+.0%})")
+        for package, ms in list(result["packages_ms"].items())[:args.top]:
+            before = baseline["packages_ms"].get(package, 0.0)
+            if abs(ms - before) >= 5:
+                print(f"  {package:<28}{before:>8.1f} -> {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
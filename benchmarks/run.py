@@ -0,0 +1,275 @@
+"""
+HTTP benchmark harness for the admin API.
+
+Drives the listing, counts, status update, login and export endpoints of a running server
+(seeded with benchmarks.generate_data) from a pool of client threads, and records latency
+percentiles and throughput per scenario. Results are written to benchmarks/results/<git sha>.json
+so a later run can be compared against them:
+
+    python -m benchmarks.run --base-url http://localhost:8060 --duration 30 --concurrency 16
+    python -m benchmarks.run --compare benchmarks/results/<baseline sha>.json --fail-on-regression
+"""
+from benchmarks.generate_data import BENCH_ADMIN_EMAIL, BENCH_ADMIN_PASSWORD
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode
+import urllib.request
+import urllib.error
+import subprocess
+import threading
+import platform
+import argparse
+import random
+import time
+import json
+import sys
+import os
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# A scenario is reported as regressed when p50 or p95 is this much slower than the baseline
+DEFAULT_REGRESSION_THRESHOLD = 0.15
+
+
+class Client:
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token: Optional[str] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None, content_type: Optional[str] = None):
+        """
+        Returns (status, bytes read). The whole body is always read, so streamed responses are timed to the last byte.
+        """
+        request = urllib.request.Request(self.base_url + path, data=body, method=method)
+        request.add_header("Accept-Encoding", "gzip, br")
+        if content_type:
+            request.add_header("Content-Type", content_type)
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                size = 0
+                while True:
+                    chunk = response.read(65536)
+                    if not chunk:
+                        return response.status, size
+                    size += len(chunk)
+        except urllib.error.HTTPError as e:
+            return e.code, len(e.read())
+
+    def login(self) -> None:
+        status, body = self.post_form("/auth/admin/login", {"identifier": BENCH_ADMIN_EMAIL, "password": BENCH_ADMIN_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Benchmark admin login failed with {status}; run benchmarks.generate_data first")
+        self.token = json.loads(body)["access_token"]
+
+    def post_form(self, path: str, fields: dict):
+        request = urllib.request.Request(self.base_url + path, data=urlencode(fields).encode("ascii"), method="POST")
+        request.add_header("Content-Type", "application/x-www-form-urlencoded")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def get_json(self, path: str):
+        request = urllib.request.Request(self.base_url + path)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def discover_property_ids(client: Client, status: str = "pending", pages: int = 5) -> List[int]:
+    ids = []
+    for page in range(1, pages + 1):
+        try:
+            data = client.get_json(f"/properties/admin/properties/{status}?page={page}&limit=100")
+        except urllib.error.HTTPError:
+            break
+        ids.extend(feature["properties"]["id"] for feature in data["data"]["features"])
+        if not data["has_more"]:
+            break
+    return ids
+
+
+def build_scenarios(client: Client, rng: random.Random) -> Dict[str, Callable[[], tuple]]:
+    statuses = ["pending", "approved", "flagged"]
+    property_ids = discover_property_ids(client)
+
+    def listing():
+        return client.request("GET", f"/properties/admin/properties/{rng.choice(statuses)}?page={rng.randint(1, 5)}&limit=20")
+
+    def counts():
+        return client.request("GET", "/properties/admin/user-properties/counts")
+
+    def status_update():
+        # Flip between pending and flagged so the dataset's shape is preserved across runs
+        property_id = rng.choice(property_ids)
+        body = json.dumps({"status": rng.choice(["pending", "flagged"]), "flag_reason": "benchmark"}).encode("utf-8")
+        return client.request("POST", f"/properties/admin/properties/{property_id}/status", body, "application/json")
+
+    def login():
+        body = urlencode({"identifier": BENCH_ADMIN_EMAIL, "password": BENCH_ADMIN_PASSWORD}).encode("ascii")
+        return client.request("POST", "/auth/admin/login", body, "application/x-www-form-urlencoded")
+
+    def export():
+        return client.request("GET", "/properties/admin/export/properties?format=ndjson&status=flagged")
+
+    scenarios = {"listing": listing, "counts": counts, "login": login, "export": export}
+    if property_ids:
+        scenarios["status_update"] = status_update
+    return scenarios
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_scenario(name: str, fn: Callable[[], tuple], duration: float, concurrency: int,
+                 max_requests: Optional[int], warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+
+    latencies: List[float] = []
+    errors = 0
+    total_bytes = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    issued = 0
+
+    def worker():
+        nonlocal errors, total_bytes, issued
+        while time.perf_counter() < deadline:
+            with lock:
+                if max_requests is not None and issued >= max_requests:
+                    return
+                issued += 1
+            started = time.perf_counter()
+            try:
+                status, size = fn()
+            except Exception:
+                status, size = 0, 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                total_bytes += size
+                if status >= 400 or status == 0:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p90_ms": ms(percentile(latencies, 0.90)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(latencies[-1]) if latencies else 0.0,
+        "bytes_per_request": int(total_bytes / len(latencies)) if latencies else 0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"]) != 0
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Print a per-scenario comparison and return the names of scenarios that regressed.
+    """
+    regressed = []
+    print(f"\nCompared with {baseline['revision']} ({baseline['started_at']}):")
+    print(f"{'scenario':<15}{'p50 ms':>18}{'p95 ms':>18}{'rps':>18}")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+
+        def cell(key):
+            old, new = before[key], result[key]
+            change = (new - old) / old if old else 0.0
+            return f"{new:>8} ({change:+.0%})"
+
+        print(f"{name:<15}{cell('p50_ms'):>18}{cell('p95_ms'):>18}{cell('throughput_rps'):>18}")
+        if any(before[key] and (result[key] - before[key]) / before[key] > threshold for key in ("p50_ms", "p95_ms")):
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the admin API endpoints")
+    parser.add_argument("--base-url", default="http://localhost:8060")
+    parser.add_argument("--scenarios", default="listing,counts,status_update,login,export")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--max-requests", type=int, help="Stop a scenario after this many requests")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per scenario")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<git sha>.json)")
+    parser.add_argument("--compare", help="Baseline result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    client = Client(args.base_url, args.timeout)
+    client.login()
+    scenarios = build_scenarios(client, random.Random(args.seed))
+
+    result = {
+        "revision": git_revision(),
+        "started_at": datetime.utcnow().isoformat(),
+        "base_url": args.base_url,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "scenarios": {},
+    }
+    for name in args.scenarios.split(","):
+        if name not in scenarios:
+            print(f"Skipping {name}: unknown or no data for it", file=sys.stderr)
+            continue
+        # The export streams a large body; a few requests are plenty
+        concurrency = min(args.concurrency, 2) if name == "export" else args.concurrency
+        result["scenarios"][name] = stats = run_scenario(
+            name, scenarios[name], args.duration, concurrency, args.max_requests, args.warmup
+        )
+        print(f"{name:<15} {stats['requests']:>6} req  {stats['throughput_rps']:>8} rps  "
+              f"p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  "
+              f"errors {stats['errors']}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['revision']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(result, json.load(f), args.threshold)
+        if regressed:
+            print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressed)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# app/core/admission.py
+
+import math
+import time
+import asyncio
+import re
+from collections import deque
+from typing import Deque, Dict, Optional
+from urllib.parse import parse_qs
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from core.metrics import Counter, Gauge, Histogram, MetricsRegistry, registry, DURATION_BUCKETS
+
+# Listing pages and map windows larger than this are a bulk read (see CACHEABLE_PAGE_LIMIT in routers/properties.py)
+BULK_PAGE_LIMIT = 100
+# Smoothing of the per-class service time used for Retry-After
+SERVICE_TIME_WEIGHT = 0.2
+
+
+class PriorityClass:
+    """
+    A class of requests. `reserve` slots of the shared capacity are kept free for classes of a
+    higher priority (lower number), so bulk work can never take the last slots needed to log in
+    or moderate. `max_concurrent` caps the class on its own.
+    """
+
+    __slots__ = ("name", "priority", "reserve", "max_concurrent", "max_queue", "max_wait")
+
+    def __init__(self, name: str, priority: int, reserve: int, max_concurrent: Optional[int], max_queue: int, max_wait: float):
+        self.name = name
+        self.priority = priority
+        self.reserve = reserve
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+
+PRIORITY_CLASSES = {
+    cls.name: cls for cls in (
+        PriorityClass("critical", 0, reserve=0, max_concurrent=None, max_queue=100, max_wait=10),
+        PriorityClass("interactive", 1, reserve=2, max_concurrent=None, max_queue=50, max_wait=5),
+        PriorityClass("bulk", 2, reserve=4, max_concurrent=2, max_queue=4, max_wait=30),
+    )
+}
+
+# First match wins: (methods or None for any, path pattern, class or None to bypass admission)
+ROUTE_CLASSES = [
+    # Long-lived streams hold no database connection while idle
+    (None, re.compile(r"^/properties/admin/events/"), None),
+    (None, re.compile(r"^/metrics$"), None),
+    (None, re.compile(r"^/auth/"), "critical"),
+    ({"PATCH", "POST"}, re.compile(r"^/properties/admin/properties/\d+(/status)?$"), "critical"),
+    (None, re.compile(r"^/properties/admin/queue/"), "critical"),
+    (None, re.compile(r"^/properties/admin/(export|import)/"), "bulk"),
+    (None, re.compile(r"^/users/admin/users/export$"), "bulk"),
+    ({"GET"}, re.compile(r"^/properties/admin/area-audit$"), "bulk"),
+]
+
+
+def classify(scope: Scope) -> Optional[str]:
+    method, path = scope["method"], scope["path"]
+    for methods, pattern, name in ROUTE_CLASSES:
+        if (methods is None or method in methods) and pattern.match(path):
+            return name
+    if method == "GET" and path.startswith(("/properties/admin/properties/", "/properties/admin/bbox/")):
+        limit = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("limit")
+        if limit and limit[0].isdigit() and int(limit[0]) > BULK_PAGE_LIMIT:
+            return "bulk"
+    return "interactive"
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Per-worker admission: at most `capacity` requests run at once, the rest wait in a bounded
+    queue per class and are admitted highest priority first. All state lives on the event loop,
+    so no locking is needed.
+    """
+
+    def __init__(self, capacity: int, classes: Dict[str, PriorityClass] = PRIORITY_CLASSES):
+        self.capacity = capacity
+        self.classes = classes
+        self.by_priority = sorted(classes.values(), key=lambda cls: cls.priority)
+        self.in_flight = 0
+        self.active: Dict[str, int] = {name: 0 for name in classes}
+        self.waiters: Dict[str, Deque[asyncio.Future]] = {name: deque() for name in classes}
+        self.service_time: Dict[str, float] = {name: 1.0 for name in classes}
+
+    def _limit(self, cls: PriorityClass) -> int:
+        # Every class can run at least one request, however small the capacity
+        return max(self.capacity - cls.reserve, 1)
+
+    def _can_admit(self, cls: PriorityClass) -> bool:
+        if self.in_flight >= self._limit(cls):
+            return False
+        return cls.max_concurrent is None or self.active[cls.name] < cls.max_concurrent
+
+    def _admit(self, cls: PriorityClass) -> None:
+        self.in_flight += 1
+        self.active[cls.name] += 1
+
+    def _queued_ahead(self, cls: PriorityClass) -> bool:
+        return any(self.waiters[other.name] for other in self.by_priority if other.priority <= cls.priority)
+
+    async def acquire(self, cls: PriorityClass) -> float:
+        """
+        Wait for a slot; returns the seconds spent queued. Raises Rejected when the class queue
+        is full or the wait exceeds its budget.
+        """
+        if self._can_admit(cls) and not self._queued_ahead(cls):
+            self._admit(cls)
+            return 0.0
+        queue = self.waiters[cls.name]
+        if len(queue) >= cls.max_queue:
+            raise Rejected("queue_full")
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), cls.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the wait ended; hand the slot back
+                self.release(cls, 0.0)
+            else:
+                waiter.cancel()
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise Rejected("timeout")
+        return time.perf_counter() - started
+
+    def release(self, cls: PriorityClass, held_seconds: float) -> None:
+        self.in_flight -= 1
+        self.active[cls.name] -= 1
+        if held_seconds:
+            self.service_time[cls.name] += SERVICE_TIME_WEIGHT * (held_seconds - self.service_time[cls.name])
+        self._wake()
+
+    def _wake(self) -> None:
+        for cls in self.by_priority:
+            queue = self.waiters[cls.name]
+            while queue and self._can_admit(cls):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._admit(cls)
+                waiter.set_result(None)
+
+    def retry_after(self, cls: PriorityClass) -> int:
+        """
+        Rough seconds until the queue ahead drains: one service time per wave of admissions.
+        """
+        slots = self._limit(cls)
+        if cls.max_concurrent is not None:
+            slots = min(slots, cls.max_concurrent)
+        waves = (len(self.waiters[cls.name]) + slots) / slots
+        return max(1, math.ceil(self.service_time[cls.name] * waves))
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "classes": {
+                name: {
+                    "active": self.active[name],
+                    "queued": len(self.waiters[name]),
+                    "service_time_seconds": round(self.service_time[name], 3),
+                }
+                for name in self.classes
+            },
+        }
+
+
+class AdmissionMiddleware:
+    """
+    Admission control in front of the routes: a request runs once its class gets a slot, and gets
+    a 503 with Retry-After when the class queue is full or it waited too long. Slots are held
+    until the last byte is sent, so streamed exports count for their whole duration.
+    Add it inside MetricsMiddleware so rejections show up in the request metrics.
+    """
+
+    def __init__(self, app: ASGIApp, capacity: int, registry: MetricsRegistry = registry) -> None:
+        self.app = app
+        self.controller = AdmissionController(capacity)
+        self.wait_time = Histogram(
+            "admission_wait_seconds", "Time spent queued before admission", DURATION_BUCKETS, ("class",)
+        )
+        self.rejected = Counter("admission_rejected_total", "Requests turned away with a 503", ("class", "reason"))
+        controller = self.controller
+        registry.register(
+            self.wait_time,
+            self.rejected,
+            Gauge("admission_in_flight", "Admitted requests still running", ("class",),
+                  lambda: {(name,): count for name, count in controller.active.items()}),
+            Gauge("admission_queue_depth", "Requests waiting for admission", ("class",),
+                  lambda: {(name,): len(queue) for name, queue in controller.waiters.items()}),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = classify(scope) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        cls = self.controller.classes[name]
+        try:
+            waited = await self.controller.acquire(cls)
+        except Rejected as e:
+            self.rejected.inc((name, e.reason))
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after(cls))}
+            )
+            await response(scope, receive, send)
+            return
+
+        self.wait_time.observe((name,), waited)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(cls, time.perf_counter() - started)
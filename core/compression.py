@@ -0,0 +1,162 @@
+# app/core/compression.py
+
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # optional: only advertised when installed
+except ImportError:
+    brotli = None
+
+# Already compressed, or must reach the client unbuffered
+EXCLUDED_MEDIA_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Parse an Accept-Encoding header into {coding: qvalue}.
+    """
+    codings = {}
+    for item in header.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        codings[parts[0].lower()] = q
+    return codings
+
+
+def negotiate_encoding(header: str):
+    """
+    Pick "br" or "gzip" for the request, or None to send the body as-is.
+    Brotli wins ties because it is both smaller and cheaper to decode for GeoJSON.
+    """
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    candidates = []
+    if brotli is not None:
+        candidates.append((codings.get("br", wildcard), 1, "br"))
+    candidates.append((codings.get("gzip", wildcard), 0, "gzip"))
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 -> gzip container
+            self._impl = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Flush after every chunk so streamed features reach the client without waiting
+        if self.encoding == "br":
+            return self._impl.process(data) + self._impl.flush()
+        return self._impl.compress(data) + self._impl.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._impl.finish()
+        return self._impl.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/brotli response compression.
+    Bodies below `minimum_size` are sent uncompressed; streaming bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Message = None
+        self.passthrough = False
+        self.started = False
+        self.compressor: _Compressor = None
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in (204, 304) or "content-encoding" in headers:
+            return True
+        content_type = headers.get("content-type", "")
+        return any(content_type.startswith(media_type) for media_type in EXCLUDED_MEDIA_TYPES)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(message)
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            await self._start()
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        if not self.started:
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self._start()
+                await self._send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+                payload = self.compressor.compress(body)
+            else:
+                payload = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(payload))
+            await self._start()
+            await self._send({"type": "http.response.body", "body": payload, "more_body": more_body})
+            return
+
+        payload = self.compressor.compress(body) if body else b""
+        if not more_body:
+            payload += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": payload, "more_body": more_body})
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self._send(self.start_message)
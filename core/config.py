@@ -11,8 +11,33 @@ class Settings(BaseSettings):
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     SQLALCHEMY_DATABASE_URL: str
+    # Comma separated read replica URLs; read-only routes use them when they are current enough
+    SQLALCHEMY_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_SECONDS: float = 2.0
+    # After a write, that client reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 10
     MAIL_SERVER: str
     MAIL_PORT: int
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    # Where generated thumbnails are kept: "local" (THUMBNAIL_LOCATION is a directory) or "gcs" (a bucket name)
+    THUMBNAIL_STORE: str = "local"
+    THUMBNAIL_LOCATION: str = "var/thumbnails"
+    # Comma separated allowlists for fetching originals: http(s) hosts and gs:// buckets
+    IMAGE_SOURCE_HOSTS: str = "storage.googleapis.com"
+    IMAGE_SOURCE_BUCKETS: str = ""
+    # Signed image URLs in listings: "gcs", "local" (HMAC fake) or "none" to leave them out
+    SIGNED_URL_PROVIDER: str = "none"
+    SIGNED_URL_TTL_SECONDS: int = 3600
+    # Startup warm-up; DB_WARM_CONNECTIONS pool connections are opened before the first request
+    WARM_UP_ON_STARTUP: bool = True
+    DB_WARM_CONNECTIONS: int = 2
+    # Requests allowed to run at once per worker; keep it at or below the DB pool size (5 + 10 overflow)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_CAPACITY: int = 12
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,245 @@
+# app/core/metrics.py
+
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Requests that matched no route share one label, so probing random URLs cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetrics:
+    __slots__ = ("started", "db_queries", "db_seconds", "timings")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # Named phases recorded by application code, e.g. "serialize"
+        self.timings: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def record_timing(name: str, seconds: float) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.timings[name] = metrics.timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """
+    Count queries and time spent in the database for the request being served.
+    The context variable is copied into threadpool workers, so sync endpoints and
+    streaming generators are attributed to their request as well.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.db_queries += 1
+            metrics.db_seconds += time.perf_counter() - started
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = labels
+        # label values -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, label_values: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self._series.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value:g}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """
+    Current values read from `collect` at scrape time, for state that is already tracked elsewhere.
+    """
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for label_values, value in sorted(self.collect().items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value:g}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Per-process aggregates. Each worker exposes its own; Prometheus sums them across targets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        route_labels = ("method", "route")
+        self.requests = Counter("http_requests_total", "Requests served", ("method", "route", "status"))
+        self.duration = Histogram("http_request_duration_seconds", "Wall time per request", DURATION_BUCKETS, route_labels)
+        self.db_queries = Histogram("http_request_db_queries", "Database queries per request", QUERY_COUNT_BUCKETS, route_labels)
+        self.db_duration = Histogram("http_request_db_duration_seconds", "Database time per request", DURATION_BUCKETS, route_labels)
+        self.serialize_duration = Histogram(
+            "http_request_serialize_duration_seconds", "Response serialization time per request", DURATION_BUCKETS, route_labels
+        )
+        self.response_size = Histogram("http_response_size_bytes", "Response body bytes as sent", SIZE_BUCKETS, route_labels)
+        self._metrics = [self.requests, self.duration, self.db_queries, self.db_duration, self.serialize_duration, self.response_size]
+
+    def observe_request(self, method: str, route: str, status: int, metrics: RequestMetrics, seconds: float, size: int) -> None:
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.duration.observe(labels, seconds)
+            self.db_queries.observe(labels, metrics.db_queries)
+            self.db_duration.observe(labels, metrics.db_seconds)
+            self.serialize_duration.observe(labels, metrics.timings.get("serialize", 0.0))
+            self.response_size.observe(labels, size)
+
+    def register(self, *metrics) -> None:
+        with self._lock:
+            self._metrics.extend(metrics)
+
+    def render(self) -> str:
+        with self._lock:
+            return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(metrics: RequestMetrics, total_seconds: float) -> str:
+    parts = [
+        f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.db_queries} queries"',
+    ]
+    for name, seconds in metrics.timings.items():
+        parts.append(f"{name};dur={seconds * 1000:.1f}")
+    parts.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """
+    Per-request wall time, DB query count/time, serialization time and response size.
+    Sent as a Server-Timing header and folded into per-route histograms for /metrics.
+
+    For streamed responses the header is sent with the first byte, so it only covers the work
+    done up to that point; the histograms are recorded after the last byte and cover everything.
+    Add it last, so it wraps compression and sees the bytes that actually go out.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = registry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(metrics, time.perf_counter() - metrics.started))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            self.registry.observe_request(
+                scope["method"],
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                metrics,
+                time.perf_counter() - metrics.started,
+                size
+            )
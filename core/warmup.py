@@ -0,0 +1,49 @@
+# app/core/warmup.py
+
+import time
+import logging
+from fastapi import FastAPI
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(timings: dict, name: str, fn) -> None:
+    started = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        # A warm-up step failing only means the first request pays for it
+        logger.warning(f"Warm-up step {name} failed: {str(e)}")
+    timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def warm_up(app: FastAPI) -> dict:
+    """
+    Do the one-off work that imports were relieved of, before traffic arrives instead of on the
+    first requests: open pool connections, load the geometry stack and build the OpenAPI schema
+    (which generates the JSON schema of every request/response model). Returns step timings in ms.
+    """
+    timings = {}
+
+    def open_connections():
+        from sqlalchemy import text
+        from db.session import get_engine
+
+        engine = get_engine()
+        connections = [engine.connect() for _ in range(settings.DB_WARM_CONNECTIONS)]
+        try:
+            for connection in connections:
+                connection.execute(text("SELECT 1"))
+        finally:
+            # Closing hands them back to the pool, already established
+            for connection in connections:
+                connection.close()
+
+    def load_geometry():
+        import geoalchemy2.shape  # noqa: F401  (pulls in shapely and numpy)
+
+    _timed(timings, "db_pool", open_connections)
+    _timed(timings, "geometry", load_geometry)
+    _timed(timings, "openapi", app.openapi)
+    return timings
@@ -0,0 +1,3 @@
+-- Backs the max(updated_at)/count() ETag validators on the status listing and counts endpoints.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_properties_status_updated_at
+    ON properties (status, updated_at);
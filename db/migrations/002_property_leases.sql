@@ -0,0 +1,10 @@
+-- Moderation queue leases, claimed with SELECT ... FOR NO KEY UPDATE SKIP LOCKED.
+CREATE TABLE IF NOT EXISTS property_leases (
+    property_id integer PRIMARY KEY REFERENCES properties (id) ON DELETE CASCADE,
+    admin_id integer NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+    leased_at timestamp NOT NULL DEFAULT now(),
+    expires_at timestamp NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_property_leases_admin_id ON property_leases (admin_id);
+CREATE INDEX IF NOT EXISTS ix_property_leases_expires_at ON property_leases (expires_at);
@@ -0,0 +1,19 @@
+-- Notification inbox: read tracking, keyset index, maintained unread counters.
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS read_at timestamp;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_user_created
+    ON notifications (user_id, created_at DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_user_unread
+    ON notifications (user_id) WHERE read_at IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_notifications_created_at_brin
+    ON notifications USING brin (created_at);
+
+CREATE TABLE IF NOT EXISTS notification_counters (
+    user_id integer PRIMARY KEY REFERENCES users (user_id) ON DELETE CASCADE,
+    unread_count integer NOT NULL DEFAULT 0
+);
+
+-- Seed counters from the existing unread rows
+INSERT INTO notification_counters (user_id, unread_count)
+SELECT user_id, count(*) FROM notifications WHERE read_at IS NULL GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count;
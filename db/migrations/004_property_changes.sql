@@ -0,0 +1,41 @@
+-- Delta sync: keyset index over updated_at and a tombstone log of deletions and status transitions.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_properties_updated_at_id
+    ON properties (updated_at, id);
+
+CREATE TABLE IF NOT EXISTS property_changes (
+    id bigserial PRIMARY KEY,
+    property_id integer NOT NULL,
+    change_type varchar(20) NOT NULL,
+    status_from varchar(20),
+    status_to varchar(20),
+    changed_at timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_property_changes_changed_at_id
+    ON property_changes (changed_at, id);
+
+-- Written by triggers so every writer (API, importer, audit, ad-hoc SQL) is covered, in the
+-- same transaction as the change itself. changed_at = now() matches the row's updated_at.
+CREATE OR REPLACE FUNCTION record_property_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO property_changes (property_id, change_type, status_from)
+        VALUES (OLD.id, 'deleted', OLD.status::text);
+        RETURN OLD;
+    END IF;
+    INSERT INTO property_changes (property_id, change_type, status_from, status_to)
+    VALUES (NEW.id, 'status_changed', OLD.status::text, NEW.status::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_properties_deleted ON properties;
+CREATE TRIGGER trg_properties_deleted
+    AFTER DELETE ON properties
+    FOR EACH ROW EXECUTE FUNCTION record_property_change();
+
+DROP TRIGGER IF EXISTS trg_properties_status_changed ON properties;
+CREATE TRIGGER trg_properties_status_changed
+    AFTER UPDATE OF status ON properties
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION record_property_change();
@@ -0,0 +1,51 @@
+-- Pre-aggregated listing volume, status mix, prices and extent per district and per tehsil,
+-- maintained incrementally by adminutils/rollups.py.
+CREATE TABLE IF NOT EXISTS property_district_rollups (
+    level varchar(10) NOT NULL,        -- district | tehsil
+    state varchar(100) NOT NULL,
+    district varchar(100) NOT NULL,
+    tehsil varchar(100) NOT NULL,      -- '' on district rows
+    status varchar(20) NOT NULL,       -- a property status, or 'all'
+    listings integer NOT NULL,
+    priced integer NOT NULL,
+    price_sum numeric(18, 2),
+    median_price numeric(14, 2),
+    area_sq_m_sum numeric(16, 2),
+    xmin double precision,
+    ymin double precision,
+    xmax double precision,
+    ymax double precision,
+    refreshed_at timestamp NOT NULL DEFAULT now(),
+    PRIMARY KEY (level, state, district, tehsil, status)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_refresh_state (
+    name varchar(50) PRIMARY KEY,
+    refreshed_through timestamp NOT NULL
+);
+
+-- Districts a property left (deleted or relocated). Rows that are inserted or updated in place
+-- are found through updated_at instead.
+CREATE TABLE IF NOT EXISTS district_rollup_dirty (
+    state varchar(100) NOT NULL,
+    district varchar(100) NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION mark_district_rollup_dirty() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO district_rollup_dirty (state, district)
+    VALUES (coalesce(OLD.state, ''), coalesce(OLD.district, ''));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_properties_rollup_deleted ON properties;
+CREATE TRIGGER trg_properties_rollup_deleted
+    AFTER DELETE ON properties
+    FOR EACH ROW EXECUTE FUNCTION mark_district_rollup_dirty();
+
+DROP TRIGGER IF EXISTS trg_properties_rollup_relocated ON properties;
+CREATE TRIGGER trg_properties_rollup_relocated
+    AFTER UPDATE OF state, district ON properties
+    FOR EACH ROW WHEN (OLD.state IS DISTINCT FROM NEW.state OR OLD.district IS DISTINCT FROM NEW.district)
+    EXECUTE FUNCTION mark_district_rollup_dirty();
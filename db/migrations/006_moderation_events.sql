@@ -0,0 +1,45 @@
+-- Append-only moderation log, range partitioned by month. Time-bounded queries only touch the
+-- partitions they overlap, and old months can be detached or dropped without a bulk DELETE.
+CREATE TABLE IF NOT EXISTS moderation_events (
+    id bigserial,
+    property_id integer NOT NULL,
+    admin_id integer,                  -- NULL for automated actions (e.g. the area audit)
+    action varchar(30) NOT NULL,       -- status_changed | updated | area_audit
+    status_from varchar(20),
+    status_to varchar(20),
+    reason text,
+    created_at timestamp NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Rows outside every monthly partition land here instead of failing the moderation transaction
+CREATE TABLE IF NOT EXISTS moderation_events_default PARTITION OF moderation_events DEFAULT;
+
+-- Rows arrive in time order, so a BRIN index stays tiny and serves time-range scans
+CREATE INDEX IF NOT EXISTS ix_moderation_events_created_at_brin
+    ON moderation_events USING brin (created_at);
+-- "Everything admin X did last month" and per-property timelines, newest first
+CREATE INDEX IF NOT EXISTS ix_moderation_events_admin_created
+    ON moderation_events (admin_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_moderation_events_property_created
+    ON moderation_events (property_id, created_at DESC, id DESC);
+
+-- Creates the partitions for the current month and the next `months_ahead`; safe to re-run.
+-- Run monthly (python -m adminutils.moderation_log --ensure-partitions).
+CREATE OR REPLACE FUNCTION ensure_moderation_event_partitions(months_ahead integer) RETURNS void AS $$
+DECLARE
+    month_start date;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        month_start := (date_trunc('month', now()) + make_interval(months => i))::date;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF moderation_events FOR VALUES FROM (%L) TO (%L)',
+            'moderation_events_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + interval '1 month')::date
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_moderation_event_partitions(3);
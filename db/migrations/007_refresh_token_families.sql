@@ -0,0 +1,17 @@
+-- Refresh token rotation. One row per login session ("family"), holding only the jti of the
+-- token currently valid for it, so the store grows with sessions rather than with refreshes.
+CREATE TABLE IF NOT EXISTS refresh_token_families (
+    family_id varchar(32) PRIMARY KEY,
+    user_id integer NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+    current_jti varchar(32) NOT NULL,
+    previous_jti varchar(32),
+    rotated_at timestamp,
+    revoked_at timestamp,
+    created_at timestamp NOT NULL DEFAULT now(),
+    expires_at timestamp NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_refresh_token_families_user_id
+    ON refresh_token_families (user_id);
+CREATE INDEX IF NOT EXISTS ix_refresh_token_families_expires_at
+    ON refresh_token_families (expires_at);
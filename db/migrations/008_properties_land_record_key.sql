@@ -0,0 +1,23 @@
+-- Land-record key (state, district, tehsil, village, murabba, khasra, khewat): how field staff
+-- look parcels up, and unique per parcel. Missing parts are coalesced, because a plain unique
+-- index treats NULLs as distinct and would let a record without a tehsil or khewat be listed
+-- twice. Rows without a khasra are not land records and are left out. Lookups must use these
+-- exact expressions (see adminutils/land_records.py) for the planner to pick the index.
+--
+-- CREATE UNIQUE INDEX CONCURRENTLY fails on existing duplicates and leaves an INVALID index
+-- behind. Find duplicates first with:
+--
+--   SELECT coalesce(state, ''), coalesce(district, ''), coalesce(tehsil, ''), coalesce(village, ''),
+--          coalesce(murabba, -1), khasra, coalesce(khewat, ''), array_agg(id ORDER BY id) AS property_ids
+--   FROM properties
+--   WHERE khasra IS NOT NULL
+--   GROUP BY 1, 2, 3, 4, 5, 6, 7
+--   HAVING count(*) > 1;
+--
+-- and once they are resolved, DROP INDEX CONCURRENTLY ux_properties_land_record before retrying.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_properties_land_record
+    ON properties (
+        coalesce(state, ''), coalesce(district, ''), coalesce(tehsil, ''), coalesce(village, ''),
+        coalesce(murabba, -1), khasra, coalesce(khewat, '')
+    )
+    WHERE khasra IS NOT NULL;
@@ -0,0 +1,46 @@
+-- Rows that land in moderation_events_default (their month had no partition yet) used to make
+-- the month impossible to create later: CREATE ... PARTITION OF fails while the default
+-- partition holds rows for the new range. The function now creates every missing partition,
+-- including the months found in the default partition, by building the table detached, moving
+-- that month's rows out of the default partition into it and then attaching it.
+--
+-- The default partition is locked for the duration, so moderation writes wait for the few
+-- moved rows instead of landing in the default partition between the move and the attach.
+CREATE OR REPLACE FUNCTION ensure_moderation_event_partitions(months_ahead integer) RETURNS void AS $$
+DECLARE
+    month_start date;
+    partition_name text;
+BEGIN
+    LOCK TABLE moderation_events_default IN SHARE ROW EXCLUSIVE MODE;
+
+    FOR month_start IN
+        SELECT (date_trunc('month', now()) + make_interval(months => i))::date
+        FROM generate_series(0, months_ahead) AS i
+        UNION
+        SELECT DISTINCT date_trunc('month', created_at)::date FROM moderation_events_default
+    LOOP
+        partition_name := 'moderation_events_' || to_char(month_start, 'YYYY_MM');
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE moderation_events INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            partition_name
+        );
+        EXECUTE format(
+            'WITH moved AS (
+                 DELETE FROM moderation_events_default
+                 WHERE created_at >= %L AND created_at < %L
+                 RETURNING *
+             )
+             INSERT INTO %I SELECT * FROM moved',
+            month_start, (month_start + interval '1 month')::date, partition_name
+        );
+        EXECUTE format(
+            'ALTER TABLE moderation_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, (month_start + interval '1 month')::date
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_moderation_event_partitions(3);
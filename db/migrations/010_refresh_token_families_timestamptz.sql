@@ -0,0 +1,12 @@
+-- refresh_token_families compared its timestamp (without time zone) columns against now(), but
+-- expires_at was written from the application's UTC clock while now() is converted to the
+-- server's TimeZone. Under any TimeZone other than UTC sessions ended early or late, and so did
+-- pruning. As timestamptz the columns hold instants and every comparison is exact.
+--
+-- expires_at was always written in UTC. The other columns were filled by now() and hold the
+-- server's local time, so run this with the same TimeZone setting the application used.
+ALTER TABLE refresh_token_families
+    ALTER COLUMN expires_at TYPE timestamptz USING expires_at AT TIME ZONE 'UTC',
+    ALTER COLUMN rotated_at TYPE timestamptz USING rotated_at AT TIME ZONE current_setting('TimeZone'),
+    ALTER COLUMN revoked_at TYPE timestamptz USING revoked_at AT TIME ZONE current_setting('TimeZone'),
+    ALTER COLUMN created_at TYPE timestamptz USING created_at AT TIME ZONE current_setting('TimeZone');
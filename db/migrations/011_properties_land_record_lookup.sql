@@ -0,0 +1,9 @@
+-- Lookup index for land records given only in part. ux_properties_land_record (008) puts the
+-- optional tehsil and murabba ahead of khasra, so a lookup that leaves either out can only use
+-- its (state, district) prefix and then filters a whole district. Lookups always carry state,
+-- district, village and khasra (adminutils/land_records.py REQUIRED_COLUMNS), and this index
+-- leads with exactly those; the optional parts are checked on the few rows it returns.
+-- Same expressions as 008, which the queries repeat verbatim.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_properties_land_record_lookup
+    ON properties (coalesce(state, ''), coalesce(district, ''), coalesce(village, ''), khasra)
+    WHERE khasra IS NOT NULL;
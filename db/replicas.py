@@ -0,0 +1,201 @@
+# app/db/replicas.py
+
+import time
+import logging
+import itertools
+import threading
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+from typing import Callable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set after a successful write; reads from that client go to the primary until it expires
+PRIMARY_COOKIE = "db_primary_until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Seconds the replica is behind. An idle primary sends no new WAL, so a replica that has replayed
+# everything it received counts as current even if its last replayed transaction is old.
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    def __init__(self, url: str):
+        from sqlalchemy import create_engine
+        from sqlalchemy.engine import make_url
+        from core.metrics import instrument_engine
+
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_engine(url)
+        instrument_engine(self.engine)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine.execution_options(postgresql_readonly=True)
+        )
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self.checked_at = 0.0
+        self._checking = threading.Lock()
+
+
+def measure_lag(replica: Replica) -> float:
+    with replica.engine.connect() as connection:
+        return float(connection.execute(LAG_SQL).scalar())
+
+
+class ReplicaSet:
+    """
+    Read replicas with lag tracking. Each replica's lag is re-measured at most every
+    `check_interval` seconds, by whichever request needs it first (others use the last result
+    meanwhile). Replicas that are unreachable or more than `max_lag` behind are skipped.
+    `lag_probe` measures one replica and raises when it is unreachable.
+    """
+
+    def __init__(self, urls: List[str], max_lag: float, check_interval: float,
+                 lag_probe: Callable[[Replica], float] = measure_lag):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self._next = itertools.count()
+        self.primary_fallbacks = 0
+
+    def _check(self, replica: Replica) -> None:
+        if not replica._checking.acquire(blocking=False):
+            return
+        try:
+            replica.lag = self.lag_probe(replica)
+            healthy = replica.lag <= self.max_lag
+            if healthy != replica.healthy:
+                logger.info(f"Replica {replica.name} {'back in rotation' if healthy else 'lagging'}: {replica.lag:.1f}s behind")
+            replica.healthy = healthy
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Replica {replica.name} unreachable, reading from the primary: {str(e)}")
+            replica.healthy = False
+            replica.lag = None
+        finally:
+            replica.checked_at = time.monotonic()
+            replica._checking.release()
+
+    def pick(self) -> Optional[Replica]:
+        """
+        A replica that is fit to serve reads (round robin), or None to use the primary.
+        """
+        if not self.replicas:
+            return None
+        now = time.monotonic()
+        for replica in self.replicas:
+            if now - replica.checked_at >= self.check_interval:
+                self._check(replica)
+        candidates = [replica for replica in self.replicas if replica.healthy]
+        if not candidates:
+            self.primary_fallbacks += 1
+            return None
+        return candidates[next(self._next) % len(candidates)]
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {"name": replica.name, "healthy": replica.healthy, "lag_seconds": replica.lag}
+                for replica in self.replicas
+            ],
+            "max_lag_seconds": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+_replica_set: Optional[ReplicaSet] = None
+_replica_set_lock = threading.Lock()
+
+
+def get_replica_set() -> ReplicaSet:
+    global _replica_set
+    if _replica_set is None:
+        with _replica_set_lock:
+            if _replica_set is None:
+                urls = [url.strip() for url in settings.SQLALCHEMY_REPLICA_URLS.split(",") if url.strip()]
+                _replica_set = ReplicaSet(urls, settings.REPLICA_MAX_LAG_SECONDS, settings.REPLICA_LAG_CHECK_SECONDS)
+    return _replica_set
+
+
+class _RoutingState:
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned: bool):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# Per request; mutated in place so threadpool work (which sees a copy of the context) can report writes
+_routing_state: ContextVar[Optional[_RoutingState]] = ContextVar("replica_routing_state", default=None)
+
+
+def prefers_primary() -> bool:
+    """
+    True when this request must read its own recent writes.
+    """
+    state = _routing_state.get()
+    return state is not None and state.pinned
+
+
+def note_write() -> None:
+    state = _routing_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes: a successful write request gets a short-lived cookie, and while it is
+    present that client's reads go to the primary, whatever the replicas' lag.
+    """
+
+    def __init__(self, app: ASGIApp, window_seconds: int) -> None:
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = _RoutingState(pinned=self._pinned(scope))
+        token = _routing_state.set(state)
+
+        async def send_wrapper(message: Message) -> None:
+            if (message["type"] == "http.response.start" and state.wrote
+                    and scope["method"] in WRITE_METHODS and message["status"] < 400):
+                until = int(time.time()) + self.window_seconds
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{PRIMARY_COOKIE}={until}; Max-Age={self.window_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _routing_state.reset(token)
+
+    @staticmethod
+    def _pinned(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(PRIMARY_COOKIE)
+                if morsel is not None:
+                    try:
+                        return int(morsel.value) > time.time()
+                    except ValueError:
+                        return False
+        return False
@@ -1,28 +1,148 @@
 # app/db/session.py
 
+from functools import lru_cache
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 from sqlalchemy.exc import OperationalError
+from sqlalchemy import event
 from core.config import settings
+from db.replicas import get_replica_set, prefers_primary, note_write
+import logging
 
-# Create engine using URL from settings
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)
-
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
 
 # Declarative base
 Base = declarative_base()
 
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """
+    Created on first use rather than at import, so importing the app (CLIs, workers that never
+    touch the database, cold starts) does not pay for the driver and pool setup.
+    """
+    from sqlalchemy import create_engine
+    from core.metrics import instrument_engine
+
+    engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)
+    # Per-request query count and DB time for Server-Timing and /metrics
+    instrument_engine(engine)
+    return engine
+
+
+@lru_cache(maxsize=None)
+def get_read_only_engine():
+    """
+    Same pool as get_engine(); transactions begun through it are READ ONLY (psycopg2 folds this
+    into its BEGIN, so it costs no extra round trip) and the flag is reset when the connection
+    goes back to the pool.
+    """
+    return get_engine().execution_options(postgresql_readonly=True)
+
+
+class _LazySessionFactory:
+    """
+    Drop-in for the sessionmaker: binds to the engine the first time a session is created.
+    """
+
+    def __init__(self, engine_factory=get_engine, **kwargs):
+        self._engine_factory = engine_factory
+        self._maker = sessionmaker(**kwargs)
+        self._bound = False
+
+    def __call__(self, **kwargs):
+        if not self._bound:
+            self._maker.configure(bind=self._engine_factory())
+            self._bound = True
+        return self._maker(**kwargs)
+
+
+# Session factory
+SessionLocal = _LazySessionFactory(autocommit=False, autoflush=False)
+ReadOnlySessionLocal = _LazySessionFactory(get_read_only_engine, autocommit=False, autoflush=False)
+
+
+@event.listens_for(SessionLocal._maker, "after_commit")
+def _after_primary_commit(session):
+    # Pins the client to the primary for its next reads (see ReplicaStickinessMiddleware)
+    note_write()
+
+
+def get_read_session():
+    """
+    Read-only session on a healthy, current replica, or on the primary when there is none
+    or the client has just written.
+    """
+    replica = None if prefers_primary() else get_replica_set().pick()
+    if replica is None:
+        return ReadOnlySessionLocal()
+    return replica.session_factory()
+
+
+class LazySession:
+    """
+    Request-scoped stand-in for a Session that is only created on first use. Requests that
+    return early (validation errors, 404s, cache hits, 304s) never build a session or touch
+    the pool. Ending an unused one is a no-op.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._session = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def _get(self):
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def commit(self) -> None:
+        if self._session is not None:
+            self._session.commit()
+
+    def rollback(self) -> None:
+        if self._session is not None:
+            self._session.rollback()
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+
+def __getattr__(name):
+    # `from db.session import engine` keeps working, it just creates the engine on demand
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Dependency for getting DB session
 def get_db_session():
+    db = LazySession(SessionLocal)
+    try:
+        yield db
+    except OperationalError as e:
+        logger.error(f"Error connecting to the database: {e}")
+        raise e
+    finally:
+        db.close()
+
+# Dependency for GET routes that only read: same lazy session, in a READ ONLY transaction,
+# on a replica when one is available
+def get_read_db_session():
+    db = LazySession(get_read_session)
     try:
-        db = SessionLocal()
         yield db
-        print("connected @@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@")
     except OperationalError as e:
-        print("❌ Error connecting to the database:", e)
+        logger.error(f"Error connecting to the database: {e}")
         raise e
     finally:
         db.close()
@@ -1,33 +1,111 @@
-import os
-import sys
-
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import logging
 
 from dotenv import load_dotenv
-from routers import properties, auth,users
+from routers import properties, auth,users, notifications, metrics
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from core.config import settings
+from core.compression import CompressionMiddleware
+from core.metrics import MetricsMiddleware
+from core.admission import AdmissionMiddleware
+from core.warmup import warm_up
+from db.replicas import ReplicaStickinessMiddleware
+from adminutils.events import event_broker
+from adminutils.visits import visit_flusher
+from adminutils.rollups import rollup_refresher
+from adminutils.cache import invalidate_on_event
+from adminutils.moderation_log import ensure_partitions
+from db.session import SessionLocal
 
 # Load environment variables from .env
 load_dotenv()
 
-# Add the base directory to sys.path
-BASE_DIR = os.getenv("PYTHONPATH", ".")
-sys.path.append(BASE_DIR)
-
 app = FastAPI(title="Real Estate Admin API")
 
+# gzip/brotli, negotiated per request; GeoJSON pages typically shrink 5-10x
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+# Read-your-writes pinning to the primary when read replicas are configured
+app.add_middleware(ReplicaStickinessMiddleware, window_seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+# Per-worker concurrency budget with priority classes: logins and moderation ahead of exports
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware, capacity=settings.ADMISSION_CAPACITY)
+
+# Outside admission control, so load-shed 503s (and 429s) carry CORS headers and the admin UI
+# can read their status and Retry-After
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+# Outermost: Server-Timing and per-route histograms, measured on the bytes actually sent
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(properties.router, prefix="/properties")
 app.include_router(auth.router, prefix="/auth")
 app.include_router(users.router, prefix="/users")
+app.include_router(notifications.router, prefix="/notifications")
+app.include_router(metrics.router)
+
+@app.on_event("startup")
+async def warm_up_app():
+    if settings.WARM_UP_ON_STARTUP:
+        timings = await run_in_threadpool(warm_up, app)
+        logging.info(f"Warm-up finished: {timings} (ms)")
+
+def ensure_moderation_partitions():
+    db = SessionLocal()
+    try:
+        ensure_partitions(db)
+    except Exception as e:
+        db.rollback()
+        # Moderation still works: rows land in the default partition until the next run moves them
+        logging.error(f"Could not ensure moderation event partitions: {str(e)}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def ensure_moderation_event_partitions():
+    # A missed monthly run would otherwise leave the current month in the default partition
+    await run_in_threadpool(ensure_moderation_partitions)
+
+@app.on_event("startup")
+async def start_event_broker():
+    # One shared LISTEN connection per worker feeds every event stream client
+    event_broker.add_listener(invalidate_on_event)
+    await event_broker.start()
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await event_broker.stop()
+
+@app.on_event("startup")
+async def start_visit_flusher():
+    await visit_flusher.start()
+
+@app.on_event("shutdown")
+async def stop_visit_flusher():
+    # Graceful shutdown writes whatever is still buffered
+    await visit_flusher.stop()
+
+@app.on_event("startup")
+async def start_rollup_refresher():
+    await rollup_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_rollup_refresher():
+    await rollup_refresher.stop()
 
 # Start your FastAPI app
 if __name__ == "__main__":
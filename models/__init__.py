@@ -2,6 +2,6 @@
 from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
-from .properties import Property, PropertyImage, PropertyStatus
+from .properties import Property, PropertyImage, PropertyStatus, PropertyLease, Notification, NotificationCounter, PropertyChange, DistrictRollup, ModerationEvent
 # from .notifications import Notification
-from .user import User, UserProfile, Role, UserRoleLink
\ No newline at end of file
+from .user import User, UserProfile, Role, UserRoleLink, RefreshTokenFamily
\ No newline at end of file
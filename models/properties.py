@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, Date, Enum,
-    TIMESTAMP, DECIMAL, ForeignKey, Identity, func, DateTime
+    TIMESTAMP, DECIMAL, ForeignKey, Identity, func, DateTime, Index, BigInteger, Float
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, backref
@@ -36,10 +36,35 @@ class Notification(Base):
     status_change_from = Column(Enum(PropertyStatus), nullable=False)
     status_change_to = Column(Enum(PropertyStatus), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    read_at = Column(DateTime, nullable=True)
     
     user = relationship("User", back_populates="notifications")
     property = relationship("Property", back_populates="notifications")
 
+    __table_args__ = (
+        # Inbox keyset pagination: WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+        Index("ix_notifications_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_notifications_user_unread", user_id, postgresql_where=read_at.is_(None)),
+        # Retention sweeps by age over an append-only table
+        Index("ix_notifications_created_at_brin", created_at, postgresql_using="brin"),
+    )
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    # Maintained alongside notifications so unread badges never count rows
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+class PropertyLease(Base):
+    __tablename__ = "property_leases"
+
+    # One active moderation lease per property; expired rows are simply overwritten
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    admin_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    leased_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+
 class Property(Base):
     __tablename__ = 'properties'
 
@@ -79,3 +104,79 @@ class Property(Base):
     notifications = relationship("Notification", back_populates="property")
     # favorited_by = relationship("FavoriteProperty", back_populates="property")
 
+    __table_args__ = (
+        # Backs the max(updated_at)/count() validators used for conditional GETs
+        Index("ix_properties_status_updated_at", "status", "updated_at"),
+        # Keyset order of the delta sync feed
+        Index("ix_properties_updated_at_id", "updated_at", "id"),
+        # Land-record key, unique per parcel; missing parts are coalesced (see db/migrations/008)
+        Index(
+            "ux_properties_land_record",
+            func.coalesce(state, ""), func.coalesce(district, ""), func.coalesce(tehsil, ""),
+            func.coalesce(village, ""), func.coalesce(murabba, -1), khasra, func.coalesce(khewat, ""),
+            unique=True,
+            postgresql_where=khasra.isnot(None),
+        ),
+        # Required land-record parts only, for lookups without tehsil or murabba (see db/migrations/011)
+        Index(
+            "ix_properties_land_record_lookup",
+            func.coalesce(state, ""), func.coalesce(district, ""), func.coalesce(village, ""), khasra,
+            postgresql_where=khasra.isnot(None),
+        ),
+    )
+
+class PropertyChange(Base):
+    __tablename__ = "property_changes"
+
+    # Tombstone log for delta sync, filled by triggers on properties (see db/migrations/004)
+    id = Column(BigInteger, primary_key=True)
+    property_id = Column(Integer, nullable=False)
+    change_type = Column(String(20), nullable=False)  # deleted | status_changed
+    status_from = Column(String(20), nullable=True)
+    status_to = Column(String(20), nullable=True)
+    changed_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_property_changes_changed_at_id", "changed_at", "id"),
+    )
+
+
+class DistrictRollup(Base):
+    __tablename__ = "property_district_rollups"
+
+    # Maintained by adminutils/rollups.py (see db/migrations/005); never written by request handlers
+    level = Column(String(10), primary_key=True)  # district | tehsil
+    state = Column(String(100), primary_key=True)
+    district = Column(String(100), primary_key=True)
+    tehsil = Column(String(100), primary_key=True)  # '' on district rows
+    status = Column(String(20), primary_key=True)  # a property status, or 'all'
+    listings = Column(Integer, nullable=False)
+    priced = Column(Integer, nullable=False)
+    price_sum = Column(DECIMAL(18, 2))
+    median_price = Column(DECIMAL(14, 2))
+    area_sq_m_sum = Column(DECIMAL(16, 2))
+    xmin = Column(Float)
+    ymin = Column(Float)
+    xmax = Column(Float)
+    ymax = Column(Float)
+    refreshed_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+class ModerationEvent(Base):
+    __tablename__ = "moderation_events"
+
+    # Append-only log of moderation actions, partitioned by month (see db/migrations/006)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    property_id = Column(Integer, nullable=False)
+    admin_id = Column(Integer, nullable=True)  # NULL for automated actions
+    action = Column(String(30), nullable=False)  # status_changed | updated | area_audit
+    status_from = Column(String(20), nullable=True)
+    status_to = Column(String(20), nullable=True)
+    reason = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, primary_key=True, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_moderation_events_created_at_brin", created_at, postgresql_using="brin"),
+        Index("ix_moderation_events_admin_created", admin_id, created_at.desc(), id.desc()),
+        Index("ix_moderation_events_property_created", property_id, created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
@@ -48,4 +48,19 @@ class UserRoleLink(Base):
     role_id = Column(Integer, ForeignKey("roles.id"), primary_key=True)
 
     user = relationship("User", back_populates="roles")
-    role = relationship("Role", back_populates="user_links")
\ No newline at end of file
+    role = relationship("Role", back_populates="user_links")
+
+
+class RefreshTokenFamily(Base):
+    __tablename__ = "refresh_token_families"
+
+    # One row per login session; only the jti of its current refresh token is valid (see adminutils/tokens.py)
+    family_id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    current_jti = Column(String(32), nullable=False)
+    previous_jti = Column(String(32), nullable=True)
+    # timestamptz (db/migrations/010): compared against now() whatever the server's TimeZone
+    rotated_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    revoked_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Form, status, Response
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Form, status, Response, Cookie
 from fastapi.responses import RedirectResponse
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 import random
 import os
@@ -23,6 +23,17 @@ from adminutils.auth import (
     is_valid_username,
     is_valid_phone_number
 )
+from adminutils.tokens import (
+    REFRESH_COOKIE,
+    issue_refresh_token,
+    rotate_refresh_token,
+    decode_refresh_token,
+    revoke_refresh_family,
+    RefreshTokenInvalid,
+    RefreshTokenRaced
+)
+from adminutils.principal import load_principal_for_login, principal_cache, ADMIN_ROLE_ID
+from typing import Optional
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 360
 REFRESH_TOKEN_EXPIRE_DAYS = 30
@@ -182,49 +193,108 @@ async def admin_login(
     password: str = Form(...),
     db: Session = Depends(get_db_session)
 ):
-    # Find user by email using the ORM
-    user = db.query(User).filter(User.email == identifier).first()
+    # User, profile and roles in one query
+    found = load_principal_for_login(db, identifier)
 
-    if not user:
+    if not found:
         raise HTTPException(status_code=404, detail="Admin user not found")
+    principal, hashed_password = found
 
-    if not verify_password(password, user.hashed_password):
+    if not verify_password(password, hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect password")
 
-    # Fetch role using the ORM
-    user_role = db.query(UserRoleLink).filter(UserRoleLink.user_id == user.user_id).first()
-
-    if not user_role:
+    if not principal.role_ids:
         raise HTTPException(status_code=401, detail="User role not found")
 
     # Check if the user has the admin role (role_id = 0)
-    if user_role.role_id != 0:  # Changed from 2 to 0
+    if not principal.is_admin:
         raise HTTPException(status_code=403, detail="Not authorized as admin")
+    # Requests made with the new token authorize from memory
+    principal_cache.put(principal)
 
     # Create tokens
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
 
     access_token = create_access_token(
-        data={"sub": identifier, "user_id": user.user_id, "role": user_role.role_id},
+        data={"sub": identifier, "user_id": principal.user_id, "role": ADMIN_ROLE_ID, "type": "access"},
         expires_delta=access_token_expires
     )
 
-    refresh_token = create_access_token(
-        data={"sub": identifier, "user_id": user.user_id, "role": user_role.role_id},
-        expires_delta=refresh_token_expires
-    )
+    # Starts a rotating session; /auth/admin/refresh trades the cookie for new tokens
+    refresh_token, _ = issue_refresh_token(db, principal.user_id, identifier, refresh_token_expires)
+    db.commit()
+    set_refresh_cookie(response, refresh_token, refresh_token_expires)
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer"
+    }
 
+
+def set_refresh_cookie(response: Response, refresh_token: str, expires_in: timedelta):
     response.set_cookie(
-        key="refresh_token",
+        key=REFRESH_COOKIE,
         value=refresh_token,
         httponly=True,
         secure=True,
         samesite="Strict",
-        max_age=int(refresh_token_expires.total_seconds())
+        max_age=max(int(expires_in.total_seconds()), 0)
     )
 
+
+@router.post("/admin/refresh", response_model=Token)
+def admin_refresh(
+    response: Response,
+    refresh_token: Optional[str] = Cookie(None),
+    db: Session = Depends(get_db_session)
+):
+    """
+    New access token from the refresh cookie, without a password check. The cookie is rotated on
+    every call; presenting an already rotated token revokes the whole session.
+    """
+    try:
+        claims, new_refresh_token, expires_at = rotate_refresh_token(db, refresh_token)
+    except RefreshTokenRaced as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except RefreshTokenInvalid as e:
+        response.delete_cookie(REFRESH_COOKIE)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    user_id = claims["user_id"]
+    principal = principal_cache.get(db, user_id)
+    if principal is None or not principal.is_admin:
+        revoke_refresh_family(db, claims["fam"])
+        raise HTTPException(status_code=403, detail="Not authorized as admin")
+
+    access_token = create_access_token(
+        data={"sub": claims.get("sub"), "user_id": user_id, "role": ADMIN_ROLE_ID, "type": "access"},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    set_refresh_cookie(response, new_refresh_token, expires_at - datetime.now(timezone.utc))
     return {
         "access_token": access_token,
         "token_type": "bearer"
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/admin/logout", status_code=status.HTTP_204_NO_CONTENT)
+def admin_logout(
+    response: Response,
+    refresh_token: Optional[str] = Cookie(None),
+    db: Session = Depends(get_db_session)
+):
+    """
+    End the session behind the refresh cookie. Access tokens already issued stay valid until they expire.
+    """
+    try:
+        revoke_refresh_family(db, decode_refresh_token(refresh_token)["fam"])
+    except RefreshTokenInvalid:
+        pass
+    response.delete_cookie(REFRESH_COOKIE)
+    response.status_code = status.HTTP_204_NO_CONTENT
+    return None
\ No newline at end of file
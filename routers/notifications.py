@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from db.session import get_db_session, get_read_db_session
+from schemas.notifications import NotificationOut, NotificationPage, UnreadCount, MarkReadRequest, MarkReadResult
+from adminutils.auth import get_current_user
+from adminutils.notifications import list_notifications, get_unread_count, mark_read
+from typing import Optional
+import logging
+
+router = APIRouter()
+
+
+@router.get("/", response_model=NotificationPage)
+def get_notifications(
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    unread_only: bool = False,
+    db: Session = Depends(get_read_db_session),
+    current_user_id: int = Depends(get_current_user)
+):
+    """
+    The current user's notifications, newest first. Follow `next_cursor` for older pages.
+    """
+    try:
+        notifications, next_cursor = list_notifications(db, current_user_id, cursor, limit, unread_only)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return NotificationPage(
+        items=[NotificationOut.model_validate(notification, from_attributes=True) for notification in notifications],
+        next_cursor=next_cursor,
+        unread_count=get_unread_count(db, current_user_id)
+    )
+
+
+@router.get("/unread-count", response_model=UnreadCount)
+def get_notifications_unread_count(
+    db: Session = Depends(get_read_db_session),
+    current_user_id: int = Depends(get_current_user)
+):
+    return UnreadCount(unread_count=get_unread_count(db, current_user_id))
+
+
+@router.post("/mark-read", response_model=MarkReadResult)
+def mark_notifications_read(
+    mark_read_request: MarkReadRequest,
+    db: Session = Depends(get_db_session),
+    current_user_id: int = Depends(get_current_user)
+):
+    """
+    Mark the given notifications (or all of them with `all: true`) as read.
+    """
+    if not mark_read_request.all and not mark_read_request.ids:
+        raise HTTPException(status_code=400, detail="Provide notification ids or set all to true")
+
+    try:
+        marked, unread_count = mark_read(db, current_user_id, mark_read_request.ids, mark_read_request.all)
+        return MarkReadResult(marked=marked, unread_count=unread_count)
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error in mark_notifications_read: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to mark notifications as read: {str(e)}")
@@ -1,17 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Response, Request, WebSocket, status
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Response, Request, WebSocket, WebSocketDisconnect, status, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from db.session import get_db_session
-from models.properties import Property ,PropertyStatus,Notification
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, cast
+from geoalchemy2 import Geography
+from db.session import get_db_session, get_read_db_session, get_read_session
+from db.replicas import prefers_primary
+from models.properties import Property ,PropertyStatus,Notification, PropertyImage
 from models.user import User
-from fastapi.responses import HTMLResponse
-from schemas.properties import PropertyUpdate, PropertyOut, GeoJSONResponse, PaginatedGeoJSONResponse, PropertyStatusCounts, PropertyStatusNotification, UserPropertyResponse
-from adminutils.property import convert_properties_to_geojson
-from adminutils.auth import get_current_user
+from fastapi.responses import HTMLResponse, StreamingResponse, JSONResponse
+from schemas.properties import PropertyUpdate, PropertyOut, GeoJSONResponse, PaginatedGeoJSONResponse, PropertyStatusCounts, PropertyStatusNotification, UserPropertyResponse, ExportFormat, ImportFormat, ImportReport, AreaAuditItem, AreaAuditReport, LeaseRequest, LeaseInfo, ClaimResponse, DeltaSyncResponse, DistrictRollupResponse, ModerationEventPage, LandRecordBatchReport
+from adminutils.property import convert_properties_to_geojson, stream_paginated_geojson, iter_feature_collection
+from adminutils.topojson import build_topology, clamp_quantization, DEFAULT_QUANTIZATION
+from adminutils.export import EXPORT_WRITERS, geoparquet_available
+from adminutils.importer import iter_import_records, run_import
+from adminutils.land_records import find_land_records, iter_lookup_rows, normalize_land_record, run_batch_lookup, LandRecordInvalid
+from adminutils.area_audit import run_area_audit, audit_batch, audit_query, DEFAULT_TOLERANCE
+from adminutils.events import event_broker, publish_event, status_changed_event, notification_event
+from adminutils.notifications import increment_unread
+from adminutils.visits import visit_buffer, visit_rate_limiter, MAX_PROPERTY_ID
+from adminutils.sync import get_changes_since, WatermarkExpired
+from adminutils.moderation_log import record_moderation_event, list_moderation_events
+from adminutils.rollups import get_district_rollups, rollups_to_feature_collection, ROLLUP_LEVELS
+from adminutils.cache import response_cache, make_cache_key
+from adminutils.signed_urls import signed_url_cache
+from adminutils.storage import SourceRefused
+from adminutils.thumbnails import (
+    thumbnail_service, ThumbnailsUnavailable, THUMBNAIL_SIZES, DEFAULT_THUMBNAIL_SIZE,
+    negotiate_thumbnail_format, image_version, IMMUTABLE_CACHE_CONTROL, UNVERSIONED_CACHE_CONTROL
+)
+from adminutils.leases import claim_pending, renew_leases, release_leases, get_active_leases, end_lease, DEFAULT_LEASE_SECONDS
+from adminutils.principal import Principal, require_admin, authenticate_websocket
+from adminutils.http_cache import get_window_version, build_etag, is_not_modified, set_validators, not_modified_response, validator_headers
 from datetime import datetime
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Iterator, Optional
 import logging
+import asyncio
+import json
+import io
+import math
 
 router = APIRouter()
 
@@ -19,25 +45,52 @@ router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows fetched per round trip when streaming listing pages
+STREAM_BATCH_SIZE = 100
+# Rows fetched per round trip from the export cursor
+EXPORT_BATCH_SIZE = 1000
+# Idle seconds before an SSE keep-alive comment is sent
+SSE_HEARTBEAT_SECONDS = 15
+# Listing pages up to this size are kept whole in the response cache; bigger ones are streamed
+CACHEABLE_PAGE_LIMIT = 100
+# Output formats of the listing and bounding-box endpoints
+LISTING_FORMATS = ("geojson", "topojson")
+# Topologies share arcs across the whole page, so they are built whole rather than streamed
+MAX_TOPOLOGY_LIMIT = 5000
+# Bounding-box queries are widened outward to this grid, so nearby pans share a cache entry
+BBOX_SNAP_DEGREES = 0.01
+MAX_BBOX_LIMIT = 5000
+
 
 @router.patch("/admin/properties/{property_id}", response_model=PropertyUpdate)
 def update_property_status(
     property_id: int,
     property_update: PropertyUpdate,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
 ):
     # Retrieve the property from the database
     db_property = db.query(Property).filter(Property.id == property_id).first()
     if not db_property:
         raise HTTPException(status_code=404, detail="Property not found")
 
+    old_status = db_property.status
+
     # Update the property's status and flag_reason
     db_property.status = property_update.status
     db_property.flag_reason = property_update.flag_reason
     if property_update.status == "approved":
         db_property.verified = True
 
+    if old_status != property_update.status:
+        publish_event(db, status_changed_event(
+            db_property.id, db_property.user_id, old_status, property_update.status, property_update.flag_reason
+        ))
+    record_moderation_event(db, db_property.id, admin.user_id, old_status, property_update.status, property_update.flag_reason)
+    end_lease(db, db_property.id)
+
     db.commit()
+    response_cache.invalidate()
     db.refresh(db_property)
     return db_property
 
@@ -45,7 +98,8 @@ def update_property_status(
 async def update_property_status(
     property_id: int,
     property_update: PropertyUpdate,
-    db: Session = Depends(get_db_session)
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
 ):
     """
     Update the status of a property and create a notification for the user.
@@ -77,9 +131,25 @@ async def update_property_status(
                 created_at=datetime.utcnow()
             )
             db.add(notification)
+            increment_unread(db, db_property.user_id)
+            db.flush()
             logging.info(f"Created notification for property {property_id}: {old_status} -> {property_update.status}")
-        
+
+            # Delivered to listeners on commit
+            publish_event(db, status_changed_event(
+                db_property.id, db_property.user_id, old_status, property_update.status, property_update.flag_reason
+            ))
+            publish_event(db, notification_event(notification))
+
+        # Logged in the same transaction, so the history never disagrees with the property
+        record_moderation_event(db, db_property.id, admin.user_id, old_status, property_update.status, property_update.flag_reason)
+
+        # The moderation decision is made; free the property from the claimant's queue
+        end_lease(db, db_property.id)
+
         db.commit()
+        # Other workers drop theirs when the status_changed event arrives
+        response_cache.invalidate()
         db.refresh(db_property)
             
         return {"detail": "Property status updated successfully"}
@@ -89,6 +159,19 @@ async def update_property_status(
         logging.error(f"Error updating property status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to update property status: {str(e)}")
 
+def get_status_listing_query(db: Session, status: PropertyStatus):
+    """
+    Base query for the admin status listing: user uploaded properties, newest first.
+    """
+    return db.query(Property).filter(
+         (Property.status == status) & (Property.user_uploaded == True)
+    ).order_by(
+        Property.created_at.desc()
+    )
+
+def get_page_count(row_count: int, limit: int) -> int:
+    return int(row_count / limit) + 1
+
 def get_properties_by_status(
     status: PropertyStatus,
     db: Session,
@@ -105,28 +188,50 @@ def get_properties_by_status(
         Property.status == status
     ).count()
 
-    total_count = int(total_count / limit) + 1
+    total_count = get_page_count(total_count, limit)
 
     # Fetch paginated properties, ordered by created_at DESC
-    properties = db.query(Property).filter(
-         (Property.status == status) & (Property.user_uploaded == True)
-    ).order_by(
-        Property.created_at.desc()
-    ).offset(offset).limit(limit).all()
+    properties = get_status_listing_query(db, status).offset(offset).limit(limit).all()
 
     if not properties and page == 1:
         raise HTTPException(status_code=404, detail=f"No properties found with status '{status.value}'")
 
     return properties, total_count
 
-@router.get("/admin/user-properties/counts", response_model=PropertyStatusCounts)
-async def get_user_properties_status_counts(
-    db: Session = Depends(get_db_session),
-):
+def stream_properties_page(
+    status: PropertyStatus,
+    page: int,
+    limit: int,
+    total_count: int,
+    has_more: bool,
+    next_page: Optional[int]
+) -> Iterator[bytes]:
     """
-    Get the count of properties for each status for the current user.
+    Stream one listing page from its own session: the request-scoped session is closed
+    before the response body is sent. Rows are pulled in batches from a server-side cursor.
+    """
+    db = get_read_session()
+    try:
+        properties = (
+            get_status_listing_query(db, status)
+            .options(selectinload(Property.images))
+            .offset((page - 1) * limit)
+            .limit(limit)
+            .yield_per(STREAM_BATCH_SIZE)
+        )
+        yield from stream_paginated_geojson(properties, total_count, has_more, next_page)
+    finally:
+        db.close()
+
+def load_status_counts():
+    """
+    Validators and per-status counts for the counts endpoint, computed in their own session.
     """
+    db = get_read_session()
     try:
+        last_modified, row_count = get_window_version(db, Property.user_uploaded == True)
+        etag = build_etag("counts", last_modified, row_count)
+
         # Query to count properties by status for the current user
         status_counts = (
             db.query(Property.status, func.count(Property.id).label("count")).filter(Property.user_uploaded == True)
@@ -148,18 +253,108 @@ async def get_user_properties_status_counts(
             if status in counts:
                 counts[status.value] = count
 
+        return etag, last_modified, counts
+    finally:
+        db.close()
+
+@router.get("/admin/user-properties/counts", response_model=PropertyStatusCounts, dependencies=[Depends(require_admin)])
+async def get_user_properties_status_counts(
+    request: Request,
+    response: Response,
+):
+    """
+    Get the count of properties for each status for the current user.
+    Served from the short-TTL response cache; concurrent misses share one query.
+    Supports conditional GET: an unchanged window answers 304.
+    """
+    try:
+        etag, last_modified, counts = await response_cache.get_or_compute(
+            make_cache_key(request), load_status_counts, bypass=prefers_primary()
+        )
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        set_validators(response, etag, last_modified)
         return PropertyStatusCounts(**counts)
 
     except Exception as e:
         logging.error(f"Error in get_user_properties_status_counts: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve property counts: {str(e)}")
 
-@router.get("/admin/properties/{status}", response_model=PaginatedGeoJSONResponse)
+def signed_last_modified(last_modified: Optional[datetime], signing_epoch: int) -> Optional[datetime]:
+    """
+    Last-Modified for a body embedding signed image URLs: never before their signing epoch
+    began, so If-Modified-Since cannot revalidate a copy whose URLs are about to expire.
+    """
+    started = signed_url_cache.epoch_started_at(signing_epoch)
+    if started is None or (last_modified is not None and last_modified >= started):
+        return last_modified
+    return started
+
+def load_status_page(status: PropertyStatus, page: int, limit: int, signing_epoch: int):
+    """
+    Validators and the fully serialized body of one listing page (None when page 1 is empty).
+    """
+    db = get_read_session()
+    try:
+        last_modified, row_count = get_window_version(db, Property.status == status)
+        etag = build_etag("status", status.value, page, limit, last_modified, row_count, signing_epoch)
+        last_modified = signed_last_modified(last_modified, signing_epoch)
+        total_count = get_page_count(row_count, limit)
+        if page == 1 and not db.query(get_status_listing_query(db, status).exists()).scalar():
+            return etag, last_modified, None
+    finally:
+        db.close()
+
+    has_more = (page * limit) < total_count
+    next_page = page + 1 if has_more else None
+    body = b"".join(stream_properties_page(status, page, limit, total_count, has_more, next_page))
+    return etag, last_modified, body
+
+def load_status_topology(status: PropertyStatus, page: int, limit: int, quantization: int):
+    """
+    Validators and the serialized TopoJSON body of one listing page (None when page 1 is empty).
+    """
+    db = get_read_session()
+    try:
+        last_modified, row_count = get_window_version(db, Property.status == status)
+        etag = build_etag("status", "topojson", status.value, page, limit, quantization, last_modified, row_count)
+        total_count = get_page_count(row_count, limit)
+        properties = (
+            get_status_listing_query(db, status)
+            .options(selectinload(Property.images))
+            .offset((page - 1) * limit)
+            .limit(limit)
+            .all()
+        )
+        if not properties and page == 1:
+            return etag, last_modified, None
+
+        has_more = (page * limit) < total_count
+        body = json.dumps({
+            "data": build_topology(properties, quantization),
+            "total_count": total_count,
+            "has_more": has_more,
+            "next_page": page + 1 if has_more else None,
+        }, separators=(",", ":")).encode("utf-8")
+        return etag, last_modified, body
+    finally:
+        db.close()
+
+def validate_listing_format(format: str, limit: int, max_limit: int) -> None:
+    if format not in LISTING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Must be one of: {list(LISTING_FORMATS)}")
+    if limit < 1 or (format == "topojson" and limit > max_limit):
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {max_limit}")
+
+@router.get("/admin/properties/{status}", response_model=PaginatedGeoJSONResponse, dependencies=[Depends(require_admin)])
 async def get_properties_status(
     status: str,
+    request: Request,
     page: int = 1,  # Page number, starting from 1
     limit: int = 20,  # Items per page
-    db: Session = Depends(get_db_session)
+    format: str = "geojson",  # geojson | topojson
+    quantization: int = DEFAULT_QUANTIZATION,  # TopoJSON grid steps per axis
+    db: Session = Depends(get_read_db_session)
 ):
     try:
         status_enum = PropertyStatus(status.lower())
@@ -168,25 +363,692 @@ async def get_properties_status(
             status_code=400,
             detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
         )
+    validate_listing_format(format, limit, MAX_TOPOLOGY_LIMIT)
 
     try:
-        # Fetch paginated properties and total count
-        properties, total_count = get_properties_by_status(status_enum, db, page, limit)
+        if format == "topojson":
+            quantization = clamp_quantization(quantization)
+            etag, last_modified, body = await response_cache.get_or_compute(
+                make_cache_key(request, status=status_enum.value, page=page, limit=limit, format=format, quantization=quantization),
+                lambda: load_status_topology(status_enum, page, limit, quantization),
+                bypass=prefers_primary()
+            )
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            if body is None:
+                raise HTTPException(status_code=404, detail=f"No properties found with status '{status_enum.value}'")
+            return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
+
+        # GeoJSON features carry signed image URLs, so validators and cache entries are per signing epoch
+        signing_epoch = signed_url_cache.epoch()
+        if limit <= CACHEABLE_PAGE_LIMIT:
+            etag, last_modified, body = await response_cache.get_or_compute(
+                make_cache_key(request, status=status_enum.value, page=page, limit=limit, signing_epoch=signing_epoch),
+                lambda: load_status_page(status_enum, page, limit, signing_epoch),
+                bypass=prefers_primary()
+            )
+            if is_not_modified(request, etag, last_modified):
+                return not_modified_response(etag, last_modified)
+            if body is None:
+                raise HTTPException(status_code=404, detail=f"No properties found with status '{status_enum.value}'")
+            return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
+
+        # Validate against the whole status window (a superset of the listed rows, which also
+        # drives total_count) before fetching or serializing anything
+        last_modified, row_count = get_window_version(db, Property.status == status_enum)
+        etag = build_etag("status", status_enum.value, page, limit, last_modified, row_count, signing_epoch)
+        last_modified = signed_last_modified(last_modified, signing_epoch)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
 
-        # Convert to GeoJSON
-        geojson_data = convert_properties_to_geojson(properties)
+        # The status window count above is exactly what the page count is derived from
+        total_count = get_page_count(row_count, limit)
+        if page == 1 and not db.query(get_status_listing_query(db, status_enum).exists()).scalar():
+            raise HTTPException(status_code=404, detail=f"No properties found with status '{status_enum.value}'")
 
         # Determine pagination metadata
         has_more = (page * limit) < total_count
         next_page = page + 1 if has_more else None
 
-        return PaginatedGeoJSONResponse(
-            data=geojson_data,
-            total_count=total_count,
-            has_more=has_more,
-            next_page=next_page
+        # Features are serialized and sent incrementally instead of building the whole page
+        return StreamingResponse(
+            stream_properties_page(status_enum, page, limit, total_count, has_more, next_page),
+            media_type="application/json",
+            headers=validator_headers(etag, last_modified)
         )
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()  # Rollback in case of any database issues (though rare for GET)
         logging.error(f"Error in get_properties_status: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve properties: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve properties: {str(e)}")
+
+def snap_bbox(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> List[float]:
+    """
+    Widen a map viewport outward to the BBOX_SNAP_DEGREES grid. Small pans and zooms then map to
+    the same window, so they share the cached topology instead of each building their own.
+    """
+    # Rounded before flooring, so 76.1 / 0.01 = 7609.999... stays on 76.1
+    def cells(value: float) -> float:
+        return round(value / BBOX_SNAP_DEGREES, 6)
+
+    return [
+        max(-180.0, round(math.floor(cells(min_lon)) * BBOX_SNAP_DEGREES, 6)),
+        max(-90.0, round(math.floor(cells(min_lat)) * BBOX_SNAP_DEGREES, 6)),
+        min(180.0, round(math.ceil(cells(max_lon)) * BBOX_SNAP_DEGREES, 6)),
+        min(90.0, round(math.ceil(cells(max_lat)) * BBOX_SNAP_DEGREES, 6)),
+    ]
+
+def load_bbox_window(
+    bbox: List[float], status: Optional[PropertyStatus], limit: int, format: str, quantization: int, signing_epoch: int
+):
+    """
+    Validators and the serialized body for the parcels whose centroid falls inside `bbox`.
+    """
+    criteria = [
+        Property.user_uploaded == True,
+        func.ST_Intersects(Property.centroid, cast(func.ST_MakeEnvelope(*bbox, 4326), Geography(geometry_type='POLYGON', srid=4326))),
+    ]
+    if status is not None:
+        criteria.append(Property.status == status)
+
+    db = get_read_session()
+    try:
+        last_modified, row_count = get_window_version(db, *criteria)
+        etag = build_etag(
+            "bbox", format, *bbox, status.value if status else "", limit, quantization, last_modified, row_count,
+            signing_epoch
+        )
+        last_modified = signed_last_modified(last_modified, signing_epoch)
+        properties = (
+            db.query(Property)
+            .filter(*criteria)
+            .options(selectinload(Property.images))
+            .order_by(Property.id)
+            .limit(limit)
+            .all()
+        )
+        if format == "topojson":
+            data = json.dumps(build_topology(properties, quantization), separators=(",", ":")).encode("utf-8")
+        else:
+            data = b"".join(iter_feature_collection(properties))
+    finally:
+        db.close()
+
+    body = b"".join([
+        b'{"data":', data,
+        f',"bbox":{json.dumps(bbox)},"total_count":{row_count},"has_more":{json.dumps(row_count > limit)}}}'.encode("utf-8"),
+    ])
+    return etag, last_modified, body
+
+@router.get("/admin/bbox/properties", dependencies=[Depends(require_admin)])
+async def get_properties_in_bbox(
+    request: Request,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    status: Optional[str] = None,
+    limit: int = 1000,
+    format: str = "geojson",  # geojson | topojson
+    quantization: int = DEFAULT_QUANTIZATION,  # TopoJSON grid steps per axis
+):
+    """
+    Parcels whose centroid lies in a map viewport, as GeoJSON or TopoJSON. The viewport is
+    snapped outward (see snap_bbox) and the snapped window is what gets queried, cached and
+    returned in `bbox`; `has_more` is set when the window holds more than `limit` parcels.
+    """
+    if not (-180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    if format not in LISTING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Must be one of: {list(LISTING_FORMATS)}")
+    if not 1 <= limit <= MAX_BBOX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_BBOX_LIMIT}")
+    status_enum = None
+    if status is not None:
+        try:
+            status_enum = PropertyStatus(status.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+            )
+
+    bbox = snap_bbox(min_lon, min_lat, max_lon, max_lat)
+    quantization = clamp_quantization(quantization) if format == "topojson" else 0
+    # Only GeoJSON embeds signed image URLs; TopoJSON bodies do not age with the signatures
+    signing_epoch = signed_url_cache.epoch() if format == "geojson" else 0
+    try:
+        etag, last_modified, body = await response_cache.get_or_compute(
+            make_cache_key(
+                request, bbox=bbox, status=status_enum.value if status_enum else None,
+                limit=limit, format=format, quantization=quantization, signing_epoch=signing_epoch
+            ),
+            lambda: load_bbox_window(bbox, status_enum, limit, format, quantization, signing_epoch),
+            bypass=prefers_primary()
+        )
+    except Exception as e:
+        logging.error(f"Error in get_properties_in_bbox: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve properties: {str(e)}")
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
+
+def stream_properties_export(
+    export_format: ExportFormat,
+    status: Optional[PropertyStatus],
+    user_uploaded: Optional[bool]
+) -> Iterator[bytes]:
+    """
+    Walk the filtered properties through a server-side cursor and hand them to the format writer.
+    Memory stays bounded by EXPORT_BATCH_SIZE rows regardless of the export size.
+    """
+    writer = EXPORT_WRITERS[export_format.value][0]
+    db = get_read_session()
+    try:
+        query = db.query(Property)
+        if status is not None:
+            query = query.filter(Property.status == status)
+        if user_uploaded is not None:
+            query = query.filter(Property.user_uploaded == user_uploaded)
+        if export_format in (ExportFormat.geojson, ExportFormat.ndjson):
+            query = query.options(selectinload(Property.images))
+        properties = query.order_by(Property.id).yield_per(EXPORT_BATCH_SIZE)
+        yield from writer(properties)
+    finally:
+        db.close()
+
+@router.get("/admin/export/properties", dependencies=[Depends(require_admin)])
+async def export_properties(
+    format: ExportFormat = ExportFormat.geojson,
+    status: Optional[str] = None,
+    user_uploaded: Optional[bool] = True
+):
+    """
+    Export properties as GeoJSON, newline-delimited GeoJSON, CSV (WKT geometry) or GeoParquet.
+    Takes the same status/user_uploaded filters as the status listing; pass no status for all.
+    """
+    status_enum = None
+    if status is not None:
+        try:
+            status_enum = PropertyStatus(status.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+            )
+
+    if format == ExportFormat.geoparquet and not geoparquet_available():
+        raise HTTPException(status_code=501, detail="GeoParquet export requires pyarrow to be installed")
+
+    _, media_type, extension = EXPORT_WRITERS[format.value]
+    filename = f"properties_{status_enum.value if status_enum else 'all'}.{extension}"
+    return StreamingResponse(
+        stream_properties_export(format, status_enum, user_uploaded),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@router.post("/admin/import/properties", response_model=ImportReport)
+def import_properties(
+    file: UploadFile = File(...),
+    format: ImportFormat = ImportFormat.geojson,
+    status: str = PropertyStatus.pending.value,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
+):
+    """
+    Bulk import a GeoJSON FeatureCollection, NDJSON or CSV land-record dump.
+    The upload is read incrementally, validated in batches and upserted on property_name.
+    Invalid rows are reported individually and never abort the rest of the import. If the file
+    itself breaks off, the rows before that point stay imported and the 400 carries their report.
+    """
+    try:
+        status_enum = PropertyStatus(status.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = run_import(db, iter_import_records(stream, format), user_id=admin.user_id, status=status_enum)
+    except ValueError as e:
+        # The input itself is unreadable (e.g. no "features" array)
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Failed to read import file: {str(e)}")
+    finally:
+        stream.detach()
+
+    logging.info(
+        f"Property import by user {admin.user_id}: {report.rows_inserted} inserted, "
+        f"{report.rows_updated} updated, {report.rows_failed} failed ({report.rows_per_sec} rows/sec)"
+    )
+    response_cache.invalidate()
+    if report.input_error is not None:
+        # Batches read before the input broke off are committed; say how far the import got
+        return JSONResponse(
+            status_code=400,
+            content={
+                "detail": f"Failed to read import file after row {report.rows_read}: {report.input_error}",
+                "report": report.model_dump(mode="json"),
+            }
+        )
+    return report
+
+@router.get("/admin/land-records", response_model=GeoJSONResponse, dependencies=[Depends(require_admin)])
+def get_land_record(
+    state: str,
+    district: str,
+    village: str,
+    khasra: str,
+    tehsil: Optional[str] = None,
+    murabba: Optional[int] = None,
+    khewat: Optional[str] = None,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Exact land-record lookup. tehsil, murabba and khewat match any value when left out;
+    with all of them given there is at most one parcel.
+    """
+    try:
+        record = normalize_land_record({
+            "state": state, "district": district, "tehsil": tehsil, "village": village,
+            "murabba": murabba, "khasra": khasra, "khewat": khewat,
+        })
+    except LandRecordInvalid as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    properties = find_land_records(db, record)
+    if not properties:
+        raise HTTPException(status_code=404, detail="No property found for this land record")
+    return convert_properties_to_geojson(properties)
+
+@router.post("/admin/land-records/lookup", response_model=LandRecordBatchReport, dependencies=[Depends(require_admin)])
+def lookup_land_records(
+    file: UploadFile = File(...),
+    state: Optional[str] = None,  # Defaults for columns the CSV leaves out or empty
+    district: Optional[str] = None,
+    tehsil: Optional[str] = None,
+    village: Optional[str] = None,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Batch land-record lookup from a CSV with a header row (state, district, tehsil, village,
+    murabba, khasra, khewat; only khasra is needed when the rest come from the defaults).
+    Every row is matched in a single indexed join, up to MAX_LOOKUP_ROWS rows per upload.
+    """
+    defaults = {"state": state, "district": district, "tehsil": tehsil, "village": village}
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return run_batch_lookup(db, iter_lookup_rows(stream, defaults))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read lookup file: {str(e)}")
+    finally:
+        stream.detach()
+
+@router.get("/admin/area-audit", response_model=AreaAuditReport, dependencies=[Depends(require_admin)])
+def get_area_audit(
+    tolerance: float = DEFAULT_TOLERANCE,
+    state: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 500,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    List properties whose declared area_sq_m disagrees with the geodesic area of their geom.
+    """
+    status_enum = None
+    if status is not None:
+        try:
+            status_enum = PropertyStatus(status.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+            )
+
+    try:
+        return run_area_audit(db, tolerance, state, status_enum, max_items=limit)
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error in get_area_audit: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to audit property areas: {str(e)}")
+
+@router.get("/admin/area-audit/{property_id}", response_model=AreaAuditItem, dependencies=[Depends(require_admin)])
+def get_property_area_audit(
+    property_id: int,
+    tolerance: float = DEFAULT_TOLERANCE,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Area check for a single property, including its geometric area in the declared unit.
+    """
+    row = audit_query(db).filter(Property.id == property_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Property not found")
+    return audit_batch([row], tolerance, include_ok=True)[0]
+
+def parse_event_filters(status: Optional[str], types: Optional[str]):
+    """
+    Comma separated status/type filters for the event stream endpoints.
+    """
+    statuses = {value.strip().lower() for value in status.split(",") if value.strip()} if status else set()
+    invalid = statuses - {e.value for e in PropertyStatus}
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status {sorted(invalid)}. Must be one of: {[e.value for e in PropertyStatus]}"
+        )
+    event_types = {value.strip() for value in types.split(",") if value.strip()} if types else set()
+    return statuses, event_types
+
+@router.get("/admin/events/stream", dependencies=[Depends(require_admin)])
+async def stream_property_events(
+    request: Request,
+    status: Optional[str] = None,
+    types: Optional[str] = None
+):
+    """
+    Server-Sent Events feed of property status changes and new notifications.
+    Optional filters: `status=pending,flagged` (matches either side of a transition) and
+    `types=status_changed,notification`.
+    """
+    statuses, event_types = parse_event_filters(status, types)
+    subscription = event_broker.subscribe(statuses, event_types)
+
+    async def event_source():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/admin/events/ws")
+async def property_events_websocket(
+    websocket: WebSocket,
+    status: Optional[str] = None,
+    types: Optional[str] = None
+):
+    """
+    WebSocket variant of the event feed; same filters as /admin/events/stream. Admin only: send
+    the access token as the `bearer, <token>` subprotocol or the `token` query parameter.
+    """
+    principal, subprotocol = await authenticate_websocket(websocket)
+    if principal is None or not principal.is_admin:
+        # Closing before accept() rejects the handshake
+        await websocket.close(code=1008, reason="Not authorized as admin")
+        return
+    try:
+        statuses, event_types = parse_event_filters(status, types)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+
+    await websocket.accept(subprotocol=subprotocol)
+    subscription = event_broker.subscribe(statuses, event_types)
+    # Client messages are ignored; the pending receive only tells us when it disconnects
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                await websocket.send_json(getter.result())
+            else:
+                getter.cancel()
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.ensure_future(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_broker.unsubscribe(subscription)
+        receiver.cancel()
+        if getter is not None:
+            getter.cancel()
+
+@router.post("/admin/queue/claim", response_model=ClaimResponse)
+def claim_pending_properties(
+    limit: int = 10,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
+):
+    """
+    Lease the next `limit` unclaimed pending properties to the calling admin.
+    Concurrent callers receive disjoint sets; leases lapse automatically after `lease_seconds`.
+    """
+    try:
+        leases = claim_pending(db, admin.user_id, limit, lease_seconds)
+        properties = []
+        if leases:
+            properties = (
+                db.query(Property)
+                .options(selectinload(Property.images))
+                .filter(Property.id.in_([lease.property_id for lease in leases]))
+                .order_by(Property.created_at)
+                .all()
+            )
+        return ClaimResponse(leases=leases, data=convert_properties_to_geojson(properties))
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Error in claim_pending_properties: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to claim properties: {str(e)}")
+
+@router.post("/admin/queue/renew", response_model=List[LeaseInfo])
+def renew_property_leases(
+    lease_request: LeaseRequest,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
+):
+    """
+    Extend the caller's leases. Properties missing from the response are no longer held.
+    """
+    return renew_leases(db, admin.user_id, lease_request.property_ids, lease_request.lease_seconds)
+
+@router.post("/admin/queue/release", response_model=List[int])
+def release_property_leases(
+    lease_request: LeaseRequest,
+    db: Session = Depends(get_db_session),
+    admin: Principal = Depends(require_admin)
+):
+    """
+    Hand properties back to the queue without moderating them.
+    """
+    return release_leases(db, admin.user_id, lease_request.property_ids)
+
+@router.get("/admin/queue/leases", response_model=List[LeaseInfo])
+def list_property_leases(
+    db: Session = Depends(get_read_db_session),
+    admin: Principal = Depends(require_admin)
+):
+    return get_active_leases(db, admin.user_id)
+
+@router.post("/{property_id}/visits", status_code=202)
+async def record_property_visit(property_id: int, request: Request):
+    """
+    Count a page view. Buffered in memory and written in bulk by the visit flusher; each client
+    may record MAX_VISITS_PER_CLIENT visits per window.
+    """
+    if not 1 <= property_id <= MAX_PROPERTY_ID:
+        raise HTTPException(status_code=404, detail="Property not found")
+    if not visit_rate_limiter.allow(request.client.host if request.client else ""):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many visits recorded",
+            headers={"Retry-After": str(visit_rate_limiter.retry_after())}
+        )
+    if not visit_buffer.record(property_id):
+        return {"detail": "Visit dropped"}
+    return {"detail": "Visit recorded"}
+
+@router.get("/admin/visits/top", dependencies=[Depends(require_admin)])
+async def get_top_visited_properties(n: int = 10):
+    """
+    Most visited properties, from the periodically aggregated snapshot plus unflushed visits.
+    """
+    return visit_buffer.top(max(1, min(n, 100)))
+
+@router.get("/admin/visits/stats", dependencies=[Depends(require_admin)])
+async def get_visit_buffer_stats():
+    """
+    Buffer health, including how many increments a crash right now would lose.
+    """
+    return {**visit_buffer.stats(), **visit_rate_limiter.stats()}
+
+@router.get("/admin/changes", response_model=DeltaSyncResponse, dependencies=[Depends(require_admin)])
+def get_property_changes(
+    since: Optional[str] = None,  # Watermark from the previous response; omit for a full load
+    status: Optional[str] = None,
+    limit: int = 200,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Delta sync for offline capable clients: only what changed after the client's watermark.
+    """
+    status_enum = None
+    if status is not None:
+        try:
+            status_enum = PropertyStatus(status.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+            )
+
+    try:
+        return get_changes_since(db, since, status_enum, limit)
+    except WatermarkExpired as e:
+        raise HTTPException(status_code=410, detail=f"{str(e)}; reload without `since`")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/admin/moderation/events", response_model=ModerationEventPage, dependencies=[Depends(require_admin)])
+def get_moderation_events(
+    admin_id: Optional[int] = None,
+    property_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Moderation history, newest first, e.g. everything one admin did in a given month.
+    """
+    try:
+        items, next_cursor = list_moderation_events(db, admin_id, property_id, since, until, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/admin/properties/{property_id}/moderation", response_model=ModerationEventPage, dependencies=[Depends(require_admin)])
+def get_property_moderation_history(
+    property_id: int,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_read_db_session)
+):
+    try:
+        items, next_cursor = list_moderation_events(db, property_id=property_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/admin/rollups/districts", response_model=DistrictRollupResponse, dependencies=[Depends(require_admin)])
+def get_district_rollup_report(
+    level: str = "district",  # district | tehsil
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    status: Optional[str] = None,  # Measure prices, area and extent over this status only
+    format: str = "json",  # json | geojson
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Listing volume, status mix, approval rate and prices per district or tehsil for choropleth
+    dashboards, served from the incrementally refreshed rollup tables.
+    """
+    if level not in ROLLUP_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Invalid level '{level}'. Must be one of: {list(ROLLUP_LEVELS)}")
+    if format not in ("json", "geojson"):
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Must be one of: ['json', 'geojson']")
+    status_enum = None
+    if status is not None:
+        try:
+            status_enum = PropertyStatus(status.lower())
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status '{status}'. Must be one of: {[e.value for e in PropertyStatus]}"
+            )
+
+    report = get_district_rollups(db, level, state, district, status_enum)
+    if format == "geojson":
+        return Response(content=json.dumps(rollups_to_feature_collection(report)), media_type="application/geo+json")
+    return report
+
+@router.get("/images/{image_id}/thumbnail")
+def get_image_thumbnail(
+    image_id: int,
+    request: Request,
+    size: str = DEFAULT_THUMBNAIL_SIZE,
+    v: Optional[str] = None,  # Image version from thumbnail_url; makes the response immutable
+    db: Session = Depends(get_read_db_session)
+):
+    """
+    Resized WebP (or JPEG for clients that do not accept WebP) rendition of a property image.
+    Generated on first request and served from the derivative store afterwards.
+    """
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"Invalid size '{size}'. Must be one of: {list(THUMBNAIL_SIZES)}")
+
+    image = db.query(PropertyImage).filter(PropertyImage.id == image_id).first()
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    version = image_version(image)
+    fmt = negotiate_thumbnail_format(request.headers.get("accept"))
+    etag = build_etag("thumbnail", image_id, version, size, fmt)
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if v == version else UNVERSIONED_CACHE_CONTROL,
+    }
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        data, media_type = thumbnail_service.get_thumbnail(image, size, fmt)
+    except ThumbnailsUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except SourceRefused as e:
+        logging.warning(f"Refused to fetch the original of image {image_id}: {str(e)}")
+        raise HTTPException(status_code=422, detail="The original image is not on an allowed source")
+    except Exception as e:
+        logging.error(f"Thumbnail generation failed for image {image_id}: {str(e)}")
+        raise HTTPException(status_code=502, detail="Could not load the original image")
+    return Response(content=data, media_type=media_type, headers=headers)
+
+@router.get("/admin/cache/stats", dependencies=[Depends(require_admin)])
+async def get_response_cache_stats():
+    """
+    Hit rate and size of this worker's response cache.
+    """
+    return response_cache.stats()
@@ -2,15 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from models.user import User, UserProfile
-from db.session import get_db_session
+from db.session import get_read_db_session
+from adminutils.principal import require_admin
 import csv
 from io import StringIO
 import logging
 
 router = APIRouter()
 
-@router.get("/admin/users/export")
-async def export_user_data(db: Session = Depends(get_db_session)):
+@router.get("/admin/users/export", dependencies=[Depends(require_admin)])
+async def export_user_data(db: Session = Depends(get_read_db_session)):
     """
     Export all user data including profile information as a CSV file.
     """
@@ -0,0 +1,35 @@
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class NotificationOut(BaseModel):
+    id: int
+    property_id: int
+    status_change_from: str
+    status_change_to: str
+    created_at: datetime
+    read_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class NotificationPage(BaseModel):
+    items: List[NotificationOut]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next (older) page")
+    unread_count: int
+
+
+class UnreadCount(BaseModel):
+    unread_count: int
+
+
+class MarkReadRequest(BaseModel):
+    ids: List[int] = Field([], description="Notification ids to mark as read")
+    all: bool = Field(False, description="Mark every unread notification as read")
+
+
+class MarkReadResult(BaseModel):
+    marked: int
+    unread_count: int
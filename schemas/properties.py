@@ -1,9 +1,7 @@
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict
 from pydantic import BaseModel, Field, EmailStr, validator
-from geoalchemy2.shape import to_shape
 from datetime import datetime
 from enum import Enum
-from geojson import Point
 import json
 
 class PropertyStatus(str, Enum):
@@ -12,6 +10,12 @@ class PropertyStatus(str, Enum):
     disapproved = "disapproved"
     flagged = "flagged"
 
+class ExportFormat(str, Enum):
+    geojson = "geojson"
+    ndjson = "ndjson"
+    csv = "csv"
+    geoparquet = "geoparquet"
+
 class PointGeometry(BaseModel):
     type: Optional[Literal["Point"]] = "Point"
     coordinates: Optional[List[float]] = Field(None, description="[longitude, latitude]")
@@ -27,6 +31,8 @@ class PropertyImage(BaseModel):
     id: int
     image_url: str
     uploaded_at: datetime
+    thumbnail_url: Optional[str] = None  # Resized, long-cached derivative for grids and lists
+    signed_url: Optional[str] = None  # Time-limited direct URL for private storage objects
 
     class Config:
         orm_mode = True
@@ -190,4 +196,114 @@ class PropertyStatusCounts(BaseModel):
 
 class UserPropertyResponse(Properties):
     images: Optional[List[str]] = Field([], description="List of image URLs or base64 strings")
-    geometry: Optional[PolygonGeometry] = Field(..., description="GeoJSON Polygon geometry of the property")
\ No newline at end of file
+    geometry: Optional[PolygonGeometry] = Field(..., description="GeoJSON Polygon geometry of the property")
+class ImportFormat(str, Enum):
+    geojson = "geojson"
+    ndjson = "ndjson"
+    csv = "csv"
+
+class ImportRowError(BaseModel):
+    row: int = Field(..., description="1-based position of the record in the input")
+    error: str
+
+class ImportReport(BaseModel):
+    rows_read: int
+    rows_inserted: int
+    rows_updated: int
+    rows_failed: int
+    elapsed_seconds: float
+    rows_per_sec: float
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    input_error: Optional[str] = None  # Reading stopped here; the counts cover the rows before it
+
+class AreaAuditItem(BaseModel):
+    property_id: int
+    state: Optional[str] = None
+    unit: Optional[str] = None
+    declared_area_sq_m: Optional[float] = Field(None, description="Stored area_sq_m")
+    geometric_area_sq_m: Optional[float] = Field(None, description="Geodesic area of geom")
+    geometric_area_in_unit: Optional[float] = Field(None, description="Geodesic area expressed in the property's unit")
+    deviation: Optional[float] = Field(None, description="|declared - geometric| / geometric")
+    declared_in_unit: bool = Field(False, description="The stored figure matches the geometry when read in `unit` instead of square metres")
+    reason: str
+
+class AreaAuditReport(BaseModel):
+    scanned: int
+    mismatched: int
+    tolerance: float
+    elapsed_seconds: float
+    items: List[AreaAuditItem] = []
+    items_truncated: bool = False
+
+class LeaseRequest(BaseModel):
+    property_ids: List[int]
+    lease_seconds: Optional[int] = Field(None, description="Lease length; defaults to the server setting")
+
+class LeaseInfo(BaseModel):
+    property_id: int
+    expires_at: datetime
+
+class ClaimResponse(BaseModel):
+    leases: List[LeaseInfo]
+    data: GeoJSONResponse
+
+class RemovedProperty(BaseModel):
+    property_id: int
+    change_type: str = Field(..., description="deleted, or status_changed when it left the requested status")
+    status_to: Optional[str] = None
+    changed_at: datetime
+
+class DeltaSyncResponse(BaseModel):
+    data: GeoJSONResponse  # Properties created or modified since the watermark
+    removed: List[RemovedProperty] = []  # Apply before `data`
+    watermark: str  # Pass back as `since` on the next call
+    has_more: bool  # Call again straight away with the new watermark
+
+class DistrictRollupItem(BaseModel):
+    level: str
+    state: str
+    district: str
+    tehsil: Optional[str] = None
+    listings: int
+    by_status: Dict[str, int]
+    approval_rate: Optional[float] = Field(None, description="approved / (approved + disapproved)")
+    median_price: Optional[float] = None
+    average_price: Optional[float] = None
+    total_area_sq_m: Optional[float] = None
+    bbox: Optional[List[float]] = Field(None, description="[min_lon, min_lat, max_lon, max_lat] of the parcel centroids")
+
+class DistrictRollupResponse(BaseModel):
+    level: str
+    refreshed_through: Optional[datetime] = None
+    items: List[DistrictRollupItem]
+
+class ModerationEventOut(BaseModel):
+    id: int
+    property_id: int
+    admin_id: Optional[int] = None
+    action: str
+    status_from: Optional[str] = None
+    status_to: Optional[str] = None
+    reason: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ModerationEventPage(BaseModel):
+    items: List[ModerationEventOut]
+    next_cursor: Optional[str] = None
+
+class LandRecordMatch(BaseModel):
+    row: int = Field(..., description="1-based position of the record in the input")
+    khasra: str
+    property_ids: List[int]  # Empty when nothing matched
+
+class LandRecordBatchReport(BaseModel):
+    rows_read: int
+    rows_matched: int
+    rows_unmatched: int
+    rows_failed: int
+    items: List[LandRecordMatch]
+    errors: List[ImportRowError] = []
@@ -0,0 +1,140 @@
+"""
+Replica routing against a real primary and streaming replica (tests/docker-compose.replicas.yml).
+Skipped unless TEST_PRIMARY_URL and TEST_REPLICA_URL point at a reachable pair.
+"""
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from core.config import settings
+from db import replicas, session
+from db.replicas import Replica, ReplicaSet, measure_lag
+
+PRIMARY_URL = os.environ.get("TEST_PRIMARY_URL")
+REPLICA_URL = os.environ.get("TEST_REPLICA_URL")
+# How long the replica gets to replay a write before the test gives up
+CATCH_UP_SECONDS = 15
+
+pytestmark = pytest.mark.skipif(
+    not (PRIMARY_URL and REPLICA_URL),
+    reason="TEST_PRIMARY_URL and TEST_REPLICA_URL are not set (see tests/docker-compose.replicas.yml)",
+)
+
+
+@pytest.fixture(scope="module")
+def primary_engine():
+    engine = create_engine(PRIMARY_URL)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE IF NOT EXISTS replica_probe (id serial PRIMARY KEY)"))
+    except OperationalError as e:
+        pytest.skip(f"primary unreachable: {e}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(primary_engine):
+    replica = Replica(REPLICA_URL)
+    try:
+        with replica.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"replica unreachable: {e}")
+    yield replica
+    replica.engine.dispose()
+
+
+def write_probe(primary_engine) -> int:
+    with primary_engine.begin() as connection:
+        return connection.execute(text("INSERT INTO replica_probe DEFAULT VALUES RETURNING id")).scalar()
+
+
+def wait_for_probe(replica: Replica, probe_id: int) -> None:
+    deadline = time.monotonic() + CATCH_UP_SECONDS
+    while time.monotonic() < deadline:
+        with replica.engine.connect() as connection:
+            if connection.execute(text("SELECT 1 FROM replica_probe WHERE id = :id"), {"id": probe_id}).first():
+                return
+        time.sleep(0.1)
+    pytest.fail(f"replica did not replay probe {probe_id} within {CATCH_UP_SECONDS}s")
+
+
+def in_recovery(db) -> bool:
+    return db.execute(text("SELECT pg_is_in_recovery()")).scalar()
+
+
+def test_lag_sql_reports_zero_on_the_primary(primary_engine):
+    primary = Replica(PRIMARY_URL)
+    try:
+        assert measure_lag(primary) == 0
+    finally:
+        primary.engine.dispose()
+
+
+def test_caught_up_replica_measures_no_lag_and_is_picked(primary_engine, replica):
+    wait_for_probe(replica, write_probe(primary_engine))
+    # Idle primary: once everything received is replayed the replica counts as current
+    deadline = time.monotonic() + CATCH_UP_SECONDS
+    while measure_lag(replica) > 0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert measure_lag(replica) == 0
+
+    replica_set = ReplicaSet([REPLICA_URL], max_lag=5.0, check_interval=0.0)
+    try:
+        picked = replica_set.pick()
+        assert picked is not None and picked.lag == 0
+        with picked.engine.connect() as connection:
+            assert connection.execute(text("SELECT pg_is_in_recovery()")).scalar()
+    finally:
+        replica_set.replicas[0].engine.dispose()
+
+
+@pytest.mark.parametrize("url_name", ["TEST_REPLICA_URL", "TEST_PRIMARY_URL"])
+def test_replica_sessions_reject_writes(primary_engine, url_name):
+    # Also against the primary: the READ ONLY transaction, not just hot standby, must refuse writes
+    target = Replica(os.environ[url_name])
+    db = target.session_factory()
+    try:
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            db.execute(text("INSERT INTO replica_probe DEFAULT VALUES"))
+    finally:
+        db.close()
+        target.engine.dispose()
+
+
+@pytest.fixture
+def routed_to_pair(monkeypatch, replica):
+    monkeypatch.setattr(settings, "SQLALCHEMY_DATABASE_URL", PRIMARY_URL)
+    session.get_engine.cache_clear()
+    session.get_read_only_engine.cache_clear()
+    monkeypatch.setattr(session.ReadOnlySessionLocal, "_bound", False)
+    monkeypatch.setattr(replicas, "_replica_set", ReplicaSet([REPLICA_URL], max_lag=5.0, check_interval=0.0))
+    yield
+    replicas._replica_set.replicas[0].engine.dispose()
+    session.get_engine().dispose()
+    session.get_engine.cache_clear()
+    session.get_read_only_engine.cache_clear()
+
+
+def test_get_read_session_uses_the_replica(routed_to_pair):
+    db = session.get_read_session()
+    try:
+        assert in_recovery(db)
+    finally:
+        db.close()
+
+
+def test_get_read_session_uses_the_primary_read_only_when_pinned(routed_to_pair):
+    token = replicas._routing_state.set(replicas._RoutingState(pinned=True))
+    db = session.get_read_session()
+    try:
+        assert not in_recovery(db)
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            db.execute(text("INSERT INTO replica_probe DEFAULT VALUES"))
+    finally:
+        db.close()
+        replicas._routing_state.reset(token)